@@ -15,7 +15,7 @@ from git import Repo
 import subprocess
 
 from version_stamp.backends.git import GitBackend as VmnGitBackend
-from version_stamp.core.utils import resolve_root_path
+from version_stamp.core.utils import get_tag_order, resolve_root_path
 
 LOGGER = logging.getLogger()
 LOGGER.setLevel(logging.DEBUG)
@@ -235,14 +235,17 @@ class FSAppLayoutFixture(object):
         subprocess.call(base_cmd, cwd=self.repo_path)
 
     def get_all_tags(self):
-        cmd = ["--sort", "taggerdate"]
-        tags = self._app_backend._git_backend.git.tag(*cmd).split("\n")
-
-        tags = tags[::-1]
-        if len(tags) == 1 and tags[0] == "":
-            tags.pop(0)
+        # Newest first, in vmn's tag creation order
+        tags = list(self._app_backend._git_backend.tags)
+        tags.sort(
+            key=lambda t: get_tag_order(
+                t.tag.message if t.tag else None,
+                t.tag.tagged_date if t.tag else None,
+            ),
+            reverse=True,
+        )
 
-        return tags
+        return [t.name for t in tags]
 
     def create_tag(self, commit_hash, tag_name):
         base_cmd = ["git", "tag", tag_name, commit_hash]
@@ -450,6 +453,8 @@ class FSAppLayoutFixture(object):
         default_release_mode=None,
         release_mode_policy=None,
         experiment=None,
+        pending_changes_paths=None,
+        changelog=None,
     ):
         with open(app_conf_path, "w") as f:
             f.write("# Autogenerated by vmn. \n")
@@ -478,6 +483,10 @@ class FSAppLayoutFixture(object):
                 data["conf"]["release_mode_policy"] = release_mode_policy
             if experiment is not None:
                 data["conf"]["experiment"] = experiment
+            if pending_changes_paths is not None:
+                data["conf"]["pending_changes_paths"] = pending_changes_paths
+            if changelog is not None:
+                data["conf"]["changelog"] = changelog
 
             yaml.dump(data, f, sort_keys=False)
             f.truncate()
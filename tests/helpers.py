@@ -141,6 +141,13 @@ def _stamp_app(
     return ret, ver_info, merged_dict
 
 
+def _stamp_apps(*args):
+    """Run ``vmn stamp`` with ``args``, e.g. several app names; return the
+    exit code."""
+    reset_logger()
+    return vmn_run(["stamp", *args])[0]
+
+
 def _show(
     app_name,
     version=None,
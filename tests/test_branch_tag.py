@@ -1,9 +1,11 @@
 import os
 import subprocess
 
+import git
 import pytest
 import yaml
 
+from version_stamp.backends.git import GitBackend
 from version_stamp.cli.constants import VER_FILE_NAME
 
 from helpers import (
@@ -227,6 +229,177 @@ def test_show_after_multiple_tags_removed_1_tag_left(app_layout, capfd):
     assert res["dirty"][0] == "version_not_matched"
 
 
+def test_first_reachable_stamp_after_removed_tags_is_one_walk(app_layout):
+    _run_vmn_init()
+    _init_app(app_layout.app_name)
+
+    for i in range(3):
+        app_layout.write_file_commit_and_push(
+            "test_repo_0", "a/b/c/f1.file", f"{i}msg1"
+        )
+        _stamp_app(f"{app_layout.app_name}", "patch")
+
+    for i in (2, 3):
+        app_layout.remove_tag(f"{app_layout.app_name}_0.0.{i}")
+
+    be = GitBackend(app_layout.repo_path)
+    walks = []
+    iter_vmn_stamp_commits = be._iter_vmn_stamp_commits
+
+    def _counting_iter(*args):
+        walks.append(args)
+        return iter_vmn_stamp_commits(*args)
+
+    be._iter_vmn_stamp_commits = _counting_iter
+    tag_names, cobj, ver_infos = be.get_latest_stamp_tags(
+        app_layout.app_name, root_context=False
+    )
+
+    assert tag_names == [f"{app_layout.app_name}_0.0.1"]
+    assert cobj.hexsha == be.changeset(tag=f"{app_layout.app_name}_0.0.1")
+    assert len(walks) == 1
+
+
+def test_ref_map_serves_branch_lookups(app_layout):
+    _run_vmn_init()
+    _init_app(app_layout.app_name)
+    err, _, _ = _stamp_app(f"{app_layout.app_name}", "patch")
+    assert err == 0
+
+    app_layout.checkout("new_branch", create_new=True)
+    app_layout.write_file_commit_and_push("test_repo_0", "f1.file", "msg1")
+
+    be = GitBackend(app_layout.repo_path)
+    ref_map = be.ref_map
+    head = be._be.head.commit.hexsha
+
+    assert ref_map.head_branch == "new_branch"
+    assert ref_map.heads["new_branch"] == head
+    assert ref_map.remotes["origin/new_branch"] == head
+    assert ref_map.upstream("new_branch") == "origin/new_branch"
+    assert "origin/HEAD" not in ref_map.remotes
+
+    assert be.remote_active_branch == "origin/new_branch"
+    assert be.get_commit_object_from_branch_name("new_branch").hexsha == head
+    assert be.check_for_outgoing_changes() is None
+
+    app_layout.write_file_commit_and_push("test_repo_0", "f1.file", "msg2", push=False)
+    be = GitBackend(app_layout.repo_path)
+    assert be.check_for_outgoing_changes() is not None
+
+
+def test_status_probe(app_layout):
+    _run_vmn_init()
+    _init_app(app_layout.app_name)
+    err, _, _ = _stamp_app(f"{app_layout.app_name}", "patch")
+    assert err == 0
+
+    be = GitBackend(app_layout.repo_path)
+    probe = be.status_probe
+    assert not probe.dirty
+    assert probe.head_oid == be._be.head.commit.hexsha
+    assert probe.branch == be.active_branch
+    assert probe.upstream == be.remote_active_branch
+    assert (probe.ahead, probe.behind) == (0, 0)
+    assert be.check_for_pending_changes() is None
+    assert be.check_for_outgoing_changes() is None
+
+    app_layout.write_file_commit_and_push("test_repo_0", "f1.file", "msg1", push=False)
+    app_layout.write_file_commit_and_push(
+        "test_repo_0", "f1.file", "msg2", commit=False
+    )
+    be = GitBackend(app_layout.repo_path)
+    assert be.status_probe.dirty
+    assert be.status_probe.ahead == 1
+    assert be.check_for_pending_changes() is not None
+    assert be.check_for_outgoing_changes().startswith("Outgoing changes")
+
+    app_layout.revert_changes("test_repo_0")
+    app_layout.checkout(f"{app_layout.app_name}_0.0.1")
+    be = GitBackend(app_layout.repo_path)
+    assert be.status_probe.detached
+    assert be.check_for_outgoing_changes().startswith("Detached head")
+
+
+def test_outgoing_changes_fresh_recheck(app_layout):
+    _run_vmn_init()
+    _init_app(app_layout.app_name)
+    err, _, _ = _stamp_app(f"{app_layout.app_name}", "patch")
+    assert err == 0
+
+    app_layout.write_file_commit_and_push("test_repo_0", "f1.file", "msg1", push=False)
+    be = GitBackend(app_layout.repo_path)
+    assert be.check_for_outgoing_changes().startswith("Outgoing changes")
+
+    app_layout.git_cmd(args=["push"])
+    # The memoized probe still sees the commit as outgoing
+    assert be.check_for_outgoing_changes() is not None
+    assert be.check_for_outgoing_changes(fresh=True) is None
+
+
+def test_branch_containment(app_layout, monkeypatch):
+    _run_vmn_init()
+    _init_app(app_layout.app_name)
+    err, _, _ = _stamp_app(f"{app_layout.app_name}", "patch")
+    assert err == 0
+
+    be = GitBackend(app_layout.repo_path)
+    main_branch = be.active_branch
+    base = be.changeset()
+
+    app_layout.checkout("new_branch", create_new=True)
+    app_layout.write_file_commit_and_push("test_repo_0", "f1.file", "msg1")
+    app_layout.checkout(main_branch)
+    app_layout.git_cmd(args=["branch", "-D", "new_branch"])
+
+    be = GitBackend(app_layout.repo_path)
+    tip = be.ref_map.remotes["origin/new_branch"]
+    assert be.get_containing_branch(base, [main_branch]) == main_branch
+    assert be.get_containing_branch(tip, [main_branch]) is None
+    # Only the remote branch is left
+    assert be.get_containing_branch(tip, ["no_such", "new_branch"]) == "new_branch"
+    assert be._ancestry_cache[(tip, be.ref_map.heads[main_branch])] is False
+
+    app_layout.checkout(base)
+    be = GitBackend(app_layout.repo_path)
+    git_branch_calls = []
+    monkeypatch.setattr(
+        git.cmd.Git,
+        "branch",
+        lambda self, *a: git_branch_calls.append(a),
+        raising=False,
+    )
+    # HEAD is the tip of the main branch, no `git branch --contains` needed
+    assert be.get_branch_from_changeset(base) == main_branch
+    assert be.get_branch_from_changeset(base) == main_branch
+    assert git_branch_calls == []
+
+
+def test_backend_resolves_branch_state_on_demand(app_layout, monkeypatch):
+    _run_vmn_init()
+    _init_app(app_layout.app_name)
+    err, _, _ = _stamp_app(f"{app_layout.app_name}", "patch")
+    assert err == 0
+
+    app_layout.checkout(f"{app_layout.app_name}_0.0.1")
+
+    calls = []
+    get_branch_from_changeset = GitBackend.get_branch_from_changeset
+
+    def _recording(self, hexsha):
+        calls.append(hexsha)
+        return get_branch_from_changeset(self, hexsha)
+
+    monkeypatch.setattr(GitBackend, "get_branch_from_changeset", _recording)
+    be = GitBackend(app_layout.repo_path)
+    assert be.detached_head
+    assert calls == []
+
+    assert be.active_branch is not None
+    assert be.remote_active_branch is not None
+    assert len(calls) == 1
+
+
 def test_show_after_multiple_tags_removed_0_tags_left(app_layout, capfd):
     _run_vmn_init()
     _init_app(app_layout.app_name)
@@ -284,6 +457,32 @@ def test_shallow_non_vmn_commit_repo_stamp(app_layout, capfd):
     assert ver_info["stamping"]["app"]["_version"] == "0.0.2"
 
 
+def test_shallow_resolver_uses_one_ref_listing(app_layout):
+    _run_vmn_init()
+    _init_app(app_layout.app_name)
+
+    for _ in range(3):
+        app_layout.write_file_commit_and_push("test_repo_0", "f1.txt", "content")
+        err, _, _ = _stamp_app(f"{app_layout.app_name}", "patch")
+        assert err == 0
+
+    app_layout.write_file_commit_and_push("test_repo_0", "f1.txt", "connnntenctt")
+
+    clone_path = app_layout.create_new_clone("test_repo_0", depth=1)
+    be = GitBackend(clone_path)
+
+    def _no_per_tag_loads(*args, **kwargs):
+        raise AssertionError("tag objects must not be loaded one by one")
+
+    be.get_tag_object_from_tag_name = _no_per_tag_loads
+    tag_names, cobj, _ = be.get_latest_stamp_tags(
+        app_layout.app_name, root_context=False
+    )
+
+    assert tag_names == [f"{app_layout.app_name}_0.0.3"]
+    assert cobj.hexsha == be.changeset(tag=f"{app_layout.app_name}_0.0.3")
+
+
 def test_shallow_vmn_commit_repo_stamp_pr(app_layout):
     _run_vmn_init()
     _init_app(app_layout.app_name)
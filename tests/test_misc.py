@@ -1,15 +1,23 @@
+import json
 import os
 import shutil
 import subprocess
 import time
 
 import filelock
+import pytest
 import yaml
 
 from version_stamp.backends.base import VMNBackend
-from version_stamp.cli.constants import VER_FILE_NAME
+from version_stamp.backends.factory import get_client, invalidate_clients
+from version_stamp.backends.git import GitBackend
+from version_stamp.backends.git_trace import GIT_TRACE, git_subcommand
+from version_stamp.backends.ref_reader import GitRefReader
+from version_stamp.cli.constants import TAG_INDEX_FILENAME, VER_FILE_NAME
 from version_stamp.cli.entry import vmn_run
-from version_stamp.core.logging import reset_logger
+from version_stamp.core.constants import SHALLOW_DEEPEN_FIRST_DEPTH, TAG_ORDER_KEY
+from version_stamp.core.logging import RUNTIME_PROFILE, reset_logger
+from version_stamp.core.version_allocation import VersionAllocationIndex
 from version_stamp.stamping.base import IVersionsStamper
 
 from helpers import (
@@ -44,6 +52,44 @@ def test_version_template():
     assert formated_version == "2-0"
 
 
+def test_version_allocation_index():
+    index = VersionAllocationIndex(
+        "app",
+        [
+            "app_0.0.1",
+            "app_1.2.3",
+            "app_1.2.10",
+            "app_1.3.0-rc.1",
+            "app_1.2.3.4",
+            "app_1.2.4-rc.2",
+            "app_1.2.4-rc.1",
+            "app_1.2.4-beta.3+build.1",
+            "app_9",
+            "app_x_7.0.0",
+            "not_a_version",
+        ],
+    )
+
+    # "app_x_7.0.0" belongs to another app, "app_9" is a root version
+    assert index.max_octet("major") == 1
+    assert index.max_octet("minor", 1) == 3
+    assert index.max_octet("minor", 2) is None
+    assert index.max_octet("patch", 1, 2) == 10
+    assert index.max_octet("hotfix", 1, 2, 3) == 4
+    assert index.max_octet("hotfix", 1, 2, 4) == 0
+
+    assert index.has_base(1, 2, 4)
+    assert not index.has_base(1, 2, 5)
+
+    counts = index.prerelease_count(1, 2, 4)
+    assert counts == {"rc": 2, "beta": 3}
+    counts["rc"] = 100
+    assert index.prerelease_count(1, 2, 4)["rc"] == 2
+    assert index.prerelease_count(1, 2, 3) is None
+
+    assert VersionAllocationIndex("app", []).max_octet("major") is None
+
+
 def test_get_version(app_layout):
     _run_vmn_init()
     _init_app(app_layout.app_name)
@@ -517,6 +563,606 @@ def test_perf_show(app_layout):
     assert diff < 10
 
 
+def test_tag_index_reuses_parsed_tags(app_layout):
+    _run_vmn_init()
+    _init_app(app_layout.app_name)
+    err, _, _ = _stamp_app(app_layout.app_name, "patch")
+    assert err == 0
+
+    tag_name = f"{app_layout.app_name}_0.0.1"
+    be = GitBackend(app_layout.repo_path)
+    _, first = be.parse_tag_message(tag_name)
+    assert first["ver_info"]["stamping"]["app"]["_version"] == "0.0.1"
+    assert os.path.isfile(
+        os.path.join(app_layout.repo_path, ".vmn", TAG_INDEX_FILENAME)
+    )
+
+    sha = be._get_tag_ref_sha(tag_name)
+    assert be.tag_index.get(sha)["ver_info"] == first["ver_info"]
+
+    # Callers mutate ver_info dicts; the index must not hand out shared state
+    first["ver_info"]["stamping"]["app"]["_version"] = "mutated"
+
+    be = GitBackend(app_layout.repo_path)
+    _, second = be.parse_tag_message(tag_name)
+    assert second["ver_info"]["stamping"]["app"]["_version"] == "0.0.1"
+    assert second["commit_object"].hexsha == first["commit_object"].hexsha
+    assert second["tag_object"].name == tag_name
+
+
+def test_tag_index_excluded_in_existing_repo(app_layout):
+    _run_vmn_init()
+    _init_app(app_layout.app_name)
+
+    # Repos initialized before the tag index do not ignore it in .vmn/.gitignore
+    vmn_dir = os.path.join(app_layout.repo_path, ".vmn")
+    gitignore_path = os.path.join(vmn_dir, ".gitignore")
+    with open(gitignore_path) as f:
+        lines = [line for line in f if TAG_INDEX_FILENAME not in line]
+    with open(gitignore_path, "w") as f:
+        f.writelines(lines)
+    app_layout.git_cmd(args=["commit", "-am", "Old style .vmn/.gitignore"])
+    app_layout.git_cmd(args=["push"])
+    for name in os.listdir(vmn_dir):
+        if name.startswith(TAG_INDEX_FILENAME):
+            os.remove(os.path.join(vmn_dir, name))
+
+    err, _, _ = _stamp_app(app_layout.app_name, "patch")
+    assert err == 0
+    assert os.path.isfile(os.path.join(vmn_dir, TAG_INDEX_FILENAME))
+    assert app_layout.git_cmd(args=["status", "--porcelain"]) == ""
+
+    exclude_path = os.path.join(
+        app_layout.repo_path,
+        app_layout.git_cmd(args=["rev-parse", "--git-path", "info/exclude"]).strip(),
+    )
+    with open(exclude_path) as f:
+        assert f"/.vmn/{TAG_INDEX_FILENAME}*" in f.read().splitlines()
+
+
+def test_last_user_changeset_cache(app_layout, monkeypatch):
+    _run_vmn_init()
+    _init_app(app_layout.app_name)
+    app_layout.write_file_commit_and_push("test_repo_0", "f1.txt", "text")
+    user_commit = GitBackend(app_layout.repo_path).changeset()
+    err, _, params = _stamp_app(app_layout.app_name, "patch")
+    assert err == 0
+
+    files = [os.path.join(params["app_dir_path"], VER_FILE_NAME)]
+    be = GitBackend(app_layout.repo_path)
+    assert be.changeset() != user_commit
+    assert be.get_last_user_changeset(files, app_layout.app_name) == user_commit
+
+    # A later invocation at the same commit needs neither tags nor git log
+    def _fail(*args, **kwargs):
+        raise AssertionError("not cached")
+
+    with monkeypatch.context() as m:
+        m.setattr(GitBackend, "get_all_commit_tags", _fail)
+        m.setattr(GitBackend, "parse_git_log_to_commit_for_specific_file", _fail)
+        be = GitBackend(app_layout.repo_path)
+        assert be.get_last_user_changeset(files, app_layout.app_name) == user_commit
+
+        # Other version files are a different question
+        be = GitBackend(app_layout.repo_path)
+        with pytest.raises(AssertionError):
+            be.get_last_user_changeset(files + ["other.yml"], app_layout.app_name)
+
+    # User commits are answered from HEAD and not stored
+    app_layout.write_file_commit_and_push("test_repo_0", "f1.txt", "more")
+    be = GitBackend(app_layout.repo_path)
+    head = be.changeset()
+    assert be.get_last_user_changeset(files, app_layout.app_name) == head
+    key = be._user_changeset_key(head, files, app_layout.app_name)
+    assert be.tag_index.get_user_changeset(key) is None
+
+
+def test_bulk_tag_resolver(app_layout):
+    _run_vmn_init()
+    _init_app(app_layout.app_name)
+    err, _, _ = _stamp_app(app_layout.app_name, "patch")
+    assert err == 0
+
+    tag_name = f"{app_layout.app_name}_0.0.1"
+    be = GitBackend(app_layout.repo_path)
+    head = be.changeset()
+    app_layout.create_tag(head, "lightweight_tag")
+    subprocess.call(
+        ["git", "tag", "-a", "-m", "not vmn", "annotated_tag", head],
+        cwd=app_layout.repo_path,
+    )
+
+    refs = be.get_tag_refs(["refs/tags"], points_at=head)
+    assert sorted(r["name"] for r in refs) == sorted(
+        ["annotated_tag", "lightweight_tag", tag_name]
+    )
+    vmn_ref = [r for r in refs if r["name"] == tag_name][0]
+    assert vmn_ref["commit"] == head
+    assert vmn_ref["author"] == "vmn"
+
+    ver_infos = be.get_all_commit_tags(head)
+    assert list(ver_infos.keys()) == [tag_name]
+
+    _, expected = GitBackend(app_layout.repo_path).parse_tag_message(tag_name)
+    assert ver_infos[tag_name]["ver_info"] == expected["ver_info"]
+    assert ver_infos[tag_name]["tag_order"] == expected["tag_order"]
+    assert ver_infos[tag_name]["commit_object"].hexsha == head
+
+
+def test_tags_created_in_the_same_second_keep_their_order(app_layout):
+    _run_vmn_init()
+    _init_app(app_layout.app_name)
+    err, _, _ = _stamp_app(app_layout.app_name, "minor", prerelease="rc")
+    assert err == 0
+
+    t1 = time.perf_counter()
+    err, ver_info, _ = _release_app(app_layout.app_name, "0.1.0-rc.1")
+    assert err == 0
+    assert time.perf_counter() - t1 < 10
+    assert TAG_ORDER_KEY not in ver_info
+
+    be = GitBackend(app_layout.repo_path)
+    rc_tag = f"{app_layout.app_name}_0.1.0-rc.1"
+    release_tag = f"{app_layout.app_name}_0.1.0"
+    assert TAG_ORDER_KEY in be._be.tag(f"refs/tags/{release_tag}").tag.message
+
+    tag_names, _, ver_infos = be.get_latest_stamp_tags(app_layout.app_name, False)
+    assert tag_names == [release_tag, rc_tag]
+    assert ver_infos[release_tag]["tag_order"] > ver_infos[rc_tag]["tag_order"]
+    assert TAG_ORDER_KEY not in ver_infos[release_tag]["ver_info"]
+    assert be.get_latest_available_tag(f"{app_layout.app_name}_*") == release_tag
+
+
+def test_app_scoped_cached_fetch(app_layout):
+    _run_vmn_init()
+    _init_app(app_layout.app_name)
+    _init_app("other_app")
+    # Its tags match {app_name}_*, but it is another app
+    _init_app(f"{app_layout.app_name}_web")
+
+    clone_path = app_layout.create_new_clone("test_repo_0")
+    app_layout.set_working_dir(clone_path)
+    for app_name in (app_layout.app_name, "other_app", f"{app_layout.app_name}_web"):
+        err, _, _ = _stamp_app(app_name, "patch")
+        assert err == 0
+    app_layout.set_working_dir(app_layout.repo_path)
+
+    be = GitBackend(app_layout.repo_path)
+    cache_path = os.path.join(app_layout.repo_path, ".vmn", "vmn.cache")
+    tags = lambda: set(be._be.git.tag("--list").split("\n"))
+    os.remove(cache_path)
+
+    be.perform_cached_fetch(force=True, app_names=[app_layout.app_name, None])
+    assert f"{app_layout.app_name}_0.0.1" in tags()
+    assert "other_app_0.0.1" not in tags()
+    assert f"{app_layout.app_name}_web_0.0.1" not in tags()
+
+    with open(cache_path) as f:
+        fetch_times = yaml.safe_load(f)
+    assert list(fetch_times) == [app_layout.app_name]
+
+    # Still fresh for the first app, not fetched yet for the other one
+    be.perform_cached_fetch(app_names=[app_layout.app_name, "other_app"])
+    assert "other_app_0.0.1" in tags()
+    with open(cache_path) as f:
+        assert sorted(yaml.safe_load(f)) == sorted([app_layout.app_name, "other_app"])
+
+    # Without a remote nothing is fetched, so nothing is remembered as fresh
+    app_layout.git_cmd(args=["remote", "remove", "origin"])
+    os.remove(cache_path)
+    be = GitBackend(app_layout.repo_path)
+    assert be.selected_remote is None
+    be.perform_cached_fetch(force=True, app_names=[app_layout.app_name])
+    assert not os.path.exists(cache_path)
+
+
+def test_backend_pool(app_layout):
+    _run_vmn_init()
+    invalidate_clients()
+
+    be, err = get_client(app_layout.repo_path, "git")
+    assert err is None
+    same, _ = get_client(os.path.join(app_layout.repo_path, "."), "git")
+    assert same is be
+
+    invalidate_clients([app_layout.repo_path])
+    fresh, _ = get_client(app_layout.repo_path, "git")
+    assert fresh is not be
+    invalidate_clients()
+
+
+def test_ref_reader(app_layout, tmp_path):
+    _run_vmn_init()
+    _init_app(app_layout.app_name)
+    err, _, _ = _stamp_app(app_layout.app_name, "patch")
+    assert err == 0
+
+    be = GitBackend(app_layout.repo_path)
+    reader = be.ref_reader
+    head = be._be.head.commit.hexsha
+    branch = be._be.active_branch.name
+
+    assert reader.resolve("HEAD") == head
+    assert reader.read_symref("HEAD") == f"refs/heads/{branch}"
+    assert reader.is_detached() is False
+    assert reader.resolve("refs/heads/no_such_branch") is None
+
+    # Loose refs move into packed-refs
+    be._be.git.pack_refs("--all")
+    assert not os.path.exists(os.path.join(be._be.git_dir, "refs", "heads", branch))
+    assert reader.resolve(f"refs/heads/{branch}") == head
+    assert reader.resolve("HEAD") == head
+
+    worktree = str(tmp_path / "wt")
+    be._be.git.worktree("add", "--detach", worktree, "HEAD~1")
+    wt_be = GitBackend(worktree)
+    assert wt_be.ref_reader.common_dir == reader.common_dir
+    assert GitRefReader(wt_be._be.git_dir).common_dir == reader.common_dir
+    assert wt_be.ref_reader.is_detached() is True
+    assert wt_be.changeset() == be._be.commit("HEAD~1").hexsha
+    assert wt_be.ref_reader.resolve(f"refs/heads/{branch}") == head
+
+
+def test_ref_reader_reftable(tmp_path):
+    # The layout git writes for reftable storage: HEAD and refs/heads are
+    # placeholders for older git versions, the refs live in reftable/
+    git_dir = tmp_path / ".git"
+    (git_dir / "refs" / "heads").mkdir(parents=True)
+    (git_dir / "reftable").mkdir()
+    (git_dir / "HEAD").write_text("ref: refs/heads/.invalid\n")
+    (git_dir / "refs" / "heads" / ".invalid").write_text("\n")
+
+    reader = GitRefReader(str(git_dir))
+    assert reader.reftable
+    assert reader.is_detached() is None
+    assert reader.read_symref("HEAD") is None
+    assert reader.resolve("HEAD") is None
+
+    # Even without the reftable directory, the placeholder HEAD is not trusted
+    (git_dir / "reftable").rmdir()
+    reader = GitRefReader(str(git_dir))
+    assert not reader.reftable
+    assert reader.is_detached() is None
+    assert reader.read_symref("HEAD") is None
+
+
+def test_git_trace(app_layout, monkeypatch, tmp_path, capfd):
+    _run_vmn_init()
+    _init_app(app_layout.app_name)
+
+    assert git_subcommand(["git", "-c", "a=b", "-C", "x", "status", "-s"]) == "status"
+
+    trace_path = tmp_path / "trace.json"
+    monkeypatch.setenv("VMN_GIT_TRACE", str(trace_path))
+    err, _, _ = _stamp_app(app_layout.app_name, "patch")
+    assert err == 0
+    assert not GIT_TRACE.enabled
+
+    with open(trace_path) as f:
+        trace = json.load(f)
+    assert trace["git_calls"] == len(trace["events"]) > 0
+    assert trace["dropped"] == 0
+    for name, stats in trace["subcommands"].items():
+        events = [e for e in trace["events"] if e["subcommand"] == name]
+        assert stats["count"] == len(events)
+        assert stats["p50"] <= stats["p95"] <= stats["total"]
+    assert "push" in trace["subcommands"]
+
+    for target in ("-", "1"):
+        monkeypatch.setenv("VMN_GIT_TRACE", target)
+        capfd.readouterr()
+        _show(app_layout.app_name)
+        assert "git trace:" in capfd.readouterr().err
+
+    # Off, without creating a trace file named "0"
+    monkeypatch.chdir(tmp_path)
+    for target in ("0", ""):
+        monkeypatch.setenv("VMN_GIT_TRACE", target)
+        capfd.readouterr()
+        _show(app_layout.app_name)
+        assert "git trace:" not in capfd.readouterr().err
+        assert not os.path.exists(tmp_path / "0")
+
+
+def test_profile(app_layout, tmp_path):
+    _run_vmn_init()
+    _init_app(app_layout.app_name)
+
+    profile_path = tmp_path / "profile.json"
+    err, _ = vmn_run(
+        ["--profile", str(profile_path), "stamp", "-r", "patch", app_layout.app_name]
+    )
+    assert err == 0
+    assert not RUNTIME_PROFILE.enabled
+
+    with open(profile_path) as f:
+        profile = json.load(f)
+    assert profile["otherData"]["command"] == "stamp"
+
+    spans = [e for e in profile["traceEvents"] if e["ph"] == "X"]
+    names = {e["name"] for e in spans}
+    assert "handle_stamp" in names
+    assert any(e["cat"] == "git" for e in spans)
+    assert all(e["dur"] >= 0 for e in spans)
+
+    # Git spans nest inside the vmn span that ran them
+    stamp = next(e for e in spans if e["name"] == "handle_stamp")
+    assert any(
+        e["cat"] == "git" and stamp["ts"] <= e["ts"] <= stamp["ts"] + stamp["dur"]
+        for e in spans
+    )
+
+
+def test_pending_changes_paths(app_layout, capfd):
+    _run_vmn_init()
+    _init_app(app_layout.app_name)
+    err, _, params = _stamp_app(app_layout.app_name, "patch")
+    assert err == 0
+
+    app_layout.write_file_commit_and_push("test_repo_0", "app/f1.txt", "text")
+    app_layout.write_file_commit_and_push("test_repo_0", "other/f2.txt", "text")
+    app_layout.write_conf(params["app_conf_path"], pending_changes_paths=["app"])
+
+    # Uncommitted changes outside of the app's paths are not pending
+    app_layout.write_file_commit_and_push(
+        "test_repo_0", "other/f2.txt", "changed", commit=False
+    )
+    err, ver_info, _ = _stamp_app(app_layout.app_name, "patch")
+    assert err == 0
+    assert ver_info["stamping"]["app"]["_version"] == "0.0.2"
+
+    app_layout.write_file_commit_and_push(
+        "test_repo_0", "app/f1.txt", "changed", commit=False
+    )
+    capfd.readouterr()
+    err, _, _ = _stamp_app(app_layout.app_name, "patch")
+    assert err == 1
+    assert "Pending changes" in capfd.readouterr().err
+
+
+def test_commit_log_iterator(app_layout):
+    _run_vmn_init()
+    _init_app(app_layout.app_name)
+    err, _, _ = _stamp_app(app_layout.app_name, "patch")
+    assert err == 0
+
+    messages = ["fix: a", "feat!: b\n\nsome body\n\nBREAKING CHANGE: b", "docs: c"]
+    for i, msg in enumerate(messages):
+        app_layout.write_file_commit_and_push(
+            "test_repo_0", f"f{i}.txt", "text", commit_msg=msg
+        )
+
+    be = GitBackend(app_layout.repo_path)
+    tag_name = f"{app_layout.app_name}_0.0.1"
+    assert list(be.get_commits_range_iter(tag_name)) == messages[::-1]
+
+    head = be._be.head.commit
+    infos = be.get_commits_info_iter(tag_name)
+    assert next(infos) == (messages[-1], head.hexsha[:7])
+    infos.close()
+    assert list(infos) == []
+
+
+def test_commit_log_iterator_with_signatures(app_layout, tmp_path):
+    _run_vmn_init()
+    _init_app(app_layout.app_name)
+    err, _, _ = _stamp_app(app_layout.app_name, "patch")
+    assert err == 0
+
+    key = str(tmp_path / "key")
+    subprocess.check_call(["ssh-keygen", "-q", "-t", "ed25519", "-N", "", "-f", key])
+    with open(f"{key}.pub") as f:
+        (tmp_path / "allowed").write_text(f"vmn@test {f.read()}")
+
+    # A user config that makes git log print signature checks and colors
+    for name, value in (
+        ("gpg.format", "ssh"),
+        ("user.signingkey", key),
+        ("gpg.ssh.allowedSignersFile", str(tmp_path / "allowed")),
+        ("log.showSignature", "true"),
+        ("color.ui", "always"),
+    ):
+        app_layout.git_cmd(args=["config", name, value])
+    app_layout.git_cmd(args=["commit", "-q", "-S", "--allow-empty", "-m", "fix: a"])
+
+    be = GitBackend(app_layout.repo_path)
+    tag_name = f"{app_layout.app_name}_0.0.1"
+    assert list(be.get_commits_range_iter(tag_name)) == ["fix: a"]
+    head = be._be.head.commit.hexsha
+    assert list(be.get_commits_info_iter(tag_name)) == [("fix: a", head[:7])]
+
+
+def test_commit_range_shared_by_stamp(app_layout, monkeypatch):
+    _run_vmn_init()
+    _init_app(app_layout.app_name)
+    err, _, params = _stamp_app(app_layout.app_name, "patch")
+    assert err == 0
+
+    app_layout.write_conf(
+        params["app_conf_path"],
+        conventional_commits=True,
+        changelog={"path": "CHANGELOG.md"},
+    )
+
+    short_hashes = []
+    for i, msg in enumerate(["fix: a", "feat: b", "docs: c"]):
+        app_layout.write_file_commit_and_push(
+            "test_repo_0", f"f{i}.txt", "text", commit_msg=msg
+        )
+        short_hashes.append(app_layout.get_changesets("test_repo_0")["hash"][:7])
+
+    walks = []
+    iter_commits_in_range = GitBackend._iter_commits_in_range
+
+    def _counting_iter(self, tag_name, to_hex="HEAD"):
+        walks.append(tag_name)
+        return iter_commits_in_range(self, tag_name, to_hex)
+
+    monkeypatch.setattr(GitBackend, "_iter_commits_in_range", _counting_iter)
+
+    # Release mode detection and the changelog read the same range
+    err, ver_info, _ = _stamp_app(app_layout.app_name)
+    assert err == 0
+    assert ver_info["stamping"]["app"]["_version"] == "0.1.0"
+    assert walks == [f"{app_layout.app_name}_0.0.1"]
+    with open(os.path.join(app_layout.repo_path, "CHANGELOG.md")) as f:
+        changelog = f.read()
+    fix_a, feat_b, docs_c = short_hashes
+    # docs is a known type, so it gets its own section after the features
+    # and bug fixes
+    assert changelog.startswith("# Changelog\n\n## [0.1.0] - ")
+    assert changelog.endswith(
+        f"### Features\n- b ({feat_b})\n\n"
+        f"### Bug Fixes\n- a ({fix_a})\n\n"
+        f"### Documentation\n- c ({docs_c})\n\n"
+    )
+
+    # A reader that stopped early leaves the rest for the next one
+    be = GitBackend(app_layout.repo_path)
+    tag_name = f"{app_layout.app_name}_0.0.1"
+    walks.clear()
+    first = be.get_commits_range_iter(tag_name)
+    assert next(first).startswith(app_layout.app_name)
+    first.close()
+    messages = list(be.get_commits_range_iter(tag_name))
+    infos = list(be.get_commits_info_iter(tag_name))
+    assert walks == [tag_name]
+    assert [msg for msg, _ in infos] == messages
+    assert messages[1:4] == ["docs: c", "feat: b", "fix: a"]
+
+    # HEAD moving to other commits starts a new walk
+    be.checkout(tag=tag_name)
+    assert list(be.get_commits_range_iter(tag_name)) == []
+    assert walks == [tag_name, tag_name]
+
+
+def test_deepen_to_range(app_layout, tmp_path):
+    _run_vmn_init()
+    _init_app(app_layout.app_name)
+    # Older history the range does not need
+    git_cmd = ["git", "-c", "user.name=u", "-c", "user.email=u"]
+    for i in range(80):
+        subprocess.check_call(
+            git_cmd + ["commit", "-q", "--allow-empty", "-m", f"old {i}"],
+            cwd=app_layout.repo_path,
+        )
+    subprocess.check_call(["git", "push", "-q"], cwd=app_layout.repo_path)
+    err, _, _ = _stamp_app(app_layout.app_name, "patch")
+    assert err == 0
+
+    messages = [f"fix: {i}" for i in range(5)]
+    for i, msg in enumerate(messages):
+        app_layout.write_file_commit_and_push(
+            "test_repo_0", f"f{i}.txt", "text", commit_msg=msg
+        )
+
+    # A CI checkout: HEAD and the version tags, one commit deep each
+    clone = str(tmp_path / "shallow")
+    remote = f"file://{app_layout.test_app_remote}"
+    subprocess.check_call(["git", "clone", "-q", "--depth", "1", remote, clone])
+    subprocess.check_call(
+        ["git", "fetch", "-q", "--depth", "1", "origin", "refs/tags/*:refs/tags/*"],
+        cwd=clone,
+    )
+
+    be = GitBackend(clone)
+    tag_name = f"{app_layout.app_name}_0.0.1"
+    from_hex = be._be.tags[tag_name].commit.hexsha
+    assert be._range_is_cut(from_hex, "HEAD")
+
+    assert list(be.get_commits_range_iter(tag_name)) == messages[::-1]
+    assert be.deepen_stats["fetches"] == 1
+    assert be.deepen_stats["depth"] == SHALLOW_DEEPEN_FIRST_DEPTH
+    assert be.deepen_stats["kib"] > 0
+    # Deepened, not unshallowed
+    assert os.path.exists(os.path.join(be._be.git_dir, "shallow"))
+    assert not be._range_is_cut(from_hex, "HEAD")
+
+    # A complete range fetches nothing
+    be.deepen_stats = None
+    be.deepen_to_range(from_hex)
+    assert be.deepen_stats is None
+
+
+def test_maintenance(app_layout, capfd):
+    _run_vmn_init()
+    _init_app(app_layout.app_name)
+    err, _, _ = _stamp_app(app_layout.app_name, "patch")
+    assert err == 0
+
+    capfd.readouterr()
+    reset_logger()
+    err, _ = vmn_run(["maintenance", app_layout.app_name])
+    assert err == 0
+    out = capfd.readouterr().out
+    assert "path-limited log" in out
+    assert "before ms" in out
+
+    git_dir = os.path.join(app_layout.repo_path, ".git")
+    chain = os.path.join(
+        git_dir, "objects", "info", "commit-graphs", "commit-graph-chain"
+    )
+    assert os.path.isfile(chain)
+    with open(os.path.join(git_dir, "packed-refs")) as f:
+        assert f"refs/tags/{app_layout.app_name}_0.0.1" in f.read()
+    assert not os.path.exists(
+        os.path.join(git_dir, "refs", "tags", f"{app_layout.app_name}_0.0.1")
+    )
+
+    # Later runs add layers for the new commits only
+    app_layout.write_file_commit_and_push("test_repo_0", "f1.txt", "text")
+    reset_logger()
+    err, _ = vmn_run(["maintenance", "--no-timings"])
+    assert err == 0
+    assert "wrote the commit-graph" in capfd.readouterr().out
+    err, _, _ = _stamp_app(app_layout.app_name, "patch")
+    assert err == 0
+
+
+def test_object_reader(app_layout):
+    _run_vmn_init()
+    _init_app(app_layout.app_name)
+    err, _, _ = _stamp_app(app_layout.app_name, "patch")
+    assert err == 0
+
+    tag_name = f"{app_layout.app_name}_0.0.1"
+    be = GitBackend(app_layout.repo_path)
+    reader = be.object_reader
+
+    commit = reader.read_commit("HEAD")
+    assert commit.hexsha == be._be.head.commit.hexsha
+    assert commit.author.name == "vmn"
+    assert commit.message == be._be.head.commit.message
+
+    tag = reader.read_tag(f"refs/tags/{tag_name}")
+    expected = be._be.tag(f"refs/tags/{tag_name}").tag
+    assert tag.tag == tag_name
+    # GitPython drops the message's trailing newline, the reader keeps it
+    assert tag.message.rstrip("\n") == expected.message
+    assert tag.tagged_date == expected.tagged_date
+    assert tag.tagger.name == expected.tagger.name
+    assert tag.object.hexsha == commit.hexsha
+
+    # Characters splitlines() would break on stay part of the message
+    message = "first\x0bsecond\u2028third\n\nbody\n"
+    be._be.create_tag("odd_tag", message=message)
+    assert reader.read_tag("refs/tags/odd_tag").message == message
+
+    assert reader.read_tag("HEAD") is None
+    assert reader.read_commit("no_such_rev") is None
+    assert reader.info("no_such_rev") is None
+    assert reader.info("no such") is None
+    assert reader.read("no such") is None
+
+    conf = reader.read_blob_text(tag_name, f".vmn/{app_layout.app_name}/conf.yml")
+    assert "conf:" in conf
+    assert reader.read_blob_text(tag_name, "no/such/file") is None
+
+    reader.close()
+    # Pipes are restarted on demand after close
+    assert reader.read_commit("HEAD").hexsha == commit.hexsha
+
+
 def test_run_vmn_from_non_git_repo(app_layout, capfd):
     _run_vmn_init()
     app_layout.set_working_dir(app_layout.base_dir)
@@ -4,6 +4,9 @@ import shutil
 
 import yaml
 
+from version_stamp.cli.entry import vmn_run
+from version_stamp.core.logging import reset_logger
+
 from helpers import (
     DEV_VERSION_RE,
     _configure_2_deps,
@@ -248,3 +251,53 @@ def test_show_dev_with_dep_version_not_matched(app_layout, capfd):
         f"Expected single dev version line, got:\n{captured.out}"
     )
     assert dev_ver.startswith("0.0.2-dev.")
+
+
+def test_dirty_deps_reported_in_path_order(app_layout, capfd):
+    _run_vmn_init()
+    _init_app(app_layout.app_name)
+    err, _, params = _stamp_app(app_layout.app_name, "patch")
+    assert err == 0
+
+    _configure_2_deps(app_layout, params)
+    for repo in ("repo2", "repo1"):
+        app_layout.write_file_commit_and_push(repo, "f1.file", "msg1")
+        app_layout.write_file_commit_and_push(repo, "f1.file", "msg1", commit=False)
+
+    for _ in range(3):
+        capfd.readouterr()
+        err, _, _ = _stamp_app(app_layout.app_name, "patch")
+        assert err == 1
+        captured = capfd.readouterr()
+        assert captured.err.count("Pending changes in") == 2
+        assert captured.err.index("repo1") < captured.err.index("repo2")
+
+
+def test_maintenance_covers_deps(app_layout, capfd):
+    _run_vmn_init()
+    _init_app(app_layout.app_name)
+    err, _, params = _stamp_app(app_layout.app_name, "patch")
+    assert err == 0
+
+    _configure_2_deps(app_layout, params)
+    for repo in ("repo1", "repo2"):
+        app_layout.write_file_commit_and_push(repo, "f1.file", "msg1")
+
+    capfd.readouterr()
+    reset_logger()
+    err, _ = vmn_run(["maintenance", app_layout.app_name])
+    assert err == 0
+    out = capfd.readouterr().out
+
+    for repo in (".", os.path.join("..", "repo1"), os.path.join("..", "repo2")):
+        assert f"{repo}:" in out
+        chain = os.path.join(
+            app_layout.repo_path,
+            repo,
+            ".git",
+            "objects",
+            "info",
+            "commit-graphs",
+            "commit-graph-chain",
+        )
+        assert os.path.isfile(chain)
@@ -2,6 +2,7 @@
 import os
 from unittest import mock
 
+import git
 import pytest
 
 from version_stamp.backends.git import _sanitize_log_str
@@ -282,7 +283,14 @@ class TestPushWithCredentials:
         m.set_push_credentials("bot", "ghp_secret")
 
         m._be = mock.MagicMock()
-        m._be.git.execute.side_effect = [Exception("ci.skip not supported"), None]
+        m._be.git.execute.side_effect = [
+            git.exc.GitCommandError(
+                ["git", "push"],
+                128,
+                "fatal: the receiving end does not support push options",
+            ),
+            None,
+        ]
         m._push_with_ci_skip_fallback("refs/tags/v1.0.0")
 
         # Second call (fallback) should also use authenticated URL
@@ -348,3 +356,93 @@ class TestUpdateRemoteTrackingRef:
 
         # Should not raise
         m.push()
+
+
+class TestAtomicPush:
+    """The branch and stamp tags are pushed in one atomic round trip."""
+
+    def _mixin(self):
+        m = GitOpsMixin()
+        m.selected_remote = mock.MagicMock()
+        m.selected_remote.name = "origin"
+        m.remote_active_branch = "origin/main"
+        m.active_branch = "main"
+        m.detached_head = False
+        m._be = mock.MagicMock()
+        m._be.config_reader.return_value.get_value.return_value = True
+        return m
+
+    def test_branch_and_tags_in_one_push(self):
+        m = self._mixin()
+        m.push(["app_1.0.0", "root_app_1"])
+
+        assert m._be.git.execute.call_count == 1
+        call_args = m._be.git.execute.call_args_list[0][0][0]
+        assert "--atomic" in call_args
+        assert call_args[-3:] == [
+            "refs/heads/main:main",
+            "refs/tags/app_1.0.0",
+            "refs/tags/root_app_1",
+        ]
+
+    def test_single_refspec_is_not_atomic(self):
+        m = self._mixin()
+        m.push()
+
+        call_args = m._be.git.execute.call_args_list[0][0][0]
+        assert "--atomic" not in call_args
+
+    @staticmethod
+    def _push_error(stderr):
+        return git.exc.GitCommandError(["git", "push"], 128, stderr)
+
+    def test_fallback_is_remembered(self):
+        m = self._mixin()
+        m._be.git.execute.side_effect = [
+            self._push_error("fatal: the receiving end does not support push options"),
+            None,
+        ]
+        m.push_tags(["app_1.0.0"])
+
+        writer = m._be.config_writer.return_value.__enter__.return_value
+        writer.set_value.assert_called_once_with(
+            'remote "origin"', "vmnpushoptions", "false"
+        )
+        call_args = m._be.git.execute.call_args_list[1][0][0]
+        assert "-o" not in call_args
+
+    def test_other_push_errors_are_raised(self):
+        m = self._mixin()
+        m._be.git.execute.side_effect = self._push_error(
+            "fatal: unable to access remote: Connection timed out"
+        )
+        with pytest.raises(git.exc.GitCommandError):
+            m.push_tags(["app_1.0.0"])
+
+        assert m._be.git.execute.call_count == 1
+        m._be.config_writer.assert_not_called()
+
+    def test_non_atomic_fallback(self):
+        m = self._mixin()
+        m._be.git.execute.side_effect = [
+            self._push_error("fatal: the receiving end does not support --atomic push"),
+            None,
+        ]
+        m.push(["app_1.0.0"])
+
+        assert m._be.git.execute.call_count == 2
+        call_args = m._be.git.execute.call_args_list[1][0][0]
+        assert "--atomic" not in call_args
+        assert "-o" in call_args
+        assert call_args[-2:] == ["refs/heads/main:main", "refs/tags/app_1.0.0"]
+        m._be.config_writer.assert_not_called()
+
+    def test_no_push_options_when_unsupported(self):
+        m = self._mixin()
+        m._be.config_reader.return_value.get_value.return_value = False
+        m.push(["app_1.0.0"])
+
+        assert m._be.git.execute.call_count == 1
+        call_args = m._be.git.execute.call_args_list[0][0][0]
+        assert "-o" not in call_args
+        m._be.config_writer.assert_not_called()
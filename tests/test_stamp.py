@@ -1,9 +1,19 @@
 import os
+import types
 
 import pytest
 import yaml
 
-from helpers import _init_app, _run_vmn_init, _show, _stamp_app
+from version_stamp.stamping.publisher import VersionControlStamper
+
+from helpers import (
+    _goto,
+    _init_app,
+    _run_vmn_init,
+    _show,
+    _stamp_app,
+    _stamp_apps,
+)
 
 
 def test_vmn_init(app_layout, capfd):
@@ -360,3 +370,176 @@ def test_stamp_auto_init(app_layout):
     assert err == 0
     assert ver_info is not None
     assert ver_info["stamping"]["app"]["_version"] == "0.0.1"
+
+
+def test_stamp_to_remote_without_atomic_push(app_layout):
+    _run_vmn_init()
+    _init_app(app_layout.app_name)
+
+    remote = app_layout._repos["test_repo_0"]["remote"]
+    app_layout.git_cmd(
+        args=["--git-dir", remote, "config", "receive.advertiseAtomic", "false"]
+    )
+
+    app_layout.write_file_commit_and_push("test_repo_0", "f1.txt", "text")
+    err, ver_info, _ = _stamp_app(app_layout.app_name, "patch")
+    assert err == 0
+    assert ver_info["stamping"]["app"]["_version"] == "0.0.1"
+
+    remote_tags = app_layout.git_cmd(args=["ls-remote", "--tags", "origin"])
+    assert f"refs/tags/{app_layout.app_name}_0.0.1" in remote_tags
+
+
+def test_batch_stamp(app_layout, capfd):
+    _run_vmn_init()
+    app1 = app_layout.app_name
+    app2 = f"{app_layout.app_name}_2"
+    _init_app(app1)
+    _init_app(app2, "1.0.0")
+
+    app_layout.write_file_commit_and_push("test_repo_0", "f1.txt", "text")
+    be = app_layout._app_backend.be
+    user_commit = be.changeset()
+
+    capfd.readouterr()
+    assert _stamp_apps("-r", "patch", app1, app2) == 0
+    assert capfd.readouterr().out == "[INFO] 0.0.1\n[INFO] 1.0.1\n"
+
+    # One vmn commit on top of the user's, holding both apps' versions
+    repo = be._be
+    head = repo.head.commit
+    assert head.parents[0].hexsha == user_commit
+    assert f"{app1}: Stamped version 0.0.1" in head.message
+    assert f"{app2}: Stamped version 1.0.1" in head.message
+    for tag in (f"{app1}_0.0.1", f"{app2}_1.0.1"):
+        assert repo.tags[tag].commit == head
+
+    # The branch and both tags reached the remote
+    remote_refs = repo.git.ls_remote("origin").splitlines()
+    assert f"{head.hexsha}\trefs/heads/{repo.active_branch.name}" in remote_refs
+    remote_tags = repo.git.ls_remote("--tags", "origin")
+    assert f"refs/tags/{app1}_0.0.1" in remote_tags
+    assert f"refs/tags/{app2}_1.0.1" in remote_tags
+
+    for app, version in ((app1, "0.0.1"), (app2, "1.0.1")):
+        err, ver_info, _ = _stamp_app(app, "patch")
+        assert err == 0
+        assert ver_info["stamping"]["app"]["_version"] == version
+        assert ver_info["stamping"]["app"]["changesets"]["."]["hash"] == user_commit
+
+    # Nothing changed: nothing to stamp for either app
+    assert _stamp_apps("-r", "patch", app1, app2) == 0
+    assert repo.head.commit == head
+
+    # Apps are still stamped on their own afterwards
+    app_layout.write_file_commit_and_push("test_repo_0", "f1.txt", "more")
+    err, ver_info, _ = _stamp_app(app2, "minor")
+    assert err == 0
+    assert ver_info["stamping"]["app"]["_version"] == "1.1.0"
+
+    # Only the apps that changed since their last version are stamped
+    capfd.readouterr()
+    assert _stamp_apps("-r", "patch", app1, app2) == 0
+    assert capfd.readouterr().out.endswith("[INFO] 0.0.2\n")
+    assert repo.head.commit.message.startswith(f"{app1}: Stamped version 0.0.2")
+
+
+def test_batch_stamp_next_to_app_named_vmn(app_layout, capfd, monkeypatch):
+    _run_vmn_init()
+    app1 = app_layout.app_name
+    app2 = f"{app_layout.app_name}_2"
+    for app in ("vmn", app1, app2):
+        _init_app(app)
+    err, _, _ = _stamp_app("vmn", "patch")
+    assert err == 0
+    be = app_layout._app_backend.be
+
+    app_layout.write_file_commit_and_push("test_repo_0", "f1.txt", "text")
+    assert _stamp_apps("-r", "patch", app1, app2) == 0
+    assert not be._be.head.commit.message.startswith("vmn:")
+
+    # Batch commits of earlier versions had a "vmn: Stamped" subject. The
+    # walk must not stop at their tags when looking for the vmn app's.
+    monkeypatch.setattr(
+        VersionControlStamper,
+        "_get_stamp_commit_msg",
+        lambda self, stamps: f"vmn: Stamped versions of {len(stamps)} apps\n\n"
+        + "".join(f"{v.name}: Stamped version {ver}\n" for v, ver, _ in stamps),
+    )
+    app_layout.write_file_commit_and_push("test_repo_0", "f1.txt", "more")
+    assert _stamp_apps("-r", "patch", app1, app2) == 0
+    monkeypatch.undo()
+
+    tag_names, _, _ = be.get_latest_stamp_tags("vmn", False)
+    assert tag_names == ["vmn_0.0.1"]
+
+    capfd.readouterr()
+    assert _show("vmn", raw=True) == 0
+    assert yaml.safe_load(capfd.readouterr().out)["out"] == "0.0.1"
+    assert _goto("vmn") == 0
+
+
+def test_rebased_batch_stamp(app_layout, capfd):
+    _run_vmn_init()
+    app1 = app_layout.app_name
+    app2 = f"{app_layout.app_name}_2"
+    _init_app(app1)
+    _init_app(app2, "1.0.0")
+
+    app_layout.write_file_commit_and_push("test_repo_0", "f0.file", "msg0")
+    main_branch = app_layout._app_backend.be.get_active_branch()
+    app_layout.checkout("topic", create_new=True)
+    app_layout.write_file_commit_and_push("test_repo_0", "f1.file", "msg1")
+    assert _stamp_apps("-r", "patch", app1, app2) == 0
+
+    # The rebased batch commit has none of the tags
+    app_layout.rebase(main_branch, "topic", no_ff=True)
+
+    for app, version in ((app1, "0.0.1"), (app2, "1.0.1")):
+        capfd.readouterr()
+        assert _show(app, raw=True) == 0
+        assert yaml.safe_load(capfd.readouterr().out)["out"] == version
+
+
+def test_batch_stamp_commit_message():
+    def _stamper(name, release_mode):
+        return types.SimpleNamespace(
+            name=name,
+            params={"extra_commit_message": "[skip ci]"},
+            current_version_info={"stamping": {"app": {"release_mode": release_mode}}},
+        )
+
+    new_app = _stamper("new_app", "init")
+    old_app = _stamper("old_app", "patch")
+    msg = VersionControlStamper._get_stamp_commit_msg(
+        new_app, [(new_app, "0.0.0", None), (old_app, "1.0.1", None)]
+    )
+    assert msg == (
+        "Stamped versions of 2 apps\n\n"
+        "new_app: Stamped initial version 0.0.0\n"
+        "old_app: Stamped version 1.0.1\n"
+        "[skip ci]\n"
+    )
+
+    assert (
+        VersionControlStamper._get_stamp_commit_msg(new_app, [(new_app, "0.0.0", None)])
+        == "new_app: Stamped initial version 0.0.0\n\n"
+    )
+    assert (
+        VersionControlStamper._get_stamp_commit_msg(old_app, [(old_app, "1.0.1", None)])
+        == "old_app: Stamped version 1.0.1\n[skip ci]\n"
+    )
+
+
+def test_batch_stamp_rejected(app_layout, capfd):
+    _run_vmn_init()
+    app2 = f"{app_layout.app_name}_2"
+    _init_app(app_layout.app_name)
+    _init_app(app2)
+
+    capfd.readouterr()
+    assert _stamp_apps("-r", "patch", app_layout.app_name, app_layout.app_name) == 1
+    assert "more than once" in capfd.readouterr().err
+
+    assert _stamp_apps("--ov", "1.0.0", app_layout.app_name, app2) == 1
+    assert "--ov" in capfd.readouterr().err
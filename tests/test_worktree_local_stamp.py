@@ -62,11 +62,12 @@ def test_git_backend_can_push_tags_without_remote_branch():
     calls = []
     backend = object.__new__(GitOpsMixin)
     backend.selected_remote = object()
-    backend._push_with_ci_skip_fallback = calls.append
+    backend._push_with_ci_skip_fallback = lambda *refspecs: calls.append(refspecs)
 
     backend.push_tags(["app_1.2.3", "root_4"])
 
-    assert calls == ["refs/tags/app_1.2.3", "refs/tags/root_4"]
+    # One push for all the tags, no branch refspec
+    assert calls == [("refs/tags/app_1.2.3", "refs/tags/root_4")]
 
 
 def test_no_stamp_marker_takes_precedence_over_local_only_marker(tmp_path):
@@ -80,8 +81,12 @@ def test_local_only_stamp_pull_fetches_without_merging_branch():
     calls = []
     vcs = SimpleNamespace(
         backend=SimpleNamespace(
-            perform_cached_fetch=lambda force=False: calls.append(("fetch", force))
+            perform_cached_fetch=lambda force=False, app_names=None: calls.append(
+                ("fetch", force)
+            )
         ),
+        name="app",
+        root_app_name=None,
         retrieve_remote_changes=lambda: calls.append(("pull", None)),
     )
 
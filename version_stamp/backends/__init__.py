@@ -6,6 +6,7 @@ from version_stamp.backends.factory import get_client  # noqa: F401
 from version_stamp.backends.git import GitBackend  # noqa: F401
 from version_stamp.backends.iterators import (  # noqa: F401
     CommitInfoIterator,
+    CommitLogIterator,
     CommitMessageIterator,
 )
 from version_stamp.backends.local_file import LocalFileBackend  # noqa: F401
@@ -70,7 +70,7 @@ class VMNBackend(ABC):
         ...
 
     @abstractmethod
-    def perform_cached_fetch(self, force=False):
+    def perform_cached_fetch(self, force=False, app_names=None):
         ...
 
     @abstractmethod
@@ -3,6 +3,7 @@ import git
 
 from version_stamp.backends.git import GitBackend
 from version_stamp.backends.local_file import LocalFileBackend
+from version_stamp.backends.pool import BACKEND_POOL
 from version_stamp.core.constants import VMN_BE_TYPE_LOCAL_FILE
 from version_stamp.core.logging import measure_runtime_decorator
 
@@ -14,11 +15,18 @@ def get_client(root_path, be_type, inherit_env=False):
         return be, None
 
     try:
-        client = git.Repo(root_path, search_parent_directories=True)
-        client.close()
-
-        be = GitBackend(root_path, inherit_env)
+        be = BACKEND_POOL.get(
+            root_path,
+            lambda: GitBackend(root_path, inherit_env),
+            inherit_env=inherit_env,
+        )
         return be, None
     except git.exc.InvalidGitRepositoryError:
         err = f"repository path: {root_path} is not a functional git or repository.\n"
         return None, err
+
+
+def invalidate_clients(paths=None):
+    """Drop pooled backends, e.g. after their repos were checked out by
+    another process. All of them when ``paths`` is None."""
+    BACKEND_POOL.invalidate(paths)
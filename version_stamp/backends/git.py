@@ -7,7 +7,7 @@ Implementation is split across mixin modules:
   - git_tags.py   — tag/version lookup
   - git_history.py — changeset, deps, revert, log inspection
 """
-import datetime
+import json
 import os
 import pathlib
 import re
@@ -20,6 +20,11 @@ from version_stamp.backends.git_branch import GitBranchMixin
 from version_stamp.backends.git_history import GitHistoryMixin
 from version_stamp.backends.git_ops import GitOpsMixin
 from version_stamp.backends.git_tags import GitTagsMixin
+from version_stamp.backends.git_trace import GIT_TRACE, git_subcommand
+from version_stamp.backends.object_reader import GitObjectReader
+from version_stamp.backends.pool import BACKEND_POOL
+from version_stamp.backends.ref_reader import GitRefReader
+from version_stamp.backends.tag_index import TagMetadataIndex
 from version_stamp.core.constants import (
     BOLD_CHAR,
     END_CHAR,
@@ -27,9 +32,16 @@ from version_stamp.core.constants import (
     VMN_BE_TYPE_GIT,
     VMN_USER_NAME,
 )
-from version_stamp.core.logging import VMN_LOGGER, get_call_stack, measure_runtime_decorator
+from version_stamp.core.logging import (
+    RUNTIME_PROFILE,
+    VMN_LOGGER,
+    get_call_stack,
+    measure_runtime_decorator,
+)
 
 _CREDENTIALS_RE = re.compile(r"(https?://)([^@]+)@")
+# vmn.cache key of `git fetch --tags` (app scoped fetches use the tag app name)
+_ALL_TAGS_FETCH_SCOPE = "*"
 
 
 def _sanitize_log_str(s):
@@ -37,24 +49,43 @@ def _sanitize_log_str(s):
     return _CREDENTIALS_RE.sub(r"\1***@", s)
 
 
-# Global monkey-patch of git.cmd.Git.execute for logging and timing.
+def _record_git_call(argv, start, duration, bytes_out, exit_code):
+    if GIT_TRACE.enabled:
+        GIT_TRACE.record(argv, start, duration, bytes_out, exit_code)
+    if RUNTIME_PROFILE.enabled:
+        RUNTIME_PROFILE.add_span(
+            f"git {git_subcommand([str(a) for a in argv])}",
+            start,
+            duration,
+            category="git",
+        )
+
+
+# Global monkey-patch of git.cmd.Git.execute for logging, timing and tracing.
 # Must be done at the class level because GitPython makes `execute` read-only
 # on instances.
 def _custom_git_execute(self, *args, **kwargs):
-    call_stack = get_call_stack()
-
+    argv = args[0]
+    indent = ""
     if VMN_LOGGER:
-        raw_cmd = ' '.join(str(v) for v in args[0])
-        VMN_LOGGER.debug(
-            f"{BOLD_CHAR}{'  ' * (len(call_stack) - 1)}{_sanitize_log_str(raw_cmd)}{END_CHAR}"
-        )
+        indent = "  " * (len(get_call_stack()) - 1)
+        raw_cmd = " ".join(str(v) for v in argv)
+        if "@" in raw_cmd:
+            raw_cmd = _sanitize_log_str(raw_cmd)
+        VMN_LOGGER.debug(f"{BOLD_CHAR}{indent}{raw_cmd}{END_CHAR}")
 
     original_execute = getattr(self.__class__, "_execute")
     originally_extended_output = "with_extended_output" in kwargs
     kwargs["with_extended_output"] = True
 
     start_time = time.perf_counter()
-    ret = original_execute(self, *args, **kwargs)
+    try:
+        ret = original_execute(self, *args, **kwargs)
+    except git.exc.GitCommandError as exc:
+        _record_git_call(
+            argv, start_time, time.perf_counter() - start_time, 0, exc.status
+        )
+        raise
     end_time = time.perf_counter()
 
     ret_code = 0
@@ -74,13 +105,19 @@ def _custom_git_execute(self, *args, **kwargs):
             ret_code = 1
 
     time_took = end_time - start_time
+    bytes_out = len(sout) if sout else 0
+
+    _record_git_call(argv, start_time, time_took, bytes_out, ret_code)
 
     if VMN_LOGGER:
+        # The output itself can be huge (tag listings); only its size is
+        # logged, and stderr when the command failed
         VMN_LOGGER.debug(
-            f"{'  ' * (len(call_stack) - 1)}return code: {ret_code}, git cmd took: {time_took:.6f} seconds.\n"
-            f"{'  ' * (len(call_stack) - 1)}stdout: {_sanitize_log_str(str(sout))}\n"
-            f"{'  ' * (len(call_stack) - 1)}stderr: {_sanitize_log_str(str(serr))}"
+            f"{indent}return code: {ret_code}, git cmd took: {time_took:.6f} "
+            f"seconds, stdout: {bytes_out} bytes"
         )
+        if ret_code and serr:
+            VMN_LOGGER.debug(f"{indent}stderr: {_sanitize_log_str(str(serr))}")
 
     return ret
 
@@ -102,40 +139,109 @@ class GitBackend(
 
         self._be = GitBackend.initialize_git_backend(repo_path, inherit_env)
 
-        self.add_git_user_cfg_if_missing()
-
         # TODO:: make selected_remote configurable.
         # Currently just selecting the first one. None when no remote is
         # configured — local read commands still work; remote-requiring
         # commands fail fast (see cli/entry.py).
         self.selected_remote = self._be.remotes[0] if self._be.remotes else None
         self.repo_path = repo_path
-        self.active_branch = self.get_active_branch()
-        self.remote_active_branch = self.get_remote_tracking_branch(self.active_branch)
+        self.tag_index = TagMetadataIndex(
+            os.path.join(repo_path, ".vmn"),
+            exclude_path=os.path.join(self._be.common_dir, "info", "exclude"),
+            work_tree=self._be.working_tree_dir,
+        )
+        self.object_reader = GitObjectReader(self._be)
+        self.ref_reader = GitRefReader(self._be.git_dir, self._be.common_dir)
+        self._version_allocation_indexes = {}
+
+        # Only reads .git/HEAD. The rest of the branch state (remote tracking
+        # branch, the branch of a detached HEAD) is resolved on first access
         self.detached_head = self.in_detached_head()
+        if not self.detached_head:
+            self.active_branch = self._be.active_branch.name
+
+    @staticmethod
+    def _read_fetch_cache(vmn_cache_path):
+        """Last fetch time per fetch scope. Older vmn versions left an empty
+        marker file here, which reads as nothing fetched yet."""
+        try:
+            with open(vmn_cache_path) as f:
+                fetch_times = json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+        return fetch_times if isinstance(fetch_times, dict) else {}
 
     @measure_runtime_decorator
-    def perform_cached_fetch(self, force=False):
-        vmn_cache_path = os.path.join(self.repo_path, ".vmn", "vmn.cache")
-        if not os.path.exists(vmn_cache_path) or force:
-            pathlib.Path(os.path.join(self.repo_path, ".vmn")).mkdir(
-                parents=True, exist_ok=True
+    def perform_cached_fetch(self, force=False, app_names=None):
+        """Fetch tags unless they were fetched in the last
+        GIT_CACHE_TTL_MINUTES.
+
+        With ``app_names`` only the tags of those apps are fetched and the
+        TTL is tracked per app. Otherwise all the tags are fetched. Without
+        a remote, scoped fetches do nothing and are not recorded.
+        """
+        vmn_dir = os.path.join(self.repo_path, ".vmn")
+        vmn_cache_path = os.path.join(vmn_dir, "vmn.cache")
+        fetch_times = self._read_fetch_cache(vmn_cache_path)
+
+        if app_names is None:
+            scopes = [_ALL_TAGS_FETCH_SCOPE]
+        else:
+            scopes = sorted(
+                {VMNBackend.app_name_to_tag_name(name) for name in app_names if name}
             )
-            pathlib.Path(vmn_cache_path).touch()
 
+        now = time.time()
+        if not force:
+            # A fetch of all the tags also refreshed every app
+            expired = now - GIT_CACHE_TTL_MINUTES * 60
+            all_fetched = fetch_times.get(_ALL_TAGS_FETCH_SCOPE, 0)
+            scopes = [
+                s for s in scopes if max(fetch_times.get(s, 0), all_fetched) < expired
+            ]
+
+        if not scopes:
+            return
+
+        if app_names is None:
             self._be.git.execute(["git", "fetch", "--tags"])
+        elif self.selected_remote is None:
+            # Nothing was fetched, so nothing is fresh
+            return
         else:
-            minutes_ago = datetime.datetime.now() - datetime.timedelta(
-                minutes=GIT_CACHE_TTL_MINUTES
-            )
-            filemtime = datetime.datetime.fromtimestamp(
-                os.path.getmtime(vmn_cache_path)
+            # Explicit refspecs: only the apps' tags are negotiated and
+            # transferred. Existing tags are not clobbered, like --tags.
+            # Versions start with a digit, so {s}_<digit>* leaves out the tags
+            # of apps whose name extends this one (app_web_1.0.0 for app).
+            # Refspecs take a single "*" and no character classes, so apps
+            # named {s}_<digit>... (app_2) still have their tags fetched too.
+            self._be.git.execute(
+                ["git", "fetch", "--no-tags", self.selected_remote.name]
+                + [
+                    f"refs/tags/{s}_{digit}*:refs/tags/{s}_{digit}*"
+                    for s in scopes
+                    for digit in range(10)
+                ]
             )
-            if filemtime < minutes_ago:
-                pathlib.Path(vmn_cache_path).touch()
-                self._be.git.execute(["git", "fetch", "--tags"])
+        self._invalidate_tag_caches()
+        self._ref_map = None
+        self._status_probe = None
+
+        for scope in scopes:
+            fetch_times[scope] = now
+
+        pathlib.Path(vmn_dir).mkdir(parents=True, exist_ok=True)
+        with open(vmn_cache_path, "w") as f:
+            json.dump(fetch_times, f)
 
     def __del__(self):
+        # Opening the repo failed, e.g. the path is not a git repository
+        if "tag_index" not in self.__dict__:
+            return
+
+        self.tag_index.close()
+        self.object_reader.close()
         self._be.close()
 
     @staticmethod
@@ -162,8 +268,9 @@ class GitBackend(
     @staticmethod
     @measure_runtime_decorator
     def get_repo_details(path):
+        # Pooled, so the dependency checks of the command reuse the backend
         try:
-            client = git.Repo(path, search_parent_directories=True)
+            be = BACKEND_POOL.get(path, lambda: GitBackend(path))
         except git.exc.InvalidGitRepositoryError:
             VMN_LOGGER.debug(f'Skipping "{path}" directory reason:\n', exc_info=True)
             return None
@@ -171,8 +278,9 @@ class GitBackend(
             VMN_LOGGER.debug(f'Skipping "{path}" directory reason:\n', exc_info=True)
             return None
 
+        client = be._be
         try:
-            hash = client.head.commit.hexsha
+            hash = be.changeset()
             if client.remotes:
                 remote = tuple(client.remotes[0].urls)[0]
                 if os.path.isdir(remote):
@@ -183,7 +291,5 @@ class GitBackend(
         except Exception:
             VMN_LOGGER.debug(f'Skipping "{path}" directory reason:\n', exc_info=True)
             return None
-        finally:
-            client.close()
 
         return hash, remote, "git"
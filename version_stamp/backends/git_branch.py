@@ -1,13 +1,87 @@
 #!/usr/bin/env python3
 """Git backend mixin: branch, checkout, and state-check operations."""
+from version_stamp.backends.ref_map import GitRefMap
+from version_stamp.backends.status_probe import GitStatusProbe
 from version_stamp.core.logging import VMN_LOGGER, measure_runtime_decorator
 
+_UNRESOLVED = object()
+
 
 class GitBranchMixin:
     """Methods for branch management and state checks. Mixed into GitBackend."""
 
+    # Built on first use, reset to None whenever vmn moves branch refs
+    _ref_map = None
+    # Same for the working tree state; also reset when vmn touches files
+    _status_probe = None
+
+    # Resolved on first access; resolving the active branch of a detached
+    # HEAD can run `git branch --contains` and even create a tracking branch
+    _active_branch = _UNRESOLVED
+    _remote_active_branch = _UNRESOLVED
+    _detached_head = _UNRESOLVED
+
+    # Branch containment answers. Commits never change, so (sha, tip sha)
+    # ancestry holds forever; the branch picked for a sha holds for the
+    # command the backend is pooled for
+    _ancestry_cache = None
+    _changeset_branch_cache = None
+
+    @property
+    def ref_map(self):
+        if self._ref_map is None:
+            self._ref_map = GitRefMap(self._be)
+
+        return self._ref_map
+
+    @property
+    def status_probe(self):
+        if self._status_probe is None:
+            self._status_probe = GitStatusProbe(self._be)
+
+        return self._status_probe
+
+    @property
+    def active_branch(self):
+        if self._active_branch is _UNRESOLVED:
+            self._active_branch = self.get_active_branch()
+
+        return self._active_branch
+
+    @active_branch.setter
+    def active_branch(self, value):
+        self._active_branch = value
+
+    @property
+    def remote_active_branch(self):
+        if self._remote_active_branch is _UNRESOLVED:
+            self._remote_active_branch = self.get_remote_tracking_branch(
+                self.active_branch
+            )
+
+        return self._remote_active_branch
+
+    @remote_active_branch.setter
+    def remote_active_branch(self, value):
+        self._remote_active_branch = value
+
+    @property
+    def detached_head(self):
+        if self._detached_head is _UNRESOLVED:
+            self._detached_head = self.in_detached_head()
+
+        return self._detached_head
+
+    @detached_head.setter
+    def detached_head(self, value):
+        self._detached_head = value
+
     def in_detached_head(self):
-        return self._be.head.is_detached
+        detached = self.ref_reader.is_detached()
+        if detached is None:
+            return self._be.head.is_detached
+
+        return detached
 
     @measure_runtime_decorator
     def get_active_branch(self):
@@ -19,18 +93,63 @@ class GitBranchMixin:
 
         return active_branch
 
+    def _is_ancestor(self, hexsha, tip_hexsha):
+        if hexsha == tip_hexsha:
+            return True
+
+        if self._ancestry_cache is None:
+            self._ancestry_cache = {}
+
+        key = (hexsha, tip_hexsha)
+        if key not in self._ancestry_cache:
+            # merge-base --is-ancestor stops at the first generation below
+            # the commit instead of walking every branch like --contains
+            self._ancestry_cache[key] = self._be.is_ancestor(hexsha, tip_hexsha)
+
+        return self._ancestry_cache[key]
+
+    @measure_runtime_decorator
+    def get_containing_branch(self, hexsha, candidates):
+        """The first of the ``candidates`` branch names whose local or
+        remote tip contains ``hexsha``, or None."""
+        remote_name = self.selected_remote.name if self.selected_remote else None
+        for branch in candidates:
+            tips = (
+                self.ref_map.heads.get(branch),
+                self.ref_map.remotes.get(f"{remote_name}/{branch}"),
+            )
+            for tip in tips:
+                if tip is not None and self._is_ancestor(hexsha, tip):
+                    return branch
+
+        return None
+
     @measure_runtime_decorator
     def get_branch_from_changeset(self, hexsha):
-        out = self._be.git.branch("--contains", hexsha)
+        if self._changeset_branch_cache is None:
+            self._changeset_branch_cache = {}
+
+        if hexsha not in self._changeset_branch_cache:
+            self._changeset_branch_cache[hexsha] = self._find_branch_of_changeset(
+                hexsha
+            )
 
-        branches = out.splitlines()
+        return self._changeset_branch_cache[hexsha]
+
+    def _find_branch_of_changeset(self, hexsha):
+        # A branch whose tip is the commit needs no history walk
+        active_branches = sorted(
+            branch for branch, tip in self.ref_map.heads.items() if tip == hexsha
+        )
+        if not active_branches:
+            out = self._be.git.branch("--contains", hexsha)
 
-        # Clean up each branch name by stripping whitespace and the '*' character
-        active_branches = []
-        for branch in branches:
-            cleaned_branch = branch.strip().lstrip("*").strip()
-            if "HEAD detached" not in cleaned_branch:
-                active_branches.append(cleaned_branch)
+            # Clean up each branch name by stripping whitespace and the '*'
+            # character
+            for branch in out.splitlines():
+                cleaned_branch = branch.strip().lstrip("*").strip()
+                if "HEAD detached" not in cleaned_branch:
+                    active_branches.append(cleaned_branch)
 
         if len(active_branches) > 1:
             VMN_LOGGER.info(
@@ -40,12 +159,21 @@ class GitBranchMixin:
             )
 
         if not active_branches:
-            out = self._be.git.branch("-r", "--contains", hexsha)
-            # Filter out symbolic refs (e.g., "origin/HEAD -> origin/main")
-            remote_branches = [
-                stripped for b in out.split("\n")
-                if (stripped := b.strip()) and "->" not in stripped
-            ]
+            remote_branches = []
+            if self.selected_remote is not None:
+                remote_prefix = f"{self.selected_remote.name}/"
+                remote_branches = sorted(
+                    branch
+                    for branch, tip in self.ref_map.remotes.items()
+                    if tip == hexsha and branch.startswith(remote_prefix)
+                )
+            if not remote_branches:
+                out = self._be.git.branch("-r", "--contains", hexsha)
+                # Filter out symbolic refs (e.g., "origin/HEAD -> origin/main")
+                remote_branches = [
+                    stripped for b in out.split("\n")
+                    if (stripped := b.strip()) and "->" not in stripped
+                ]
             out = remote_branches[0] if remote_branches else None
 
             if not out:
@@ -59,6 +187,8 @@ class GitBranchMixin:
             )
             self._be.git.branch(local_branch_name, out)
             self._be.git.branch(f"--set-upstream-to={out}", local_branch_name)
+            self._ref_map = None
+            self._status_probe = None
 
             VMN_LOGGER.debug(
                 f"Setting local branch {local_branch_name} "
@@ -68,7 +198,7 @@ class GitBranchMixin:
             self.active_branch = local_branch_name
             self.remote_active_branch = out
 
-            remote_branch_hexsha = self._be.refs[out].commit.hexsha
+            remote_branch_hexsha = self.ref_map.remotes.get(out)
             if remote_branch_hexsha == hexsha:
                 ret = self.checkout_branch()
                 assert ret is not None
@@ -89,7 +219,13 @@ class GitBranchMixin:
 
         assert rev is not None
 
+        # The branch state describes where vmn started, pin it before HEAD moves
+        self.remote_active_branch
+
         self._be.git.checkout(rev)
+        self._ref_map = None
+        self._status_probe = None
+        self._commit_ranges = None
 
         self.detached_head = self.in_detached_head()
 
@@ -114,33 +250,31 @@ class GitBranchMixin:
         if self.selected_remote is None:
             return None
 
-        command = [
-            "git",
-            "rev-parse",
-            "--abbrev-ref",
-            "--symbolic-full-name",
-            f"{local_branch_name}@{{u}}",
-        ]
-
-        try:
-            ret = self._be.git.execute(command)
-
-            try:
-                assert ret.startswith(self.selected_remote.name)
-            except Exception:
-                VMN_LOGGER.warning(
-                    f"Found remote branch {ret} however it belongs to a "
-                    f"different remote that vmn has selected to work with. "
-                    f"Will behave like no remote was found. The remote that vmn has "
-                    f"selected to work with is: {self.selected_remote.name}"
-                )
+        probe = self._status_probe
+        if (
+            probe is not None
+            and probe.branch == local_branch_name
+            and probe.ahead is not None
+        ):
+            # The status probe saw the upstream and its ref
+            ret = probe.upstream
+        else:
+            ret = self.ref_map.upstream(local_branch_name)
+        if ret is None:
+            return None
 
-                return None
+        if not ret.startswith(self.selected_remote.name):
+            VMN_LOGGER.warning(
+                f"Found remote branch {ret} however it belongs to a "
+                f"different remote that vmn has selected to work with. "
+                f"Will behave like no remote was found. The remote that vmn has "
+                f"selected to work with is: {self.selected_remote.name}"
+            )
 
-            return ret
-        except Exception:
             return None
 
+        return ret
+
     @measure_runtime_decorator
     def prepare_for_remote_operation(self):
         if self.selected_remote is None:
@@ -203,22 +337,37 @@ class GitBranchMixin:
                 f"Failed to set upstream branch for {local_branch_name}:", exc_info=True
             )
             return 1
+        finally:
+            self._ref_map = None
+            self._status_probe = None
 
         self.remote_active_branch = out
 
         return 0
 
     @measure_runtime_decorator
-    def check_for_pending_changes(self):
-        if self._be.is_dirty():
+    def check_for_pending_changes(self, paths=None):
+        """Pending changes anywhere in the repo, or only under ``paths``."""
+        paths = tuple(paths) if paths else None
+        if self._status_probe is None or self._status_probe.paths != paths:
+            self._status_probe = GitStatusProbe(self._be, paths)
+
+        if self._status_probe.dirty:
             err = f"Pending changes in {self.root()}."
             return err
 
         return None
 
     @measure_runtime_decorator
-    def check_for_outgoing_changes(self):
-        if self.in_detached_head():
+    def check_for_outgoing_changes(self, fresh=False):
+        # The status probe and the ref map are memoized; re-checks that wait
+        # for the repository to change must re-read them
+        if fresh:
+            self._status_probe = None
+            self._ref_map = None
+
+        probe = self.status_probe
+        if probe.detached:
             err = f"Detached head in {self.root()}."
             return err
 
@@ -232,9 +381,21 @@ class GitBranchMixin:
             return err
 
         branch_name = self.active_branch
-        try:
-            self._be.git.rev_parse("--verify", f"{self.remote_active_branch}")
-        except Exception:
+        outgoing_err = (
+            f"Outgoing changes in {self.root()} "
+            f"from branch {branch_name} "
+            f"({self.remote_active_branch}..{branch_name})"
+        )
+        # The probe already counted the commits ahead of the upstream
+        if (
+            probe.branch == branch_name
+            and probe.upstream == self.remote_active_branch
+            and probe.ahead is not None
+        ):
+            return outgoing_err if probe.ahead else None
+
+        remote_hexsha = self.ref_map.remotes.get(self.remote_active_branch)
+        if remote_hexsha is None:
             err = (
                 f"Remote branch {self.remote_active_branch} does not exist. "
                 "Please set-upstream branch to "
@@ -242,6 +403,9 @@ class GitBranchMixin:
             )
             return err
 
+        if self.ref_map.heads.get(branch_name) == remote_hexsha:
+            return None
+
         outgoing = tuple(
             self._be.iter_commits(
                 f"{self.remote_active_branch}..{branch_name}", max_count=1
@@ -249,12 +413,6 @@ class GitBranchMixin:
         )
 
         if outgoing:
-            err = (
-                f"Outgoing changes in {self.root()} "
-                f"from branch {branch_name} "
-                f"({self.remote_active_branch}..{branch_name})"
-            )
-
-            return err
+            return outgoing_err
 
         return None
@@ -1,22 +1,45 @@
 #!/usr/bin/env python3
 """Git backend mixin: changeset, deps, revert, commit history."""
 import configparser
+import hashlib
 import os
 import re
 
 import git
 
-from version_stamp.backends.iterators import CommitInfoIterator, CommitMessageIterator
+from version_stamp.backends.iterators import (
+    CommitInfoIterator,
+    CommitLogIterator,
+    CommitMessageIterator,
+    CommitRangeCache,
+)
 from version_stamp.compat.tag_format_039 import try_commit_with_dot_zero_suffix
-from version_stamp.core.constants import INIT_COMMIT_MESSAGE, VMN_USER_NAME
+from version_stamp.core.constants import (
+    INIT_COMMIT_MESSAGE,
+    SHALLOW_DEEPEN_FIRST_DEPTH,
+    SHALLOW_DEEPEN_MAX_FETCHES,
+    VMN_USER_NAME,
+)
 from version_stamp.core.logging import VMN_LOGGER, measure_runtime_decorator
 
 
 class GitHistoryMixin:
     """Methods for changeset, deps, revert, log inspection. Mixed into GitBackend."""
 
+    _git_user_cfg_checked = False
+    # (tag name, to_hex) -> CommitRangeCache of that range's git log
+    _commit_ranges = None
+    # What the last deepening of a shallow clone fetched, None if none ran
+    deepen_stats = None
+
     @measure_runtime_decorator
     def add_git_user_cfg_if_missing(self):
+        """Make git commands that record an identity (e.g. annotated tags)
+        work in repos without a configured user. Checked once."""
+        if self._git_user_cfg_checked:
+            return
+
+        self._git_user_cfg_checked = True
         try:
             reader = self._be.config_reader()
             reader.get_value("user", "name")
@@ -43,8 +66,24 @@ class GitHistoryMixin:
 
         return actual_deps_state
 
+    @staticmethod
+    def _user_changeset_key(hexsha, version_files, name):
+        files = "\0".join(sorted(version_files))
+        digest = hashlib.sha1(f"{name}\0{files}".encode("utf-8")).hexdigest()
+
+        return f"{hexsha}:{digest}"
+
     @measure_runtime_decorator
     def get_last_user_changeset(self, version_files_to_track_diff_off, name):
+        # Behind a vmn commit the answer only depends on the commit and the
+        # version files, so it is looked up once and kept in the tag index
+        key = self._user_changeset_key(
+            self.changeset(), version_files_to_track_diff_off, name
+        )
+        cached = self.tag_index.get_user_changeset(key)
+        if cached is not None:
+            return cached
+
         p = self._be.head.commit
         if p.author.name != VMN_USER_NAME:
             return p.hexsha
@@ -75,8 +114,13 @@ class GitHistoryMixin:
                 # TODO:: think if we want to support cases where file changed
                 #  multiple times but eventually it came to be the same
                 if name in ret_d and len(ret_list) > 1 and ret_list[0][0] != name:
+                    self.tag_index.put_user_changeset(key, ret_list[0][1])
                     return ret_list[0][1]
 
+                # vmn's commit changed the version files, no log means the
+                # log failed (e.g. missing history): don't remember that
+                if ret_list or not version_files_to_track_diff_off:
+                    self.tag_index.put_user_changeset(key, prev_user_commit)
                 return prev_user_commit
 
         VMN_LOGGER.warning(
@@ -101,10 +145,14 @@ class GitHistoryMixin:
     @measure_runtime_decorator
     def changeset(self, tag=None, short=False):
         if tag is None:
+            # Straight from the ref files, git only for what they can't answer
+            hexsha = self.ref_reader.resolve("HEAD")
+            if hexsha is None:
+                hexsha = self._be.head.commit.hexsha
             if short:
-                return self._be.head.commit.hexsha[:6]
+                return hexsha[:6]
 
-            return self._be.head.commit.hexsha
+            return hexsha
 
         found_tag = self._be.tag(f"refs/tags/{tag}")
 
@@ -135,6 +183,8 @@ class GitHistoryMixin:
                     f"Failed to git checkout files: {files}", exc_info=True
                 )
 
+            self._status_probe = None
+
     @measure_runtime_decorator
     def revert_vmn_commit(self, prev_changeset, version_files, tags=[]):
         self.revert_local_changes(version_files)
@@ -158,6 +208,10 @@ class GitHistoryMixin:
 
                 continue
 
+        self._invalidate_tag_caches()
+        self._ref_map = None
+        self._status_probe = None
+        self._commit_ranges = None
         try:
             self._be.git.fetch("--tags")
         except Exception:
@@ -166,7 +220,12 @@ class GitHistoryMixin:
 
     @measure_runtime_decorator
     def get_commit_object_from_commit_hex(self, hex):
-        return self._be.commit(hex)
+        commit_obj = self.object_reader.read_commit(hex)
+        if commit_obj is None:
+            # Let GitPython raise its usual error for unknown revisions
+            return self._be.commit(hex)
+
+        return commit_obj
 
     @measure_runtime_decorator
     def get_commit_object_from_tag_name(self, tag_name):
@@ -216,19 +275,137 @@ class GitHistoryMixin:
             VMN_LOGGER.error(f"An error occurred when tried to parse log: {e}")
             return {}, []
 
+    def _shallow_commits(self):
+        """The commits whose parents a shallow clone does not have."""
+        try:
+            with open(os.path.join(self._be.common_dir, "shallow"), "r") as f:
+                return {line.strip() for line in f if line.strip()}
+        except OSError:
+            return set()
+
+    def _range_is_cut(self, from_hex, to_hex):
+        """Whether the shallow boundary cuts the range from_hex..to_hex.
+
+        Below a shallow commit the walk just stops, so the range is only
+        complete when none of its commits is one.
+        """
+        shallow = self._shallow_commits()
+        if not shallow:
+            return False
+
+        in_range = self._be.git.rev_list(f"{from_hex}..{to_hex}").split()
+
+        return not shallow.isdisjoint(in_range)
+
+    def _pack_size_kib(self):
+        sizes = {}
+        for line in self._be.git.count_objects("-v").splitlines():
+            key, _, value = line.partition(": ")
+            sizes[key] = value
+
+        return int(sizes.get("size", 0)) + int(sizes.get("size-pack", 0))
+
+    @measure_runtime_decorator
+    def deepen_to_range(self, from_hex, to_hex="HEAD"):
+        """Fetch just enough history of a shallow clone to walk from_hex..to_hex.
+
+        Deepens in fetches of doubling depth until the range no longer
+        crosses the shallow boundary, and only unshallows when that takes
+        more than SHALLOW_DEEPEN_MAX_FETCHES fetches. What was fetched is
+        kept in ``deepen_stats``.
+        """
+        if not self._range_is_cut(from_hex, to_hex):
+            return
+
+        if self.selected_remote is None:
+            VMN_LOGGER.warning(
+                f"{self.repo_path}: shallow clone without a git remote, "
+                f"the history since {from_hex} may be incomplete"
+            )
+            return
+
+        size_before = self._pack_size_kib()
+        depth = SHALLOW_DEEPEN_FIRST_DEPTH
+        fetches = 0
+        deepened = 0
+        complete = False
+        while fetches < SHALLOW_DEEPEN_MAX_FETCHES:
+            self._be.git.execute(
+                ["git", "fetch", f"--deepen={depth}", self.selected_remote.name]
+            )
+            fetches += 1
+            deepened += depth
+            if not self._range_is_cut(from_hex, to_hex):
+                complete = True
+                break
+
+            depth *= 2
+
+        if not complete:
+            self._be.git.execute(
+                ["git", "fetch", "--unshallow", self.selected_remote.name]
+            )
+            fetches += 1
+            deepened = None
+
+        # The fetches also moved remote-tracking branches and followed tags
+        self._invalidate_tag_caches()
+        self._ref_map = None
+        self._status_probe = None
+        self.deepen_stats = {
+            "fetches": fetches,
+            # The --deepen depths requested; None once the history was unshallowed
+            "depth": deepened,
+            "kib": max(0, self._pack_size_kib() - size_before),
+        }
+        VMN_LOGGER.info(
+            f"{self.repo_path}: deepened the shallow clone"
+            + (f" by {deepened} commits" if deepened else " to its full history")
+            + f" ({self.deepen_stats['kib']} KiB in {fetches} fetches) "
+            f"to reach {from_hex}"
+        )
+
     def _iter_commits_in_range(self, tag_name, to_hex="HEAD"):
-        """Return a raw GitPython commit iterator for the range tag..to_hex."""
-        from_hex = self._be.tags[tag_name].commit
+        """Stream the commits of the range tag..to_hex, newest first, as
+        (hexsha, author, message) records of a single git log."""
+        from_hex = self._be.tags[tag_name].commit.hexsha
+        self.deepen_to_range(from_hex, to_hex)
+
+        # Signature checks and colors from the user's config would mix into
+        # the NUL separated records
+        proc = self._be.git.log(
+            "--no-show-signature",
+            "--no-color",
+            CommitLogIterator.FORMAT,
+            f"{from_hex}..{to_hex}",
+            as_process=True,
+        )
+
+        return CommitLogIterator(proc)
+
+    def _get_commit_range(self, tag_name, to_hex="HEAD"):
+        """The shared walk of tag_name..to_hex.
+
+        A stamp reads the range since the previous version several times
+        (release mode detection, changelog, release notes), so the range is
+        walked once per command and the readers share it. The entry is kept
+        across vmn's own stamp commit, which is not one of the range's
+        changes, and dropped when HEAD moves to other commits.
+        """
+        if self._commit_ranges is None:
+            self._commit_ranges = {}
 
-        shallow = os.path.exists(os.path.join(self._be.common_dir, "shallow"))
-        if shallow:
-            self._be.git.execute(["git", "fetch", "--unshallow"])
+        key = (tag_name, to_hex)
+        commits = self._commit_ranges.get(key)
+        if commits is None or commits.failed:
+            commits = CommitRangeCache(self._iter_commits_in_range(tag_name, to_hex))
+            self._commit_ranges[key] = commits
 
-        return self._be.iter_commits(f"{from_hex}..{to_hex}")
+        return commits
 
     def get_commits_range_iter(self, tag_name, to_hex="HEAD"):
-        return CommitMessageIterator(self._iter_commits_in_range(tag_name, to_hex))
+        return CommitMessageIterator(iter(self._get_commit_range(tag_name, to_hex)))
 
     def get_commits_info_iter(self, tag_name, to_hex="HEAD"):
         """Like get_commits_range_iter but yields (message, short_hash) tuples."""
-        return CommitInfoIterator(self._iter_commits_in_range(tag_name, to_hex))
+        return CommitInfoIterator(iter(self._get_commit_range(tag_name, to_hex)))
@@ -6,9 +6,24 @@ from urllib.parse import quote as urlquote
 
 import git
 
-from version_stamp.core.constants import TAG_CHRONOLOGICAL_SPACING_SECONDS
+from version_stamp.core.constants import PUSH_OPTIONS_CONFIG_KEY, TAG_ORDER_KEY
 from version_stamp.core.logging import VMN_LOGGER, measure_runtime_decorator
 
+_last_tag_order = 0
+
+# What git prints when the receiving end lacks a push capability
+_PUSH_OPTIONS_UNSUPPORTED = "does not support push options"
+_ATOMIC_UNSUPPORTED = "does not support --atomic"
+
+
+def _next_tag_order():
+    """Nanosecond creation stamp, strictly increasing within the process."""
+    global _last_tag_order
+
+    _last_tag_order = max(time.time_ns(), _last_tag_order + 1)
+
+    return _last_tag_order
+
 
 class GitOpsMixin:
     """Methods for basic git operations. Mixed into GitBackend."""
@@ -87,68 +102,111 @@ class GitOpsMixin:
                 exc_info=True,
             )
 
-    def _push_with_ci_skip_fallback(self, refspec):
-        """Push a refspec, trying with -o ci.skip first, falling back to without."""
-        push_target = self._get_push_target()
+    def _push_options_config_section(self):
+        return f'remote "{self.selected_remote.name}"'
+
+    def _remote_supports_push_options(self):
+        """False once a push to the selected remote showed that it rejects
+        push options. Remembered in the repository's git config."""
         try:
-            self._be.git.execute(
-                [
-                    "git",
-                    "push",
-                    "--porcelain",
-                    "-o",
-                    "ci.skip",
-                    push_target,
-                    refspec,
-                ]
+            supported = self._be.config_reader().get_value(
+                self._push_options_config_section(), PUSH_OPTIONS_CONFIG_KEY, True
             )
         except Exception:
-            self._be.git.execute(
-                [
-                    "git",
-                    "push",
-                    "--porcelain",
-                    push_target,
-                    refspec,
-                ]
-            )
+            VMN_LOGGER.debug("Failed to read push options support", exc_info=True)
+            return True
+
+        return supported is not False
+
+    def _remember_push_options_unsupported(self):
+        try:
+            with self._be.config_writer() as writer:
+                writer.set_value(
+                    self._push_options_config_section(),
+                    PUSH_OPTIONS_CONFIG_KEY,
+                    "false",
+                )
+        except Exception:
+            VMN_LOGGER.debug("Failed to store push options support", exc_info=True)
+
+    def _push_with_ci_skip_fallback(self, *refspecs):
+        """Push refspecs in one go, atomically when there are several.
+
+        Pushes with -o ci.skip unless the remote is known not to support push
+        options. When git reports that the remote rejects push options, the
+        remote is remembered as such and the push is retried without them.
+        A remote that rejects --atomic gets a non-atomic push. Any other
+        failure is raised.
+        """
+        push_target = self._get_push_target()
+        push_options = self._remote_supports_push_options()
+        atomic = len(refspecs) > 1
+
+        while True:
+            cmd = ["git", "push", "--porcelain"]
+            if atomic:
+                cmd.append("--atomic")
+            if push_options:
+                cmd.extend(["-o", "ci.skip"])
+
+            try:
+                self._be.git.execute(cmd + [push_target, *refspecs])
+                return
+            except git.exc.GitCommandError as exc:
+                stderr = str(exc.stderr)
+                if atomic and _ATOMIC_UNSUPPORTED in stderr:
+                    VMN_LOGGER.warning(
+                        f"Remote {self.selected_remote.name} does not support "
+                        "atomic pushes. Pushing the refs non-atomically"
+                    )
+                    atomic = False
+                elif push_options and _PUSH_OPTIONS_UNSUPPORTED in stderr:
+                    push_options = False
+                    self._remember_push_options_unsupported()
+                else:
+                    raise
 
     @measure_runtime_decorator
     def tag(self, tags, messages, ref="HEAD", push=False):
         if push and self.selected_remote is None:
             raise RuntimeError("Will not push tag without a configured remote")
 
+        self.add_git_user_cfg_if_missing()
+
         for tag, message in zip(tags, messages):
-            # This is required in order to preserver chronological order when
-            # listing tags since the taggerdate field is in seconds resolution
-            time.sleep(TAG_CHRONOLOGICAL_SPACING_SECONDS)
+            # The taggerdate field is in seconds resolution. Record a finer
+            # creation order in the (YAML) message for tag lookups to sort by
+            message = f"{message.rstrip()}\n{TAG_ORDER_KEY}: {_next_tag_order()}\n"
 
             self._be.create_tag(tag, ref=ref, message=message)
+        self._invalidate_tag_caches()
 
-            if not push:
-                continue
+        if not push or not tags:
+            return
 
-            try:
-                self._push_with_ci_skip_fallback(f"refs/tags/{tag}")
-            except Exception:
-                tag_err_str = f"Failed to tag {tag}. Reverting.."
-                VMN_LOGGER.error(tag_err_str)
+        try:
+            self._push_with_ci_skip_fallback(*(f"refs/tags/{tag}" for tag in tags))
+        except Exception:
+            tag_err_str = f"Failed to tag {', '.join(tags)}. Reverting.."
+            VMN_LOGGER.error(tag_err_str)
 
+            for tag in tags:
                 try:
                     self._be.delete_tag(tag)
                 except Exception:
                     err_str = f"Failed to remove tag {tag}"
                     VMN_LOGGER.info(err_str)
                     VMN_LOGGER.debug("Exception info: ", exc_info=True)
+            self._invalidate_tag_caches()
 
-                raise RuntimeError(tag_err_str)
+            raise RuntimeError(tag_err_str)
 
     @measure_runtime_decorator
     def push_tags(self, tags):
         if self.selected_remote is None:
             raise RuntimeError("No git remote is configured; cannot push tags")
-        for tag in tags:
-            self._push_with_ci_skip_fallback(f"refs/tags/{tag}")
+        if tags:
+            self._push_with_ci_skip_fallback(*(f"refs/tags/{tag}" for tag in tags))
 
     @measure_runtime_decorator
     def push(self, tags=()):
@@ -168,9 +226,12 @@ class GitOpsMixin:
             self.remote_active_branch.split(f"{self.selected_remote.name}/")
         )
 
+        # The branch and all the tags go in one atomic push: either the remote
+        # gets the whole stamp or nothing of it
         try:
             self._push_with_ci_skip_fallback(
-                f"refs/heads/{self.active_branch}:{remote_branch_name_no_remote_name}"
+                f"refs/heads/{self.active_branch}:{remote_branch_name_no_remote_name}",
+                *(f"refs/tags/{tag}" for tag in tags),
             )
         except Exception:
             err_str = "Push has failed. Please verify that 'git push' works"
@@ -180,8 +241,9 @@ class GitOpsMixin:
         if self._push_user and self._push_token:
             self._update_remote_tracking_ref(remote_branch_name_no_remote_name)
 
-        for tag in tags:
-            self._push_with_ci_skip_fallback(f"refs/tags/{tag}")
+        # The remote-tracking branch moved
+        self._ref_map = None
+        self._status_probe = None
 
     @measure_runtime_decorator
     def pull(self):
@@ -191,6 +253,11 @@ class GitOpsMixin:
             )
             return
 
+        self.add_git_user_cfg_if_missing()
+        self._invalidate_tag_caches()
+        self._ref_map = None
+        self._status_probe = None
+        self._commit_ranges = None
         if self.detached_head:
             VMN_LOGGER.info(
                 f"{self.repo_path}: in detached HEAD – fetching instead of pulling"
@@ -202,12 +269,31 @@ class GitOpsMixin:
 
     @measure_runtime_decorator
     def commit(self, message, user, include=None):
+        self.add_git_user_cfg_if_missing()
         if include is not None:
             for file in include:
                 self._be.index.add(file)
         author = git.Actor(user, user)
 
         self._be.index.commit(message=message, author=author)
+        self._ref_map = None
+        self._status_probe = None
+
+    @measure_runtime_decorator
+    def write_commit_graph(self):
+        """Write the commit-graph, with changed-path bloom filters, and pack
+        the refs.
+
+        The commit-graph speeds up ancestry walks (``--contains``,
+        ``--ancestry-path``, date-ordered logs) and the bloom filters let
+        path-limited logs skip commits that did not touch the paths. The
+        graph is written as a new split layer on top of the existing ones,
+        so repeated runs only add the commits that are new since the last.
+        """
+        self._be.git.commit_graph(
+            "write", "--reachable", "--changed-paths", "--split"
+        )
+        self._be.git.pack_refs("--all")
 
     @measure_runtime_decorator
     def root(self):
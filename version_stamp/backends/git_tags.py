@@ -1,10 +1,14 @@
 #!/usr/bin/env python3
 """Git backend mixin: tag lookup, version info retrieval."""
 import os
+import re
 
+import git
 import yaml
+from git.util import hex_to_bin
 
 from version_stamp.backends.base import VMNBackend
+from version_stamp.backends.iterators import GitRecordIterator
 from version_stamp.compat.tag_format_039 import (
     parse_automatic_tag_message,
     try_tag_with_dot_zero_suffix,
@@ -14,10 +18,22 @@ from version_stamp.core.constants import (
     RELATIVE_TO_CURRENT_VCS_BRANCH_TYPE,
     RELATIVE_TO_CURRENT_VCS_POSITION_TYPE,
     RELATIVE_TO_GLOBAL_TYPE,
+    TAG_ORDER_KEY,
     VMN_USER_NAME,
 )
 from version_stamp.core.logging import VMN_LOGGER, measure_runtime_decorator
-from version_stamp.core.utils import _clean_split_result
+from version_stamp.core.utils import _clean_split_result, get_tag_order
+from version_stamp.core.version_allocation import VersionAllocationIndex
+
+# Fields read per tag ref by a single `git for-each-ref` pass. The `*`
+# variants describe the peeled (tagged) commit.
+_TAG_REF_FIELDS = (
+    ("name", "refname:strip=2"),
+    ("object", "objectname"),
+    ("commit", "*objectname"),
+    ("tagged_date", "taggerdate:unix"),
+    ("author", "*authorname"),
+)
 
 
 class GitTagsMixin:
@@ -41,7 +57,7 @@ class GitTagsMixin:
 
         shallow = os.path.exists(os.path.join(self._be.common_dir, "shallow"))
         if shallow:
-            self.perform_cached_fetch()
+            self.perform_cached_fetch(app_names=[app_name])
             (
                 tag_names,
                 cobj,
@@ -60,34 +76,62 @@ class GitTagsMixin:
 
     @staticmethod
     def _sorted_tag_names_from_ver_infos(ver_infos, filter_none=False):
-        """Extract tag names from ver_infos, sorted newest first by tagged_date."""
-        tag_objects = [
-            vi["tag_object"] for vi in ver_infos.values()
+        """Extract tag names from ver_infos, sorted newest first by creation order."""
+        tag_names = [
+            tname for tname, vi in ver_infos.items()
             if not filter_none or vi["tag_object"] is not None
         ]
-        tag_objects.sort(key=lambda t: t.object.tagged_date, reverse=True)
-        return [t.name for t in tag_objects]
+        tag_names.sort(key=lambda t: ver_infos[t]["tag_order"], reverse=True)
+        return tag_names
+
+    @staticmethod
+    def _has_app_tag(ver_infos, app_name):
+        """Whether ``ver_infos`` hold a tag of ``app_name``. A stamp commit
+        found by its message may only carry the tags of other apps."""
+        # Compared as tag names: "/" and "-" are the same there
+        tag_app_name = VMNBackend.app_name_to_tag_name(app_name)
+        for tname in ver_infos:
+            try:
+                props = VMNBackend.deserialize_tag_name(tname)
+                if VMNBackend.app_name_to_tag_name(props.app_name) == tag_app_name:
+                    return True
+            except Exception:
+                VMN_LOGGER.debug(f"Failed to deserialize tag {tname}", exc_info=True)
+
+        return False
 
     @measure_runtime_decorator
     def _get_first_reachable_vmn_stamp_tag_list(self, app_name, cmd_suffix, msg_filter):
-        cobj, ver_infos = self._get_top_vmn_commit(app_name, cmd_suffix, msg_filter)
-        bug_limit = MAX_COMMIT_SEARCH_ITERATIONS
-        bug_limit_c = 0
-        while not ver_infos and bug_limit_c < bug_limit:
-            if cobj is None:
-                break
-
-            cmd_suffix = f"{cobj.hexsha}~1"
-            cobj, ver_infos = self._get_top_vmn_commit(app_name, cmd_suffix, msg_filter)
-
-            bug_limit_c += 1
-            if bug_limit_c == bug_limit:
-                VMN_LOGGER.warning(
-                    "Probable bug: vmn failed to find "
-                    f"vmn's commit after {bug_limit} iterations."
+        # One streaming walk over vmn's stamp commits. Stamp commits without
+        # parseable tags (rebased, tag removed) are skipped as they stream by.
+        cobj = None
+        ver_infos = {}
+        records = self._iter_vmn_stamp_commits(cmd_suffix, msg_filter)
+        try:
+            for bug_limit_c, record in enumerate(records):
+                if bug_limit_c == MAX_COMMIT_SEARCH_ITERATIONS:
+                    VMN_LOGGER.warning(
+                        "Probable bug: vmn failed to find "
+                        f"vmn's commit after {MAX_COMMIT_SEARCH_ITERATIONS} iterations."
+                    )
+                    ver_infos = {}
+                    break
+
+                if not record:
+                    continue
+
+                cobj, ver_infos = self._get_vmn_commit_from_log_record(
+                    app_name, record
                 )
+                if self._has_app_tag(ver_infos, app_name):
+                    break
+
                 ver_infos = {}
-                break
+            else:
+                if not ver_infos:
+                    cobj = None
+        finally:
+            records.close()
 
         tag_names = self._sorted_tag_names_from_ver_infos(ver_infos)
 
@@ -99,59 +143,72 @@ class GitTagsMixin:
     ):
         cobj, ver_infos = self._get_top_vmn_commit(app_name, cmd_suffix, msg_filter)
 
-        if ver_infos:
+        if self._has_app_tag(ver_infos, app_name):
             tag_names = self._sorted_tag_names_from_ver_infos(ver_infos)
 
             return tag_names, cobj, ver_infos
 
+        # The history is cut, so pick by dates: the newest vmn tag that is
+        # on HEAD or was created before HEAD was committed. Everything needed
+        # for that comes from one ref listing.
         tag_name_prefix = VMNBackend.app_name_to_tag_name(app_name)
-        cmd = ["--sort", "taggerdate", "--list", f"{tag_name_prefix}_*"]
-        tag_names = _clean_split_result(self._be.git.tag(*cmd).split("\n"))
+        refs = self.get_tag_refs([f"refs/tags/{tag_name_prefix}_*"])
+        if not refs:
+            return [], cobj, ver_infos
 
-        if not tag_names:
-            return tag_names, cobj, ver_infos
+        refs.sort(key=lambda r: get_tag_order(r["contents"], r["tagged_date"]))
 
-        latest_tag = tag_names[-1]
-        head_date = self._be.head.commit.committed_date
-        for tname in reversed(tag_names):
-            tname, o = self.get_tag_object_from_tag_name(tname)
-            if o:
-                if (
-                    self._be.head.commit.hexsha != o.commit.hexsha
-                    and head_date < o.object.tagged_date
-                ):
-                    continue
+        head = self.object_reader.read_commit("HEAD")
+        found_ref = refs[-1]
+        for ref in reversed(refs):
+            # Either not vmn's commit or a lightweight tag
+            if not ref["commit"] or ref["author"] != VMN_USER_NAME:
+                continue
 
-                latest_tag = tname
-                break
+            if (
+                head.hexsha != ref["commit"]
+                and head.committed_date < ref["tagged_date"]
+            ):
+                continue
+
+            found_ref = ref
+            break
 
+        # A lightweight tag points at the commit directly
+        found_commit = found_ref["commit"] or found_ref["object"]
         try:
-            found_tag = self._be.tag(f"refs/tags/{latest_tag}")
+            cobj = self.get_commit_object_from_commit_hex(found_commit)
         except Exception:
-            VMN_LOGGER.error(f"Failed to get tag object from tag name: {latest_tag}")
-            return [], cobj, ver_infos
+            VMN_LOGGER.error(
+                f"Failed to get tag object from tag name: {found_ref['name']}"
+            )
+            return [], None, ver_infos
 
-        ver_infos = self.get_all_commit_tags(found_tag.commit.hexsha)
+        ver_infos = self.get_all_commit_tags(found_commit)
         final_list_of_tag_names = self._sorted_tag_names_from_ver_infos(ver_infos, filter_none=True)
 
-        return final_list_of_tag_names, found_tag.commit, ver_infos
+        return final_list_of_tag_names, cobj, ver_infos
 
-    @measure_runtime_decorator
-    def _get_top_vmn_commit(self, app_name, cmd_suffix, msg_filter):
-        cmd = [
+    def _vmn_stamp_commits_log_args(self, cmd_suffix, msg_filter):
+        return [
             f"--grep={msg_filter}",
-            "-1",
             f"--author={VMN_USER_NAME}",
             "--pretty=%H,,,%D",
             "--decorate=short",
             cmd_suffix,
         ]
-        log_res = _clean_split_result(self._be.git.log(*cmd).split("\n"))
 
-        if not log_res:
-            return None, {}
+    def _iter_vmn_stamp_commits(self, cmd_suffix, msg_filter):
+        """Stream ``<hexsha>,,,<decorations>`` records of vmn's stamp commits."""
+        proc = self._be.git.log(
+            *self._vmn_stamp_commits_log_args(cmd_suffix, msg_filter),
+            as_process=True,
+        )
 
-        items = log_res[0].split(",,,")
+        return GitRecordIterator(proc)
+
+    def _get_vmn_commit_from_log_record(self, app_name, record):
+        items = record.split(",,,")
         tags = _clean_split_result(items[1].split(","))
 
         commit_hex = items[0]
@@ -161,10 +218,28 @@ class GitTagsMixin:
 
         return cobj, ver_infos
 
+    @measure_runtime_decorator
+    def _get_top_vmn_commit(self, app_name, cmd_suffix, msg_filter):
+        cmd = ["-1"] + self._vmn_stamp_commits_log_args(cmd_suffix, msg_filter)
+        log_res = _clean_split_result(self._be.git.log(*cmd).split("\n"))
+
+        if not log_res:
+            return None, {}
+
+        return self._get_vmn_commit_from_log_record(app_name, log_res[0])
+
+    def _get_tag_names_in_creation_order(self, patterns):
+        """Tag names matching ``patterns``, oldest first."""
+        refs = self.get_tag_refs(patterns)
+        refs.sort(key=lambda r: get_tag_order(r["contents"], r["tagged_date"]))
+
+        return [r["name"] for r in refs]
+
     @measure_runtime_decorator
     def get_latest_available_tags(self, tag_prefix_filter):
-        cmd = ["--sort", "taggerdate", "--list", tag_prefix_filter]
-        tag_names = _clean_split_result(self._be.git.tag(*cmd).split("\n"))
+        tag_names = self._get_tag_names_in_creation_order(
+            [f"refs/tags/{tag_prefix_filter}"]
+        )
 
         if not tag_names:
             return None
@@ -179,21 +254,80 @@ class GitTagsMixin:
 
         return tnames[-1]
 
+    @measure_runtime_decorator
+    def get_version_allocation_index(self, app_name):
+        """Per-app VersionAllocationIndex, built from one tag listing and kept
+        until the local tags change."""
+        index = self._version_allocation_indexes.get(app_name)
+        if index is None:
+            tag_app_name = VMNBackend.app_name_to_tag_name(app_name)
+            refs = self.get_tag_refs(
+                [f"refs/tags/{tag_app_name}_*"], with_contents=False
+            )
+            index = VersionAllocationIndex(app_name, [r["name"] for r in refs])
+            self._version_allocation_indexes[app_name] = index
+
+        return index
+
+    def _invalidate_tag_caches(self):
+        """Drop per-invocation views of the tag set after tags were added,
+        removed or fetched."""
+        self._version_allocation_indexes = {}
+
     @measure_runtime_decorator
     def get_commit_object_from_branch_name(self, bname):
-        # TODO:: Unfortunately, need to spend o(N) here
-        for branch in self._be.branches:
-            if bname != branch.name:
-                continue
+        hexsha = self.ref_map.heads.get(bname)
+        if hexsha is None:
+            raise RuntimeError(
+                f"Somehow did not find a branch commit object for branch: {bname}"
+            )
 
-            return branch.commit
+        return self.get_commit_object_from_commit_hex(hexsha)
 
-        raise RuntimeError(
-            f"Somehow did not find a branch commit object for branch: {bname}"
-        )
+    def _get_tag_ref_sha(self, tname):
+        """Resolve refs/tags/<tname> to the sha it stores without running git."""
+        try:
+            return git.SymbolicReference.dereference_recursive(
+                self._be, f"refs/tags/{tname}"
+            )
+        except Exception:
+            VMN_LOGGER.debug(f"Tag ref {tname} was not found", exc_info=True)
+            return None
+
+    def _get_tag_index_entry(self, tname):
+        sha = self._get_tag_ref_sha(tname)
+        if sha is None:
+            return None, None
+
+        return sha, self.tag_index.get(sha)
+
+    def _ver_info_c_from_index_entry(self, tname, entry):
+        ret = {
+            "ver_info": None,
+            "tag_object": None,
+            "commit_object": None,
+            "tag_order": None,
+        }
+        if not entry["vmn"]:
+            return ret
+
+        # Both objects are lazy: nothing is read from git unless accessed
+        ret["tag_object"] = self._be.tag(f"refs/tags/{tname}")
+        ret["commit_object"] = git.Commit(self._be, hex_to_bin(entry["commit"]))
+        ret["ver_info"] = entry["ver_info"]
+        ret["tag_order"] = entry["tag_order"]
+
+        return ret
 
     @measure_runtime_decorator
     def get_tag_object_from_tag_name(self, tname):
+        sha, entry = self._get_tag_index_entry(tname)
+        if entry is not None:
+            if not entry["vmn"]:
+                return tname, None
+
+            return tname, self._be.tag(f"refs/tags/{tname}")
+
         try:
             o = self._be.tag(f"refs/tags/{tname}")
         except Exception:
@@ -202,18 +336,94 @@ class GitTagsMixin:
             if o is None:
                 return tname, None
 
-        try:
-            if o.commit.author.name != VMN_USER_NAME:
-                return tname, None
-        except Exception:
-            VMN_LOGGER.debug("Exception info: ", exc_info=True)
+        commit_obj = self.object_reader.read_commit(f"{o.path}^{{commit}}")
+        if commit_obj is None:
+            VMN_LOGGER.debug(f"Tag {tname} does not point to a commit")
             return tname, None
 
-        if o.tag is None:
+        # Either not vmn's commit or a lightweight tag. Objects never change,
+        # so remember the verdict for the tag object.
+        info = self.object_reader.info(o.path)
+        if (
+            commit_obj.author.name != VMN_USER_NAME
+            or info is None
+            or info[1] != "tag"
+        ):
+            if sha is not None:
+                self.tag_index.put(sha, {"vmn": False})
+
             return tname, None
 
         return tname, o
 
+    @measure_runtime_decorator
+    def get_tag_refs(self, patterns, points_at=None, with_contents=True):
+        """List tag refs matching ``patterns`` with one ``git for-each-ref``.
+
+        Returns a list of dicts holding the tag name, tag object sha, peeled
+        commit sha and its author, tagger date and (optionally) the tag
+        message. Peeled fields are empty for lightweight tags.
+        """
+        fields = list(_TAG_REF_FIELDS)
+        if with_contents:
+            fields.append(("contents", "contents"))
+
+        # NUL never appears in ref names or object contents
+        fmt = "".join(f"%({f})%00" for _, f in fields)
+        cmd = [f"--format={fmt}"]
+        if points_at is not None:
+            cmd.append(f"--points-at={points_at}")
+        cmd.extend(patterns)
+
+        values = self._be.git.for_each_ref(*cmd).split("\x00")
+
+        refs = []
+        n = len(fields)
+        for i in range(0, len(values) - n + 1, n):
+            ref = dict(zip((k for k, _ in fields), values[i:i + n]))
+            ref["name"] = ref["name"].lstrip("\n")
+            ref["tagged_date"] = (
+                int(ref["tagged_date"]) if ref["tagged_date"] else None
+            )
+            refs.append(ref)
+
+        return refs
+
+    def _ver_info_c_from_tag_ref(self, ref):
+        """Build a ver_info_c for a ``get_tag_refs`` record, via the tag index."""
+        entry = self.tag_index.get(ref["object"])
+        if entry is None:
+            entry = {"vmn": False}
+            if ref["commit"] and ref["author"] == VMN_USER_NAME:
+                entry = {
+                    "vmn": True,
+                    "commit": ref["commit"],
+                    "tag_order": get_tag_order(ref["contents"], ref["tagged_date"]),
+                    "ver_info": self._parse_ver_info_from_message(
+                        ref["name"], ref["contents"]
+                    ),
+                }
+
+            self.tag_index.put(ref["object"], entry)
+
+        return self._ver_info_c_from_index_entry(ref["name"], entry)
+
+    @measure_runtime_decorator
+    def get_ver_infos_from_tag_refs(self, refs):
+        ver_infos = {}
+        for ref in refs:
+            ver_info_c = self._ver_info_c_from_tag_ref(ref)
+            if ver_info_c["ver_info"] is None:
+                VMN_LOGGER.debug(
+                    f"Probably non-vmn tag - {ref['name']} with tag msg: "
+                    f"{ver_info_c['ver_info']}. Skipping "
+                )
+                continue
+
+            ver_infos[ref["name"]] = ver_info_c
+
+        return ver_infos
+
     @measure_runtime_decorator
     def get_all_commit_tags_log_impl(self, hexsha, tags, app_name):
         cleaned_tags = []
@@ -229,8 +439,16 @@ class GitTagsMixin:
             # Maybe rebase or tag was removed. Will handle the rebase case here
             try:
                 commit_obj = self.get_commit_object_from_commit_hex(hexsha)
-                verstr = commit_obj.message.split(" version ")[1].strip()
-                tagname = f"{app_name}_{verstr}"
+                # A batch stamp commit has one such line per app
+                match = re.search(
+                    rf"^{re.escape(app_name)}: Stamped (?:initial )?version (\S+)$",
+                    commit_obj.message,
+                    re.MULTILINE,
+                )
+                if match is None:
+                    return ver_infos
+
+                tagname = VMNBackend.serialize_vmn_tag_name(app_name, match.group(1))
                 tagname, ver_info_c = self.parse_tag_message(tagname)
                 if ver_info_c["tag_object"]:
                     ver_infos[tagname] = ver_info_c
@@ -241,16 +459,19 @@ class GitTagsMixin:
             except Exception:
                 VMN_LOGGER.debug(f"Skipped on {hexsha} commit")
 
-        for tname in cleaned_tags:
-            tname, ver_info_c = self.parse_tag_message(tname)
-            if ver_info_c["ver_info"] is None:
-                VMN_LOGGER.debug(
-                    f"Probably non-vmn tag - {tname} with tag msg: {ver_info_c['ver_info']}. Skipping ",
-                    exc_info=True,
-                )
-                continue
-
-            ver_infos[tname] = ver_info_c
+        if not cleaned_tags:
+            return ver_infos
+
+        # A pattern also matches refs nested below it, keep exact names only
+        refs = {
+            ref["name"]: ref
+            for ref in self.get_tag_refs([f"refs/tags/{t}" for t in cleaned_tags])
+        }
+        ver_infos.update(
+            self.get_ver_infos_from_tag_refs(
+                [refs[t] for t in cleaned_tags if t in refs]
+            )
+        )
 
         return ver_infos
 
@@ -259,22 +480,9 @@ class GitTagsMixin:
         if hexsha is None:
             hexsha = "HEAD"
 
-        cmd = ["--points-at", hexsha]
-        tags = _clean_split_result(self._be.git.tag(*cmd).split("\n"))
-
-        ver_infos = {}
-        for t in tags:
-            t, ver_info_c = self.parse_tag_message(t)
-            if ver_info_c["ver_info"] is None:
-                VMN_LOGGER.debug(
-                    f"Probably non-vmn tag - {t} with tag msg: {ver_info_c['ver_info']}. Skipping ",
-                    exc_info=True,
-                )
-                continue
-
-            ver_infos[t] = ver_info_c
+        refs = self.get_tag_refs(["refs/tags"], points_at=hexsha)
 
-        return ver_infos
+        return self.get_ver_infos_from_tag_refs(refs)
 
     @measure_runtime_decorator
     def get_all_brother_tags(self, tag_name):
@@ -314,36 +522,69 @@ class GitTagsMixin:
 
     @measure_runtime_decorator
     def parse_tag_message(self, tag_name):
+        sha, entry = self._get_tag_index_entry(tag_name)
+        if entry is not None:
+            return tag_name, self._ver_info_c_from_index_entry(tag_name, entry)
+
+        requested_tag_name = tag_name
         tag_name, tag_obj = self.get_tag_object_from_tag_name(tag_name)
 
-        ret = {"ver_info": None, "tag_object": tag_obj, "commit_object": None}
+        ret = {
+            "ver_info": None,
+            "tag_object": tag_obj,
+            "commit_object": None,
+            "tag_order": None,
+        }
         if not tag_obj:
             return tag_name, ret
 
-        commit_tag_obj = tag_obj.commit
+        commit_tag_obj = self.object_reader.read_commit(f"{tag_obj.path}^{{commit}}")
         if commit_tag_obj is None or commit_tag_obj.author.name != VMN_USER_NAME:
             VMN_LOGGER.debug(f"Corrupted tag {tag_name}: author name is not vmn")
             return tag_name, ret
 
+        tag_object = self.object_reader.read_tag(tag_obj.path)
         ret["commit_object"] = commit_tag_obj
+        ret["tag_order"] = get_tag_order(tag_object.message, tag_object.tagged_date)
+        ret["ver_info"] = self._parse_ver_info_from_message(
+            tag_name, tag_object.message
+        )
+
+        if tag_name != requested_tag_name:
+            # Resolved under a different (.0 suffixed) name
+            sha = self._get_tag_ref_sha(tag_name)
+        if sha is not None:
+            self.tag_index.put(
+                sha,
+                {
+                    "vmn": True,
+                    "commit": commit_tag_obj.hexsha,
+                    "tag_order": ret["tag_order"],
+                    "ver_info": ret["ver_info"],
+                },
+            )
 
+        return tag_name, ret
+
+    def _parse_ver_info_from_message(self, tag_name, message):
         # TODO:: Check API commit version
         # safe_load discards any text before the YAML document (if present)
-        ver_info = yaml.safe_load(tag_obj.object.message)
+        ver_info = yaml.safe_load(message)
         if ver_info is None:
-            return tag_name, ret
+            return None
 
         if not isinstance(ver_info, dict):
             ver_info_039 = parse_automatic_tag_message(self._be, tag_name, ver_info)
             if ver_info_039 is not None:
                 ver_info = ver_info_039
             if ver_info is None or not isinstance(ver_info, dict):
-                return tag_name, ret
+                return None
 
         if "vmn_info" not in ver_info:
             VMN_LOGGER.debug(f"vmn_info key was not found in tag {tag_name}")
-            return tag_name, ret
+            return None
 
-        ret["ver_info"] = ver_info
+        # Ordering metadata of the tag itself, not part of the version info
+        ver_info.pop(TAG_ORDER_KEY, None)
 
-        return tag_name, ret
+        return ver_info
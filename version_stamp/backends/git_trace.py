@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""In-memory trace of the git commands a vmn command runs.
+
+While enabled, every ``git`` invocation that goes through GitPython is
+recorded as a ``GitTraceEvent`` in a bounded ring buffer. At the end of the
+command ``emit()`` writes per-subcommand latency percentiles, as JSON to a
+file or as a table on stderr. When disabled, recording is a single attribute
+check.
+
+Commands whose output GitPython streams (``as_process``) are recorded when
+they are spawned, so their duration and output size are not measured. The
+object reads served by the persistent ``git cat-file`` pipes of
+``GitObjectReader`` do not go through GitPython and are not recorded.
+"""
+import collections
+import json
+import sys
+import threading
+import time
+
+from version_stamp.core.constants import GIT_TRACE_BUFFER_SIZE
+
+GitTraceEvent = collections.namedtuple(
+    "GitTraceEvent", ["subcommand", "start", "duration", "bytes_out", "exit_code"]
+)
+
+# Written to stderr instead of a file
+GIT_TRACE_STDERR_TARGETS = ("-", "1")
+# Tracing stays off, as when the variable is unset
+GIT_TRACE_OFF_TARGETS = ("", "0")
+
+# Global options that take the next argv entry as their value
+_GIT_OPTS_WITH_VALUE = {"-c", "-C", "--git-dir", "--work-tree", "--namespace"}
+
+
+def git_subcommand(argv):
+    """The git subcommand of ``argv`` (``["git", "-c", "k=v", "status"]`` →
+    ``status``); the argv class the trace aggregates by."""
+    args = iter(argv[1:])
+    for arg in args:
+        if arg in _GIT_OPTS_WITH_VALUE:
+            next(args, None)
+        elif not arg.startswith("-"):
+            return arg
+
+    return "git"
+
+
+def _percentile(sorted_values, pct):
+    # Nearest rank
+    index = max(0, -(-len(sorted_values) * pct // 100) - 1)
+    return sorted_values[int(index)]
+
+
+class GitTrace:
+    def __init__(self, size=GIT_TRACE_BUFFER_SIZE):
+        self.enabled = False
+        self.target = None
+        self.recorded = 0
+        self.started_at = None
+        self.events = collections.deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def start(self, target):
+        """Start a fresh trace reported to ``target`` (a path, or one of
+        GIT_TRACE_STDERR_TARGETS). None or one of GIT_TRACE_OFF_TARGETS
+        disables tracing."""
+        with self._lock:
+            self.enabled = target is not None and target not in GIT_TRACE_OFF_TARGETS
+            self.target = target
+            self.recorded = 0
+            self.started_at = time.perf_counter()
+            self.events.clear()
+
+    def record(self, argv, start, duration, bytes_out, exit_code):
+        event = GitTraceEvent(
+            git_subcommand([str(a) for a in argv]),
+            start,
+            duration,
+            bytes_out,
+            exit_code,
+        )
+        with self._lock:
+            self.events.append(event)
+            self.recorded += 1
+
+    def summary(self):
+        with self._lock:
+            events = list(self.events)
+            recorded = self.recorded
+
+        durations = collections.defaultdict(list)
+        for event in events:
+            durations[event.subcommand].append(event.duration)
+
+        subcommands = {}
+        for subcommand, values in sorted(durations.items()):
+            values.sort()
+            subcommands[subcommand] = {
+                "count": len(values),
+                "p50": _percentile(values, 50),
+                "p95": _percentile(values, 95),
+                "total": sum(values),
+            }
+
+        return {
+            "git_calls": recorded,
+            # Events older than the ring buffer are only counted
+            "dropped": recorded - len(events),
+            "git_seconds": sum(e.duration for e in events),
+            "subcommands": subcommands,
+            "events": [event._asdict() for event in events],
+        }
+
+    def emit(self):
+        """Report the trace to its target and disable tracing."""
+        if not self.enabled:
+            return
+
+        summary = self.summary()
+        target = self.target
+        self.start(None)
+
+        if target not in GIT_TRACE_STDERR_TARGETS:
+            with open(target, "w") as f:
+                json.dump(summary, f, indent=2)
+            return
+
+        lines = [
+            f"git trace: {summary['git_calls']} calls, "
+            f"{summary['git_seconds']:.3f}s in git"
+            + (f", {summary['dropped']} not buffered" if summary["dropped"] else ""),
+            f"{'subcommand':<20} {'count':>6} {'p50 ms':>9} {'p95 ms':>9} {'total ms':>10}",
+        ]
+        for subcommand, stats in sorted(
+            summary["subcommands"].items(), key=lambda kv: -kv[1]["total"]
+        ):
+            lines.append(
+                f"{subcommand:<20} {stats['count']:>6} "
+                f"{stats['p50'] * 1000:>9.2f} {stats['p95'] * 1000:>9.2f} "
+                f"{stats['total'] * 1000:>10.2f}"
+            )
+        sys.stderr.write("\n".join(lines) + "\n")
+
+
+GIT_TRACE = GitTrace()
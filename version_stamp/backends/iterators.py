@@ -1,4 +1,5 @@
 #!/usr/bin/env python3
+import collections
 
 
 class CommitMessageIterator:
@@ -13,6 +14,12 @@ class CommitMessageIterator:
 
         return commit.message.strip()
 
+    def close(self):
+        """Stop reading commits, e.g. once the answer is known."""
+        close = getattr(self._iterator, "close", None)
+        if close is not None:
+            close()
+
 
 class CommitInfoIterator:
     """Iterator that yields (message, short_hash) tuples for changelog generation."""
@@ -27,3 +34,136 @@ class CommitInfoIterator:
         commit = next(self._iterator)
 
         return commit.message.strip(), commit.hexsha[:7]
+
+    def close(self):
+        close = getattr(self._iterator, "close", None)
+        if close is not None:
+            close()
+
+
+class GitRecordIterator:
+    """Iterator over ``sep``-terminated records of a streaming git command.
+
+    ``proc`` is the handle GitPython returns for ``as_process=True``. Records
+    are decoded as they arrive, so consumers can stop early; ``close()`` (or
+    exhausting the iterator) stops git instead of reading its whole output.
+    """
+
+    _CHUNK_SIZE = 64 * 1024
+
+    def __init__(self, proc, sep=b"\n"):
+        self._proc = proc
+        self._sep = sep
+        self._pending = collections.deque()
+        self._tail = b""
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        while not self._pending:
+            if self._proc is None:
+                raise StopIteration
+
+            stdout = self._proc.stdout
+            chunk = getattr(stdout, "read1", stdout.read)(self._CHUNK_SIZE)
+            if not chunk:
+                if self._tail:
+                    self._pending.append(self._tail)
+                    self._tail = b""
+
+                proc, self._proc = self._proc, None
+                # Raises GitCommandError if git failed
+                proc.wait()
+                continue
+
+            records = (self._tail + chunk).split(self._sep)
+            self._tail = records.pop()
+            self._pending.extend(records)
+
+        return self._pending.popleft().decode("utf-8", "replace")
+
+    def close(self):
+        """Stop the git process if the consumer is done before EOF."""
+        # GitPython's process handle terminates git once it is released
+        self._proc = None
+        self._pending.clear()
+        self._tail = b""
+
+
+LoggedCommit = collections.namedtuple(
+    "LoggedCommit", ["hexsha", "author", "message"]
+)
+
+
+class CommitLogIterator:
+    """``LoggedCommit`` records streamed from one ``git log``.
+
+    ``proc`` runs ``git log`` with ``FORMAT``: each commit is its sha, author
+    name and raw message, all NUL terminated, so no commit object is read
+    per commit.
+    """
+
+    FORMAT = "--format=%H%x00%an%x00%B%x00"
+
+    def __init__(self, proc):
+        self._records = GitRecordIterator(proc, sep=b"\x00")
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        # Commits are newline separated, the newline leads the next sha
+        hexsha = ""
+        while not hexsha:
+            hexsha = next(self._records).strip()
+
+        return LoggedCommit(
+            hexsha, next(self._records, ""), next(self._records, "")
+        )
+
+    def close(self):
+        self._records.close()
+
+
+class CommitRangeCache:
+    """One walk of a commit range shared by several readers.
+
+    Each ``iter()`` replays the commits read so far and then continues the
+    walk of ``source``, keeping what it reads for the next reader. A reader
+    that stops early (or is closed) leaves the walk where it is, so a later
+    reader that needs the rest picks it up without starting a new git log.
+    """
+
+    def __init__(self, source):
+        self._source = source
+        self._commits = []
+        # Set when the walk failed; what was read is then not the whole range
+        self.failed = False
+
+    def __iter__(self):
+        index = 0
+        while True:
+            if index < len(self._commits):
+                yield self._commits[index]
+                index += 1
+                continue
+
+            if self._source is None:
+                return
+
+            try:
+                self._commits.append(next(self._source))
+            except StopIteration:
+                self._source = None
+                return
+            except Exception:
+                self.failed = True
+                self.close()
+                raise
+
+    def close(self):
+        """Stop the walk; commits read so far stay cached."""
+        source, self._source = self._source, None
+        if source is not None:
+            source.close()
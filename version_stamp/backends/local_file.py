@@ -14,6 +14,7 @@ from version_stamp.core.constants import (
     VMN_BE_TYPE_LOCAL_FILE,
 )
 from version_stamp.core.logging import VMN_LOGGER, measure_runtime_decorator
+from version_stamp.core.version_allocation import VersionAllocationIndex
 
 
 class LocalFileBackend(VMNBackend):
@@ -31,7 +32,7 @@ class LocalFileBackend(VMNBackend):
         self.active_branch = "none"
         self.remote_active_branch = "remote/none"
 
-    def perform_cached_fetch(self, force=False):
+    def perform_cached_fetch(self, force=False, app_names=None):
         return
 
     def prepare_for_remote_operation(self):
@@ -113,6 +114,9 @@ class LocalFileBackend(VMNBackend):
     def get_latest_available_tag(self, tag_prefix_filter):
         return None
 
+    def get_version_allocation_index(self, app_name):
+        return VersionAllocationIndex(app_name, [])
+
     def get_actual_deps_state(self, vmn_root_path, paths):
         actual_deps_state = {
             ".": {
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""Long-lived ``git cat-file`` object reader.
+
+Keeps one ``git cat-file --batch`` and one ``git cat-file --batch-check``
+process per repository and serves commit, tag and blob reads over their
+pipes, so repeated object reads cost a pipe round-trip instead of a fork.
+Processes are started lazily on first use and restarted if they die.
+"""
+import io
+import os
+import subprocess
+import threading
+
+import git
+from git.objects.util import get_object_type_by_name, parse_actor_and_date
+from git.util import hex_to_bin
+
+from version_stamp.core.logging import VMN_LOGGER
+
+# Objects are immutable; cap the per-process memo so huge walks stay bounded
+_MAX_CACHED_OBJECTS = 4096
+_HEX_DIGITS = frozenset("0123456789abcdef")
+
+
+def _is_full_hexsha(rev):
+    return len(rev) == 40 and set(rev) <= _HEX_DIGITS
+
+
+class GitObjectReader:
+    """Serves object reads for ``repo`` through persistent cat-file pipes."""
+
+    def __init__(self, repo):
+        self._repo = repo
+        self._lock = threading.Lock()
+        self._procs = {}
+        self._objects = {}
+
+    def _get_proc(self, mode):
+        proc = self._procs.get(mode)
+        if proc is not None and proc.poll() is None:
+            return proc
+
+        env = dict(os.environ)
+        env.update(self._repo.git.environment())
+        proc = subprocess.Popen(
+            ["git", "cat-file", mode],
+            cwd=self._repo.working_dir,
+            env=env,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+        )
+        self._procs[mode] = proc
+
+        return proc
+
+    def _request(self, mode, rev):
+        """Send one object name; return ``(proc, sha, type, size)`` or None."""
+        if "\n" in rev:
+            raise ValueError(f"Invalid object name: {rev!r}")
+
+        proc = self._get_proc(mode)
+        proc.stdin.write(f"{rev}\n".encode())
+        proc.stdin.flush()
+        header = proc.stdout.readline().decode().split()
+
+        # "<rev> missing" / "<rev> ambiguous", where <rev> may contain spaces
+        if not header or header[-1] in ("missing", "ambiguous"):
+            VMN_LOGGER.debug(f"cat-file: {' '.join(header)}")
+            return None
+        if len(header) != 3:
+            VMN_LOGGER.debug(f"cat-file: unexpected reply for {rev}")
+            return None
+
+        return proc, header[0], header[1], int(header[2])
+
+    def info(self, rev):
+        """Return ``(hexsha, type, size)`` for ``rev`` or None if missing."""
+        with self._lock:
+            res = self._request("--batch-check", rev)
+
+        if res is None:
+            return None
+
+        return res[1:]
+
+    def read(self, rev):
+        """Return ``(hexsha, type, raw bytes)`` for ``rev`` or None if missing."""
+        if _is_full_hexsha(rev) and rev in self._objects:
+            return self._objects[rev]
+
+        with self._lock:
+            res = self._request("--batch", rev)
+            if res is None:
+                return None
+
+            proc, sha, otype, size = res
+            data = proc.stdout.read(size)
+            # Each object is followed by a LF
+            proc.stdout.read(1)
+
+        if len(self._objects) >= _MAX_CACHED_OBJECTS:
+            self._objects.clear()
+        self._objects[sha] = (sha, otype, data)
+
+        return sha, otype, data
+
+    def read_commit(self, rev):
+        """Return a fully populated ``git.Commit`` for ``rev`` or None."""
+        res = self.read(rev)
+        if res is None or res[1] != "commit":
+            return None
+
+        commit = git.Commit(self._repo, hex_to_bin(res[0]))
+        commit._deserialize(io.BytesIO(res[2]))
+
+        return commit
+
+    def read_tag(self, rev):
+        """Return a populated ``git.TagObject`` for ``rev`` or None when
+        ``rev`` is missing or not an annotated tag."""
+        res = self.read(rev)
+        if res is None or res[1] != "tag":
+            return None
+
+        # The header ends at the first empty line; the message follows as is
+        header, _, message = res[2].partition(b"\n\n")
+        fields = {}
+        for line in header.split(b"\n"):
+            key, _, value = line.partition(b" ")
+            fields.setdefault(key, value)
+
+        if b"object" not in fields or b"type" not in fields:
+            VMN_LOGGER.debug(f"Malformed tag object {res[0]}")
+            return None
+
+        object_type = get_object_type_by_name(fields[b"type"])
+        tagger = tagged_date = tagger_tz_offset = None
+        if b"tagger" in fields:
+            tagger, tagged_date, tagger_tz_offset = parse_actor_and_date(
+                fields[b"tagger"].decode("utf-8", "replace")
+            )
+
+        return git.TagObject(
+            self._repo,
+            hex_to_bin(res[0]),
+            object=object_type(self._repo, hex_to_bin(fields[b"object"].decode())),
+            tag=fields.get(b"tag", b"").decode("utf-8", "replace"),
+            tagger=tagger,
+            tagged_date=tagged_date,
+            tagger_tz_offset=tagger_tz_offset,
+            message=message.decode("utf-8", "replace"),
+        )
+
+    def read_blob_text(self, rev, path):
+        """Return the text of ``path`` at ``rev`` or None if it does not exist."""
+        res = self.read(f"{rev}:{path}")
+        if res is None or res[1] != "blob":
+            return None
+
+        return res[2].decode("utf-8", "replace")
+
+    def close(self):
+        with self._lock:
+            for proc in self._procs.values():
+                try:
+                    proc.stdin.close()
+                    proc.wait(timeout=5)
+                except Exception:
+                    proc.kill()
+            self._procs = {}
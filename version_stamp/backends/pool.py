@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""Process-wide pool of VCS backends keyed by repository path.
+
+A single vmn command touches the same dependency repos from several places
+(deps state, repo status, remote preparation, patches). The pool hands out
+one shared backend per path for the duration of a command so each repo is
+opened once. Callers that move a repo behind a pooled backend's back (e.g. a
+checkout in a worker process) must invalidate its path.
+"""
+import os
+import threading
+
+
+class BackendPool:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._backends = {}
+        # Backends inherited over fork() belong to the parent: their
+        # cat-file pipes and database handles must not be used or closed
+        # by the child, so they are only kept referenced.
+        self._inherited = []
+
+    @staticmethod
+    def _key(path, inherit_env):
+        return os.path.realpath(path), inherit_env
+
+    def get(self, path, create, inherit_env=False):
+        """Return the pooled backend for ``path`` or the one ``create()``
+        builds. Failures of ``create`` propagate and nothing is pooled."""
+        key = self._key(path, inherit_env)
+        with self._lock:
+            be = self._backends.get(key)
+        if be is not None:
+            return be
+
+        # Open outside the lock so different repos open concurrently; if two
+        # threads race on one path, the first one pooled wins
+        be = create()
+        with self._lock:
+            return self._backends.setdefault(key, be)
+
+    def invalidate(self, paths=None):
+        """Forget the backends of ``paths`` (all when None). Holders keep
+        their instance; the next lookup opens the repo again."""
+        with self._lock:
+            if paths is None:
+                self._backends = {}
+                return
+
+            real_paths = {os.path.realpath(p) for p in paths}
+            self._backends = {
+                key: be
+                for key, be in self._backends.items()
+                if key[0] not in real_paths
+            }
+
+    def _after_fork_in_child(self):
+        self._lock = threading.Lock()
+        self._inherited.append(self._backends)
+        self._backends = {}
+
+
+BACKEND_POOL = BackendPool()
+os.register_at_fork(after_in_child=BACKEND_POOL._after_fork_in_child)
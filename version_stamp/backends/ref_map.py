@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""Snapshot of a repository's branch refs.
+
+Local branches, remote-tracking branches, the configured upstream of every
+local branch and the branch HEAD points at are read with a single
+``git for-each-ref`` call, so branch lookups become dict lookups instead of a
+``rev-parse`` or ``git branch`` per question. The snapshot does not follow
+later ref changes; the backend drops it whenever it moves refs.
+"""
+
+# (key, for-each-ref field). %(upstream) is resolved from the branch config
+_REF_FIELDS = (
+    ("refname", "refname"),
+    ("object", "objectname"),
+    ("upstream", "upstream:short"),
+    ("head", "HEAD"),
+    ("symref", "symref"),
+)
+_HEADS_PREFIX = "refs/heads/"
+_REMOTES_PREFIX = "refs/remotes/"
+
+
+class GitRefMap:
+    """Branch name → commit sha maps for ``repo``, read once."""
+
+    def __init__(self, repo):
+        # NUL never appears in ref names
+        fmt = "".join(f"%({f})%00" for _, f in _REF_FIELDS)
+        values = repo.git.for_each_ref(
+            f"--format={fmt}", _HEADS_PREFIX, _REMOTES_PREFIX
+        ).split("\x00")
+
+        self.heads = {}
+        self.remotes = {}
+        self.upstreams = {}
+        self.head_branch = None
+
+        n = len(_REF_FIELDS)
+        for i in range(0, len(values) - n + 1, n):
+            ref = dict(zip((k for k, _ in _REF_FIELDS), values[i:i + n]))
+            refname = ref["refname"].lstrip("\n")
+
+            if refname.startswith(_HEADS_PREFIX):
+                name = refname[len(_HEADS_PREFIX):]
+                self.heads[name] = ref["object"]
+                if ref["upstream"]:
+                    self.upstreams[name] = ref["upstream"]
+                if ref["head"] == "*":
+                    self.head_branch = name
+            elif not ref["symref"]:
+                # Skip symbolic refs like origin/HEAD
+                self.remotes[refname[len(_REMOTES_PREFIX):]] = ref["object"]
+
+    def upstream(self, branch):
+        """The upstream of ``branch`` (e.g. ``origin/main``) or None when
+        none is configured or its ref does not exist."""
+        upstream = self.upstreams.get(branch)
+        if upstream not in self.remotes and upstream not in self.heads:
+            return None
+
+        return upstream
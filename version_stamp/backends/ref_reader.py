@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""Resolve refs by reading the git directory.
+
+``HEAD``, loose refs and ``packed-refs`` are plain files, so the commit a ref
+points at can be read without a git subprocess or object lookup. Linked
+worktrees keep their own ``HEAD`` and share the rest of the refs through
+the directory named in ``commondir``. Anything else (reftable storage,
+whose HEAD points at ``refs/heads/.invalid``, symref loops, unreadable files)
+resolves to None and the caller asks git.
+"""
+import os
+import re
+
+_SHA_RE = re.compile(r"^(?:[0-9a-f]{40}|[0-9a-f]{64})$")
+_SYMREF_PREFIX = "ref: "
+# Refs that belong to a single worktree, see gitrepository-layout(5)
+_PER_WORKTREE_PREFIXES = ("refs/bisect/", "refs/worktree/", "refs/rewritten/")
+_MAX_SYMREF_DEPTH = 5
+# Repositories with a non-files ref backend keep HEAD pointing at this ref
+# so that older git versions refuse to treat them as repositories
+_INVALID_REF = "refs/heads/.invalid"
+
+
+def _read_line(path):
+    try:
+        with open(path, "r") as f:
+            return f.readline().strip()
+    except (OSError, UnicodeDecodeError):
+        return None
+
+
+class GitRefReader:
+    """Pure-file ref lookups for the repository at ``git_dir``."""
+
+    def __init__(self, git_dir, common_dir=None):
+        self.git_dir = git_dir
+        self.common_dir = os.path.normpath(
+            common_dir or self._read_common_dir(git_dir)
+        )
+        # Reftable storage keeps the refs in binary tables, not in files
+        self.reftable = os.path.isdir(os.path.join(self.common_dir, "reftable"))
+
+    @staticmethod
+    def _read_common_dir(git_dir):
+        common_dir = _read_line(os.path.join(git_dir, "commondir"))
+        if not common_dir:
+            return git_dir
+
+        return os.path.join(git_dir, common_dir)
+
+    def _read_ref(self, ref):
+        if self.reftable:
+            return None
+
+        value = _read_line(os.path.join(self._ref_dir(ref), ref))
+        if value == f"{_SYMREF_PREFIX}{_INVALID_REF}":
+            return None
+
+        return value
+
+    def _ref_dir(self, ref):
+        if ref == "HEAD" or ref.startswith(_PER_WORKTREE_PREFIXES):
+            return self.git_dir
+
+        return self.common_dir
+
+    def _packed_ref(self, ref):
+        if self.reftable:
+            return None
+
+        try:
+            with open(os.path.join(self.common_dir, "packed-refs"), "r") as f:
+                for line in f:
+                    if line.startswith(("#", "^")):
+                        continue
+                    sha, _, name = line.rstrip("\n").partition(" ")
+                    if name == ref:
+                        return sha
+        except (OSError, UnicodeDecodeError):
+            return None
+
+        return None
+
+    def read_symref(self, ref="HEAD"):
+        """The ref ``ref`` points at (e.g. ``refs/heads/main``) or None when
+        it holds a sha or cannot be read."""
+        value = self._read_ref(ref)
+        if value is None or not value.startswith(_SYMREF_PREFIX):
+            return None
+
+        return value[len(_SYMREF_PREFIX):]
+
+    def is_detached(self):
+        """True/False for a readable HEAD, None otherwise."""
+        value = self._read_ref("HEAD")
+        if value is None:
+            return None
+        if value.startswith(_SYMREF_PREFIX):
+            return False
+
+        return _SHA_RE.match(value) is not None or None
+
+    def resolve(self, ref="HEAD"):
+        """The commit (or tag object) sha ``ref`` points at, following
+        symbolic refs, or None when it cannot be resolved from files."""
+        for _ in range(_MAX_SYMREF_DEPTH):
+            value = self._read_ref(ref)
+            if not value:
+                # No loose ref: packed refs never hold HEAD or symrefs
+                return self._packed_ref(ref) if ref != "HEAD" else None
+
+            if not value.startswith(_SYMREF_PREFIX):
+                return value if _SHA_RE.match(value) else None
+
+            ref = value[len(_SYMREF_PREFIX):]
+
+        return None
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""Snapshot of a repository's working tree and branch state.
+
+One ``git status --porcelain=v2 --branch`` call answers whether the tree has
+pending changes, which commit and branch HEAD is on, the branch's upstream
+and how far the two diverged. Like the ref map, the snapshot does not follow
+later changes; the backend drops it whenever it moves HEAD or refs.
+
+git status uses the repository's fsmonitor (core.fsmonitor) when one is
+configured, so on large checkouts only the files the monitor reports are
+stat'ed. The working tree scan can also be limited to a set of paths.
+"""
+
+_OID_PREFIX = "# branch.oid "
+_HEAD_PREFIX = "# branch.head "
+_UPSTREAM_PREFIX = "# branch.upstream "
+_AB_PREFIX = "# branch.ab "
+
+
+class GitStatusProbe:
+    """Parsed ``git status --porcelain=v2 --branch`` of ``repo``.
+
+    ``head_oid`` is None in a repository without commits and ``branch`` is
+    None on a detached HEAD. ``ahead`` and ``behind`` are None when there is
+    no upstream or its ref does not exist. With ``paths``, ``dirty`` only
+    covers changes under those paths; the branch state is the same.
+    """
+
+    def __init__(self, repo, paths=None):
+        # Untracked files do not count as pending changes, like is_dirty().
+        # Rename detection is only needed to describe changes, not find them
+        args = ["--porcelain=v2", "--branch", "--untracked-files=no", "--no-renames"]
+        if paths:
+            args += ["--", *paths]
+        out = repo.git.status(*args)
+
+        self.paths = tuple(paths) if paths else None
+        self.dirty = False
+        self.head_oid = None
+        self.branch = None
+        self.upstream = None
+        self.ahead = None
+        self.behind = None
+
+        for line in out.splitlines():
+            if line.startswith(_OID_PREFIX):
+                oid = line[len(_OID_PREFIX):]
+                if oid != "(initial)":
+                    self.head_oid = oid
+            elif line.startswith(_HEAD_PREFIX):
+                branch = line[len(_HEAD_PREFIX):]
+                if branch != "(detached)":
+                    self.branch = branch
+            elif line.startswith(_UPSTREAM_PREFIX):
+                self.upstream = line[len(_UPSTREAM_PREFIX):]
+            elif line.startswith(_AB_PREFIX):
+                ahead, behind = line[len(_AB_PREFIX):].split()
+                self.ahead = int(ahead)
+                self.behind = -int(behind)
+            elif line and not line.startswith("#"):
+                self.dirty = True
+
+    @property
+    def detached(self):
+        return self.branch is None
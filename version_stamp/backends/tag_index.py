@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""Persistent index of parsed vmn tag metadata.
+
+Annotated tag objects are immutable, so the parsed outcome of a tag (its
+ver_info, the commit it points to and whether vmn authored that commit) can
+be memoized forever, keyed by the tag object sha. The index is a derived,
+disposable SQLite file under ``.vmn/`` — deleting it loses nothing, the next
+lookup just re-parses the tag from git. Repos without a ``.vmn`` directory
+(e.g. dependencies) get an in-memory index that lives for the invocation.
+
+The same file memoizes the last user changeset found behind a vmn commit.
+That answer comes from the commit's tags and the history of the version
+files, so it is keyed by the commit sha, the app and the tracked files.
+
+``vmn init`` lists the index in ``.vmn/.gitignore``. In repos initialized
+before the index existed, the index files are excluded through the
+repository's untracked ``info/exclude`` when the index is created, so they
+never show up as pending changes.
+"""
+import json
+import os
+import sqlite3
+import threading
+
+from version_stamp.core.constants import TAG_INDEX_FILENAME
+from version_stamp.core.logging import VMN_LOGGER
+
+# Bump when the payload layout changes; older tables are dropped on open.
+_SCHEMA_VERSION = 2
+
+
+def _is_json_roundtrippable(value):
+    try:
+        return json.loads(json.dumps(value)) == value
+    except (TypeError, ValueError):
+        return False
+
+
+class TagMetadataIndex:
+    """Tag object sha → parsed tag entry. Thread-safe, fails open."""
+
+    def __init__(self, vmn_dir, exclude_path=None, work_tree=None):
+        self._db_path = None
+        if vmn_dir is not None and os.path.isdir(vmn_dir):
+            self._db_path = os.path.join(vmn_dir, TAG_INDEX_FILENAME)
+
+        self._exclude_path = exclude_path
+        self._work_tree = work_tree
+
+        self._lock = threading.Lock()
+        self._conn = None
+        self._memory = {}
+        self._user_changesets = {}
+        self._disabled = False
+
+    def _exclude_from_git(self):
+        """Add the index files to ``info/exclude`` unless ``.vmn/.gitignore``
+        already ignores them."""
+        pattern = f"{TAG_INDEX_FILENAME}*"
+        vmn_dir = os.path.dirname(self._db_path)
+        try:
+            with open(os.path.join(vmn_dir, ".gitignore"), "r") as f:
+                if pattern in {line.strip() for line in f}:
+                    return
+        except OSError:
+            pass
+
+        if self._exclude_path is None or self._work_tree is None:
+            return
+
+        rel_dir = os.path.relpath(vmn_dir, self._work_tree).replace(os.sep, "/")
+        entry = f"/{rel_dir}/{pattern}"
+        try:
+            existing = set()
+            if os.path.isfile(self._exclude_path):
+                with open(self._exclude_path, "r") as f:
+                    existing = {line.strip() for line in f}
+            if entry in existing:
+                return
+
+            os.makedirs(os.path.dirname(self._exclude_path), exist_ok=True)
+            with open(self._exclude_path, "a") as f:
+                f.write(f"{entry}\n")
+        except OSError:
+            VMN_LOGGER.debug(
+                f"Failed to exclude {entry} in {self._exclude_path}", exc_info=True
+            )
+
+    def _connect(self):
+        if self._conn is not None or self._disabled or self._db_path is None:
+            return self._conn
+
+        if not os.path.exists(self._db_path):
+            self._exclude_from_git()
+
+        try:
+            conn = sqlite3.connect(self._db_path, timeout=5, check_same_thread=False)
+            # Disposable cache: durability is not worth an fsync per tag
+            conn.execute("PRAGMA synchronous = OFF")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)"
+            )
+            row = conn.execute(
+                "SELECT value FROM meta WHERE key = 'schema'"
+            ).fetchone()
+            if row is None or row[0] != str(_SCHEMA_VERSION):
+                conn.execute("DROP TABLE IF EXISTS tags")
+                conn.execute(
+                    "INSERT OR REPLACE INTO meta (key, value) VALUES ('schema', ?)",
+                    (str(_SCHEMA_VERSION),),
+                )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS tags (sha TEXT PRIMARY KEY, payload TEXT)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS user_changesets "
+                "(key TEXT PRIMARY KEY, sha TEXT)"
+            )
+            conn.commit()
+        except sqlite3.Error:
+            VMN_LOGGER.debug(
+                f"Tag index at {self._db_path} is unusable, "
+                f"falling back to an in-memory index",
+                exc_info=True,
+            )
+            self._disabled = True
+            return None
+
+        self._conn = conn
+        return self._conn
+
+    def get(self, sha):
+        """Return a fresh copy of the entry stored for ``sha`` or None."""
+        with self._lock:
+            payload = self._memory.get(sha)
+            if payload is None:
+                conn = self._connect()
+                if conn is None:
+                    return None
+
+                try:
+                    row = conn.execute(
+                        "SELECT payload FROM tags WHERE sha = ?", (sha,)
+                    ).fetchone()
+                except sqlite3.Error:
+                    VMN_LOGGER.debug("Failed to read from tag index", exc_info=True)
+                    return None
+
+                if row is None:
+                    return None
+
+                payload = row[0]
+                self._memory[sha] = payload
+
+        # Callers mutate ver_info dicts, never hand out a shared object
+        return json.loads(payload)
+
+    def put(self, sha, entry):
+        """Store ``entry`` for ``sha``. Entries that do not survive a JSON
+        round-trip unchanged (exotic YAML types) are not cached."""
+        if not _is_json_roundtrippable(entry):
+            VMN_LOGGER.debug(f"Not caching tag object {sha}: not JSON serializable")
+            return
+
+        payload = json.dumps(entry)
+        with self._lock:
+            self._memory[sha] = payload
+            conn = self._connect()
+            if conn is None:
+                return
+
+            try:
+                conn.execute(
+                    "INSERT OR REPLACE INTO tags (sha, payload) VALUES (?, ?)",
+                    (sha, payload),
+                )
+                conn.commit()
+            except sqlite3.Error:
+                VMN_LOGGER.debug("Failed to write to tag index", exc_info=True)
+
+    def get_user_changeset(self, key):
+        """The user changeset stored for ``key`` or None."""
+        with self._lock:
+            sha = self._user_changesets.get(key)
+            if sha is not None:
+                return sha
+
+            conn = self._connect()
+            if conn is None:
+                return None
+
+            try:
+                row = conn.execute(
+                    "SELECT sha FROM user_changesets WHERE key = ?", (key,)
+                ).fetchone()
+            except sqlite3.Error:
+                VMN_LOGGER.debug("Failed to read from tag index", exc_info=True)
+                return None
+
+            if row is None:
+                return None
+
+            self._user_changesets[key] = row[0]
+            return row[0]
+
+    def put_user_changeset(self, key, sha):
+        with self._lock:
+            self._user_changesets[key] = sha
+            conn = self._connect()
+            if conn is None:
+                return
+
+            try:
+                conn.execute(
+                    "INSERT OR REPLACE INTO user_changesets (key, sha) VALUES (?, ?)",
+                    (key, sha),
+                )
+                conn.commit()
+            except sqlite3.Error:
+                VMN_LOGGER.debug("Failed to write to tag index", exc_info=True)
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                try:
+                    self._conn.close()
+                except sqlite3.Error:
+                    pass
+                self._conn = None
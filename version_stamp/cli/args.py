@@ -32,6 +32,15 @@ def parse_user_commands(command_line):
     )
     parser.add_argument("--debug", required=False, action="store_true")
     parser.set_defaults(debug=False)
+    parser.add_argument(
+        "--profile",
+        required=False,
+        default=None,
+        metavar="FILE",
+        help="Write a Chrome trace-event profile of the command, including "
+        "its git commands, to FILE. Opens in Perfetto, chrome://tracing "
+        "and speedscope.",
+    )
     parser.add_argument(
         "--completion",
         nargs="?",
@@ -261,6 +270,13 @@ def add_arg_stamp(subprasers):
     pstamp.add_argument("--dry-run", dest="dry", action="store_true")
     pstamp.set_defaults(dry=False)
     pstamp.add_argument("name", help="The application's name")
+    pstamp.add_argument(
+        "batch_names",
+        nargs="*",
+        metavar="name",
+        help="More applications to stamp. All of them are stamped against "
+        "the same tags, in one commit and one atomic push",
+    )
     pstamp.add_argument(
         "-e",
         "--extra-commit-message",
@@ -832,6 +848,28 @@ def add_arg_skill(subprasers):
     _add_install_args(pskill)
 
 
+def add_arg_maintenance(subprasers):
+    pmaint = subprasers.add_parser(
+        "maintenance",
+        help="Write the commit-graph (with changed-path bloom filters) and "
+        "pack refs in the repository and the app's dependencies",
+    )
+    pmaint.add_argument(
+        "name",
+        nargs="?",
+        default=None,
+        help="The application's name. Its configured dependencies are "
+        "maintained as well",
+    )
+    pmaint.add_argument(
+        "--no-timings",
+        dest="timings",
+        action="store_false",
+        help="Skip timing vmn's git queries before and after",
+    )
+    pmaint.set_defaults(timings=True)
+
+
 def verify_user_input_version(args, key):
     # Commands that resolve their own version refs (--latest, @N, dev prefixes,
     # "current") opt out of strict version validation via strict_version=False.
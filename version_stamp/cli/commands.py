@@ -5,6 +5,7 @@ import os
 import random
 import re
 import time
+from multiprocessing.pool import ThreadPool
 from pathlib import Path
 
 import yaml
@@ -15,6 +16,7 @@ from version_stamp.backends.base import VMNBackend
 from version_stamp.backends.factory import get_client
 from version_stamp.core.constants import (
     INIT_COMMIT_MESSAGE,
+    POOL_SIZE_STATUS,
     RELATIVE_TO_CURRENT_VCS_POSITION_TYPE,
     RELATIVE_TO_GLOBAL_TYPE,
     VMN_USER_NAME,
@@ -171,7 +173,167 @@ def _log_no_release_mode(vcs):
 def handle_stamp(vmn_ctx):
     from version_stamp.cli.worktree_state import is_local_only_island
 
+    if getattr(vmn_ctx.args, "batch_names", None):
+        return _handle_batch_stamp(vmn_ctx)
+
     local_only_island = is_local_only_island(vmn_ctx.vcs.vmn_root_path)
+    ret = _prepare_stamp(vmn_ctx, local_only_island)
+    if ret is not None:
+        return ret
+
+    _fetch_app_tags(vmn_ctx.vcs)
+
+    # We didn't find any existing version
+    if vmn_ctx.args.pull:
+        try:
+            _retrieve_stamp_updates(vmn_ctx.vcs, local_only_island)
+        except Exception:
+            VMN_LOGGER.error(
+                "Failed to pull, run with --debug for more details"
+            )
+            VMN_LOGGER.debug("Logged Exception message:", exc_info=True)
+
+            return 1
+
+    ret, initial_version = _resolve_stamp_initial_version(vmn_ctx)
+    if ret:
+        return ret
+
+    try:
+        version = _stamp_version(
+            vmn_ctx.vcs,
+            vmn_ctx.args.pull and not local_only_island,
+            vmn_ctx.args.check_vmn_version,
+            initial_version,
+        )
+    except Exception:
+        VMN_LOGGER.debug("Logged Exception message:", exc_info=True)
+
+        return 1
+
+    _log_stamped_version(vmn_ctx.vcs, version)
+
+    return 0
+
+
+def _log_stamped_version(vcs, version):
+    disp_version = vcs.get_be_formatted_version(version)
+    if vcs.dry_run:
+        VMN_LOGGER.info(f"Would have stamped {disp_version}")
+    else:
+        VMN_LOGGER.info(f"{disp_version}")
+
+
+def _get_batch_stamp_context(vmn_ctx, name):
+    """A copy of ``vmn_ctx`` for stamping app ``name`` with the same args."""
+    from version_stamp.cli.entry import validate_app_name
+    from version_stamp.stamping.publisher import VersionControlStamper
+
+    app_ctx = copy.copy(vmn_ctx)
+    app_ctx.args = copy.copy(vmn_ctx.args)
+    app_ctx.args.name = name
+    validate_app_name(app_ctx.args)
+
+    app_ctx.params = dict(vmn_ctx.params, name=name)
+    # Pooled backend: every app of the batch sees the same refs and tags
+    app_ctx.vcs = VersionControlStamper(app_ctx.params)
+
+    return app_ctx
+
+
+@measure_runtime_decorator
+def _handle_batch_stamp(vmn_ctx):
+    """Stamp several apps against one tag snapshot, in one commit and one
+    atomic push of the branch and all their tags."""
+    from version_stamp.cli.worktree_state import is_local_only_island
+
+    names = [vmn_ctx.args.name] + vmn_ctx.args.batch_names
+    if len(set(names)) != len(names):
+        VMN_LOGGER.error(f"Apps to stamp are listed more than once: {names}")
+        return 1
+
+    if vmn_ctx.args.ov is not None or vmn_ctx.args.orv is not None:
+        VMN_LOGGER.error(
+            "--ov and --orv set one app's version and cannot be used "
+            "when stamping several apps"
+        )
+        return 1
+
+    try:
+        contexts = [vmn_ctx] + [
+            _get_batch_stamp_context(vmn_ctx, name) for name in names[1:]
+        ]
+    except Exception:
+        VMN_LOGGER.error("Failed to load the apps to stamp")
+        VMN_LOGGER.debug("Logged Exception message:", exc_info=True)
+        return 1
+
+    with_root_app = [ctx.vcs.name for ctx in contexts if ctx.vcs.root_app_name]
+    if with_root_app:
+        VMN_LOGGER.error(
+            f"Apps of a root app cannot be stamped together yet: {with_root_app}. "
+            "Stamp them one at a time"
+        )
+        return 1
+
+    local_only_island = is_local_only_island(vmn_ctx.vcs.vmn_root_path)
+    to_stamp = []
+    for ctx in contexts:
+        ret = _prepare_stamp(ctx, local_only_island)
+        if ret is None:
+            to_stamp.append(ctx)
+        elif ret:
+            return ret
+
+    if not to_stamp:
+        return 0
+
+    # One fetch of all the apps' tags, and at most one pull
+    vmn_ctx.vcs.backend.perform_cached_fetch(
+        app_names=[ctx.vcs.name for ctx in to_stamp]
+    )
+    if vmn_ctx.args.pull:
+        try:
+            _retrieve_stamp_updates(to_stamp[0].vcs, local_only_island)
+        except Exception:
+            VMN_LOGGER.error(
+                "Failed to pull, run with --debug for more details"
+            )
+            VMN_LOGGER.debug("Logged Exception message:", exc_info=True)
+
+            return 1
+
+    stamps = []
+    for ctx in to_stamp:
+        ret, initial_version = _resolve_stamp_initial_version(ctx)
+        if ret:
+            return ret
+        stamps.append((ctx.vcs, initial_version))
+
+    try:
+        versions = _stamp_versions(
+            stamps,
+            vmn_ctx.args.pull and not local_only_island,
+            vmn_ctx.args.check_vmn_version,
+        )
+    except Exception:
+        VMN_LOGGER.debug("Logged Exception message:", exc_info=True)
+
+        return 1
+
+    for (vcs, _), version in zip(stamps, versions):
+        _log_stamped_version(vcs, version)
+
+    return 0
+
+
+@measure_runtime_decorator
+def _prepare_stamp(vmn_ctx, local_only_island):
+    """Set up the stamp of ``vmn_ctx``'s app and check the repository.
+
+    Returns None when the app is ready to be stamped, otherwise the
+    command's exit code (0 when nothing changed since its last version).
+    """
     vmn_ctx.vcs.prerelease = vmn_ctx.args.pr
     vmn_ctx.vcs.buildmetadata = None
     vmn_ctx.vcs.release_mode = vmn_ctx.args.release_mode
@@ -225,9 +387,10 @@ def handle_stamp(vmn_ctx):
                 "revert": "",
                 "config": "",
             }
-            for m in vmn_ctx.vcs.backend.get_commits_range_iter(
+            messages = vmn_ctx.vcs.backend.get_commits_range_iter(
                 vmn_ctx.vcs.selected_tag
-            ):
+            )
+            for m in messages:
                 try:
                     res = parse_conventional_commit_message(m)
                 except ValueError:
@@ -245,6 +408,11 @@ def handle_stamp(vmn_ctx):
                     max_release_mode = mapping[res["type"]]
                     max_release_trigger = f"{res['type']}: {res['description']}"
 
+                if max_release_mode == "major":
+                    # Nothing outranks it, the older commits need no reading
+                    break
+            messages.close()
+
             _log_conventional_commits_release_mode(
                 vmn_ctx.vcs, max_release_mode, max_release_trigger
             )
@@ -370,20 +538,12 @@ def handle_stamp(vmn_ctx):
         VMN_LOGGER.error("In detached head. Will not stamp new version")
         return 1
 
-    vmn_ctx.vcs.backend.perform_cached_fetch()
+    return None
 
-    # We didn't find any existing version
-    if vmn_ctx.args.pull:
-        try:
-            _retrieve_stamp_updates(vmn_ctx.vcs, local_only_island)
-        except Exception:
-            VMN_LOGGER.error(
-                "Failed to pull, run with --debug for more details"
-            )
-            VMN_LOGGER.debug("Logged Exception message:", exc_info=True)
-
-            return 1
 
+def _resolve_stamp_initial_version(vmn_ctx):
+    """The version the stamp of ``vmn_ctx``'s app advances from, as
+    ``(err, initial_version)``."""
     initial_version = _determine_initial_version(vmn_ctx)
 
     props = VMNBackend.deserialize_vmn_version(initial_version)
@@ -405,20 +565,24 @@ def handle_stamp(vmn_ctx):
                 f"Logged Exception message: {e}", exc_info=True
             )
 
-            return 1
+            return 1, None
 
         release_tag_name = VMNBackend.serialize_vmn_tag_name(
             vmn_ctx.vcs.name, base_verstr
         )
 
-        tag_name_prefix = f"{release_tag_name}*"
-        tag = vmn_ctx.vcs.backend.get_latest_available_tag(tag_name_prefix)
+        base_props = VMNBackend.deserialize_vmn_version(base_verstr)
+        base_exists = vmn_ctx.vcs.backend.get_version_allocation_index(
+            vmn_ctx.vcs.name
+        ).has_base(
+            base_props.major, base_props.minor, base_props.patch, base_props.hotfix
+        )
 
         _, ver_infos = vmn_ctx.vcs.backend.get_tag_version_info(release_tag_name)
         if ver_infos:
-            tag = None
+            base_exists = False
 
-        if tag is None:
+        if not base_exists:
             # If the version we're going towards to does not exist,
             # act as if release_mode was specified
             vmn_ctx.vcs.release_mode = vmn_ctx.vcs.optional_release_mode
@@ -445,29 +609,18 @@ def handle_stamp(vmn_ctx):
             "release_mode"
         ]
 
-    try:
-        version = _stamp_version(
-            vmn_ctx.vcs,
-            vmn_ctx.args.pull and not local_only_island,
-            vmn_ctx.args.check_vmn_version,
-            initial_version,
-        )
-    except Exception:
-        VMN_LOGGER.debug("Logged Exception message:", exc_info=True)
+    return 0, initial_version
 
-        return 1
-
-    disp_version = vmn_ctx.vcs.get_be_formatted_version(version)
-    if vmn_ctx.vcs.dry_run:
-        VMN_LOGGER.info(f"Would have stamped {disp_version}")
-    else:
-        VMN_LOGGER.info(f"{disp_version}")
 
-    return 0
+def _fetch_app_tags(vcs, force=False):
+    """Fetch the tags of the app and of its root app."""
+    vcs.backend.perform_cached_fetch(
+        force=force, app_names=[vcs.name, vcs.root_app_name]
+    )
 
 
 def _retrieve_stamp_updates(vcs, local_only=False):
-    vcs.backend.perform_cached_fetch(force=True)
+    _fetch_app_tags(vcs, force=True)
     if not local_only:
         vcs.retrieve_remote_changes()
 
@@ -639,7 +792,7 @@ def handle_release(vmn_ctx):
             # Set extra_commit_message - required by publish_stamp
             vmn_ctx.params["extra_commit_message"] = ""
 
-            vmn_ctx.vcs.backend.perform_cached_fetch()
+            _fetch_app_tags(vmn_ctx.vcs)
 
             try:
                 version = _stamp_version(
@@ -924,16 +1077,97 @@ def _is_editable_island_dep(path, backend, optional_status):
     return is_local_only_island(path)
 
 
-@measure_runtime_decorator
-def _get_repo_status(vcs, expected_status, optional_status=set(), suppress_errors=frozenset()):
-    be = vcs.backend
-    default_dep_status = {
+def _get_dep_status(vcs, repo, optional_status):
+    """Check one dependency repo against its configuration.
+
+    Returns the repo's entry for ``RepoStatus.repos`` together with the
+    configuration mismatch and dirty-dependency messages found, leaving the
+    merge into the shared status to the caller.
+    """
+    dep_status = {
         "pending": False,
         "detached": False,
         "outgoing": False,
         "state": set(),
         "error": False,
     }
+    sync_errs = []
+    dirty_errs = []
+    full_path = os.path.join(vcs.vmn_root_path, repo)
+    configured = vcs.configured_deps[repo]
+
+    dep_be, err = get_client(full_path, vcs.be_type)
+    if err:
+        err_str = "Failed to create backend {0}. Exiting".format(err)
+        VMN_LOGGER.error(err_str)
+        raise RuntimeError(err_str)
+
+    err = dep_be.check_for_pending_changes()
+    if err:
+        dirty_errs.append(err)
+        dep_status["pending"] = True
+        dep_status["state"].add("pending")
+
+    editable_island_dep = _is_editable_island_dep(
+        full_path, dep_be, optional_status
+    )
+    if not editable_island_dep and "branch" in configured:
+        try:
+            branch_name = dep_be.get_active_branch()
+            err_msg = (
+                f"{repo} repository is on a different branch: "
+                f"{branch_name} than what is required by the configuration: "
+                f"{configured['branch']}"
+            )
+            assert branch_name == configured["branch"]
+        except Exception:
+            sync_errs.append(err_msg)
+            dep_status["branch_synced_error"] = True
+            dep_status["state"].add("not_synced_with_conf")
+
+    if not editable_island_dep and "tag" in configured:
+        try:
+            err_msg = (
+                f"Repository in not on the requested tag by the configuration "
+                f"for {repo}."
+            )
+            c1 = dep_be.changeset(tag=configured["tag"])
+            c2 = dep_be.changeset()
+            assert c1 == c2
+        except Exception:
+            sync_errs.append(err_msg)
+            dep_status["tag_synced_error"] = True
+            dep_status["state"].add("not_synced_with_conf")
+
+    if not editable_island_dep and "hash" in configured:
+        try:
+            err_msg = (
+                f"Repository in not on the requested hash by the configuration "
+                f"for {repo}."
+            )
+            assert configured["hash"] == dep_be.changeset()
+        except Exception:
+            sync_errs.append(err_msg)
+            dep_status["hash_synced_error"] = True
+            dep_status["state"].add("not_synced_with_conf")
+
+    if not dep_be.in_detached_head():
+        err = dep_be.check_for_outgoing_changes()
+        if err:
+            dep_status["outgoing"] = True
+            dep_status["state"].add("outgoing")
+            if "outgoing" not in optional_status:
+                dirty_errs.append(err)
+    else:
+        dep_status["detached"] = True
+        dep_status["state"].add("detached")
+
+    return dep_status, sync_errs, dirty_errs
+
+
+@measure_runtime_decorator
+def _get_repo_status(vcs, expected_status, optional_status=set(), suppress_errors=frozenset()):
+    be = vcs.backend
     status = RepoStatus(
         state={
             "repos_exist_locally",
@@ -957,7 +1191,7 @@ def _get_repo_status(vcs, expected_status, optional_status=set(), suppress_error
             ] = "vmn tracking is not yet initialized. Run vmn init on the repository"
             status.state.remove("repo_tracked")
 
-    err = be.check_for_pending_changes()
+    err = be.check_for_pending_changes(paths=vcs.pending_changes_scope)
     if err:
         status.pending = True
         status.err_msgs["pending"] = err
@@ -1003,107 +1237,34 @@ def _get_repo_status(vcs, expected_status, optional_status=set(), suppress_error
             status.local_repos_diff = missing_deps
             status.state.remove("repos_exist_locally")
 
-        err = 0
-        common_deps = configured_repos & local_repos
-        for repo in common_deps:
-            # Skip local repo
-            if repo == ".":
-                continue
-
-            status.repos[repo] = copy.deepcopy(default_dep_status)
-            full_path = os.path.join(vcs.vmn_root_path, repo)
-
-            dep_be, err = get_client(full_path, vcs.be_type)
-            if err:
-                err_str = "Failed to create backend {0}. Exiting".format(err)
-                VMN_LOGGER.error(err_str)
-                raise RuntimeError(err_str)
-
-            err = dep_be.check_for_pending_changes()
-            if err:
-                status.dirty_deps = True
-                status.err_msgs[
-                    "dirty_deps"
-                ] = f"{status.err_msgs['dirty_deps']}\n{err}"
-                status.state.add("dirty_deps")
-                status.repos[repo]["pending"] = True
-                status.repos[repo]["state"].add("pending")
-
-            editable_island_dep = _is_editable_island_dep(
-                full_path, dep_be, optional_status
-            )
-            if not editable_island_dep and "branch" in vcs.configured_deps[repo]:
-                try:
-                    branch_name = dep_be.get_active_branch()
-                    err_msg = (
-                        f"{repo} repository is on a different branch: "
-                        f"{branch_name} than what is required by the configuration: "
-                        f"{vcs.configured_deps[repo]['branch']}"
-                    )
-                    assert branch_name == vcs.configured_deps[repo]["branch"]
-                except Exception:
-                    status.deps_synced_with_conf = False
-                    status.err_msgs[
-                        "deps_synced_with_conf"
-                    ] = f"{status.err_msgs['deps_synced_with_conf']}\n{err_msg}"
-                    if "deps_synced_with_conf" in status.state:
-                        status.state.remove("deps_synced_with_conf")
-
-                    status.repos[repo]["branch_synced_error"] = True
-                    status.repos[repo]["state"].add("not_synced_with_conf")
+        common_deps = sorted((configured_repos & local_repos) - {"."})
+        if common_deps:
+            # Every dependency is checked in its own repo, so the checks run
+            # concurrently; results are merged in path order to keep the
+            # error messages deterministic
+            with ThreadPool(min(len(common_deps), POOL_SIZE_STATUS)) as p:
+                dep_results = p.map(
+                    lambda repo: _get_dep_status(vcs, repo, optional_status),
+                    common_deps,
+                )
 
-            if not editable_island_dep and "tag" in vcs.configured_deps[repo]:
-                try:
-                    err_msg = (
-                        f"Repository in not on the requested tag by the configuration "
-                        f"for {repo}."
-                    )
-                    c1 = dep_be.changeset(tag=vcs.configured_deps[repo]["tag"])
-                    c2 = dep_be.changeset()
-                    assert c1 == c2
-                except Exception:
+            for repo, (dep_status, sync_errs, dirty_errs) in zip(
+                common_deps, dep_results
+            ):
+                status.repos[repo] = dep_status
+                for err_msg in sync_errs:
                     status.deps_synced_with_conf = False
                     status.err_msgs[
                         "deps_synced_with_conf"
                     ] = f"{status.err_msgs['deps_synced_with_conf']}\n{err_msg}"
                     if "deps_synced_with_conf" in status.state:
                         status.state.remove("deps_synced_with_conf")
-
-                    status.repos[repo]["tag_synced_error"] = True
-                    status.repos[repo]["state"].add("not_synced_with_conf")
-
-            if not editable_island_dep and "hash" in vcs.configured_deps[repo]:
-                try:
-                    err_msg = (
-                        f"Repository in not on the requested hash by the configuration "
-                        f"for {repo}."
-                    )
-                    assert vcs.configured_deps[repo]["hash"] == dep_be.changeset()
-                except Exception:
-                    status.deps_synced_with_conf = False
+                for err in dirty_errs:
+                    status.dirty_deps = True
                     status.err_msgs[
-                        "deps_synced_with_conf"
-                    ] = f"{status.err_msgs['deps_synced_with_conf']}\n{err_msg}"
-                    if "deps_synced_with_conf" in status.state:
-                        status.state.remove("deps_synced_with_conf")
-
-                    status.repos[repo]["hash_synced_error"] = True
-                    status.repos[repo]["state"].add("not_synced_with_conf")
-
-            if not dep_be.in_detached_head():
-                err = dep_be.check_for_outgoing_changes()
-                if err:
-                    status.repos[repo]["outgoing"] = True
-                    status.repos[repo]["state"].add("outgoing")
-                    if "outgoing" not in optional_status:
-                        status.dirty_deps = True
-                        status.err_msgs[
-                            "dirty_deps"
-                        ] = f"{status.err_msgs['dirty_deps']}\n{err}"
-                        status.state.add("dirty_deps")
-            else:
-                status.repos[repo]["detached"] = True
-                status.repos[repo]["state"].add("detached")
+                        "dirty_deps"
+                    ] = f"{status.err_msgs['dirty_deps']}\n{err}"
+                    status.state.add("dirty_deps")
 
     if (expected_status & status.state) != expected_status:
         for msg in expected_status - status.state:
@@ -1163,7 +1324,7 @@ def _init_app(versions_be_ifc, starting_version, extra_optional=None):
         info, starting_version, starting_version, "init", {}
     )
 
-    versions_be_ifc.backend.perform_cached_fetch()
+    _fetch_app_tags(versions_be_ifc)
 
     root_app_version = 0
     services = {}
@@ -1211,43 +1372,65 @@ def _init_app(versions_be_ifc, starting_version, extra_optional=None):
 
 @measure_runtime_decorator
 def _stamp_version(versions_be_ifc, pull, check_vmn_version, verstr):
-    stamped = False
-    retries = 3
-    override_verstr = verstr
+    return _stamp_versions([(versions_be_ifc, verstr)], pull, check_vmn_version)[0]
 
-    override_main_current_version = versions_be_ifc.override_root_version
 
-    if check_vmn_version:
-        newer_stamping = version_mod.version != "0.0.0" and (
-            pversion.parse(
-                versions_be_ifc.current_version_info["vmn_info"]["vmn_version"]
+def _stamp_versions(stamps, pull, check_vmn_version):
+    """Stamp and publish ``(stamper, verstr)`` entries of one repository in
+    a single commit. Returns the stamped versions, in order."""
+    stamped = False
+    retries = 3
+    lead = stamps[0][0]
+    override_verstrs = [verstr for _, verstr in stamps]
+    override_main_current_versions = [
+        vcs.override_root_version for vcs, _ in stamps
+    ]
+
+    for vcs, _ in stamps:
+        if check_vmn_version:
+            newer_stamping = version_mod.version != "0.0.0" and (
+                pversion.parse(vcs.current_version_info["vmn_info"]["vmn_version"])
+                > pversion.parse(version_mod.version)
             )
-            > pversion.parse(version_mod.version)
-        )
 
-        if newer_stamping:
-            VMN_LOGGER.error(
-                "Refusing to stamp with old vmn. Please upgrade"
-            )
-            raise RuntimeError()
+            if newer_stamping:
+                VMN_LOGGER.error(
+                    "Refusing to stamp with old vmn. Please upgrade"
+                )
+                raise RuntimeError()
 
-    if versions_be_ifc.template_err_str:
-        VMN_LOGGER.warning(versions_be_ifc.template_err_str)
+        if vcs.template_err_str:
+            VMN_LOGGER.warning(vcs.template_err_str)
 
     while retries:
         retries -= 1
 
-        current_version = versions_be_ifc.stamp_app_version(override_verstr)
-        main_ver = versions_be_ifc.stamp_root_app_version(override_main_current_version)
+        current_versions = []
+        main_vers = []
+        for (vcs, _), override_verstr, override_main_current_version in zip(
+            stamps, override_verstrs, override_main_current_versions
+        ):
+            current_versions.append(vcs.stamp_app_version(override_verstr))
+            main_vers.append(
+                vcs.stamp_root_app_version(override_main_current_version)
+            )
 
         try:
-            err = versions_be_ifc.publish_stamp(current_version, main_ver)
+            err = lead.publish_stamps(
+                [
+                    (vcs, current_version, main_ver)
+                    for (vcs, _), current_version, main_ver in zip(
+                        stamps, current_versions, main_vers
+                    )
+                ]
+            )
         except Exception as exc:
             VMN_LOGGER.error(
                 f"Failed to publish. Will revert local changes {exc}\nFor more details use --debug"
             )
             VMN_LOGGER.debug("Exception info: ", exc_info=True)
-            versions_be_ifc.backend.revert_local_changes(versions_be_ifc.version_files)
+            for vcs, _ in stamps:
+                vcs.backend.revert_local_changes(vcs.version_files)
             err = -1
 
         if not err:
@@ -1255,24 +1438,36 @@ def _stamp_version(versions_be_ifc, pull, check_vmn_version, verstr):
             break
 
         if err == 1:
-            override_verstr = current_version
+            # Only the apps whose version got taken move on to the next one
+            taken = [
+                vcs.backend.changeset(tag=vcs.get_tag_name(current_version))
+                is not None
+                for (vcs, _), current_version in zip(stamps, current_versions)
+            ]
+            if not any(taken):
+                taken = [True] * len(stamps)
+
+            for i, (vcs, _) in enumerate(stamps):
+                if not taken[i]:
+                    continue
 
-            override_main_current_version = main_ver
+                override_verstrs[i] = current_versions[i]
+                override_main_current_versions[i] = main_vers[i]
 
-            VMN_LOGGER.warning(
-                "Failed to publish. Will try to auto-increase "
-                "from {0} to {1}".format(
-                    current_version,
-                    versions_be_ifc.gen_advanced_version(override_verstr)[0],
+                VMN_LOGGER.warning(
+                    "Failed to publish. Will try to auto-increase "
+                    "from {0} to {1}".format(
+                        current_versions[i],
+                        vcs.gen_advanced_version(current_versions[i])[0],
+                    )
                 )
-            )
         elif err == 2:
             if not pull:
                 break
 
             time.sleep(random.randint(1, 5))
             try:
-                versions_be_ifc.retrieve_remote_changes()
+                lead.retrieve_remote_changes()
             except Exception:
                 VMN_LOGGER.error("Failed to pull", exc_info=True)
         else:
@@ -1283,4 +1478,4 @@ def _stamp_version(versions_be_ifc, pull, check_vmn_version, verstr):
         VMN_LOGGER.error(err)
         raise RuntimeError(err)
 
-    return current_version
+    return current_versions
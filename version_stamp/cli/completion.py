@@ -94,7 +94,7 @@ def setup_completion(parser):
         if command == "worktrees" and action_dest == "action":
             choices = ("create", "list", "remove")
             return [item for item in choices if item.startswith(prefix)]
-        if action_dest == "name":
+        if action_dest in ("name", "batch_names"):
             return app_name_completer(prefix, parsed_args, **kwargs)
         return files_completer(
             prefix,
@@ -3,10 +3,16 @@
 from dataclasses import dataclass, field
 from typing import Any, Dict, Optional, Set
 
-from version_stamp.core.constants import GLOBAL_LOG_FILENAME, VER_FILE_NAME  # noqa: F401
+from version_stamp.core.constants import (  # noqa: F401
+    GLOBAL_LOG_FILENAME,
+    TAG_INDEX_FILENAME,
+    VER_FILE_NAME,
+)
 from version_stamp.core.models import AppConf
 
 LOCK_FILE_ENV = "VMN_LOCK_FILE_PATH"
+# JSON file for the git command trace summary, or "-" for stderr
+GIT_TRACE_ENV = "VMN_GIT_TRACE"
 INIT_FILENAME = "conf.yml"
 LOCK_FILENAME = "vmn.lock"
 LOG_FILENAME = "vmn.log"
@@ -18,6 +24,7 @@ IGNORED_FILES = [
     CACHE_FILENAME,
     GLOBAL_LOG_FILENAME,
     "untracked_hash.cache",
+    f"{TAG_INDEX_FILENAME}*",
     "*/snapshots/",
     "*/experiments/",
 ]
@@ -39,6 +46,7 @@ VMN_ARGS = {
     "worktrees": "local",
     "ai": "local",
     "skill": "local",
+    "maintenance": "local",
 }
 
 _CONFIG_DESCRIPTIONS = AppConf.config_descriptions()
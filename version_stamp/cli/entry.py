@@ -9,12 +9,25 @@ from pprint import pformat
 from filelock import FileLock
 
 from version_stamp import version as version_mod
-from version_stamp.backends.factory import get_client
+from version_stamp.backends.factory import get_client, invalidate_clients
+from version_stamp.backends.git_trace import GIT_TRACE
 from version_stamp.core.constants import BOLD_CHAR, BRANCH_CONF_DIR, END_CHAR, VMN_BE_TYPE_GIT, VMN_BE_TYPE_LOCAL_FILE
-from version_stamp.core.logging import VMN_LOGGER, _runtime_ctx, init_stamp_logger, measure_runtime_decorator
+from version_stamp.core.logging import (
+    RUNTIME_PROFILE,
+    VMN_LOGGER,
+    _runtime_ctx,
+    init_stamp_logger,
+    measure_runtime_decorator,
+)
 from version_stamp.core.utils import resolve_root_path
 from version_stamp.cli.args import parse_user_commands
-from version_stamp.cli.constants import LOCK_FILE_ENV, LOCK_FILENAME, LOG_FILENAME, VMN_ARGS
+from version_stamp.cli.constants import (
+    GIT_TRACE_ENV,
+    LOCK_FILE_ENV,
+    LOCK_FILENAME,
+    LOG_FILENAME,
+    VMN_ARGS,
+)
 from version_stamp.stamping.publisher import VersionControlStamper
 
 # Import all command handlers so dynamic dispatch works
@@ -31,6 +44,7 @@ from version_stamp.cli.commands import (  # noqa: F401
 )
 from version_stamp.cli.config_tui import handle_config  # noqa: F401
 from version_stamp.cli.experiment import handle_experiment  # noqa: F401
+from version_stamp.cli.maintenance import handle_maintenance  # noqa: F401
 from version_stamp.cli.worktree_state import (
     WORKTREE_READONLY_MARKER,
     is_local_only_island,
@@ -179,6 +193,10 @@ def vmn_run(command_line=None):
 
         return 1, None
 
+    GIT_TRACE.start(os.environ.get(GIT_TRACE_ENV))
+    if args.profile:
+        RUNTIME_PROFILE.start()
+
     err = 0
     vmnc = None
     try:
@@ -214,6 +232,9 @@ def vmn_run(command_line=None):
             f"\n{BOLD_CHAR}Command line: {' '.join(command_line)}{END_CHAR}"
         )
 
+        # Backends are pooled for the lifetime of one command
+        invalidate_clients()
+
         # Call the actual function
         err, vmnc = _vmn_run(args, root_path)
         # We only need it here. In other, Exception cases -
@@ -250,8 +271,23 @@ def vmn_run(command_line=None):
 
         err = 1
 
+    invalidate_clients()
     VMN_LOGGER.debug(pformat(_runtime_ctx.call_count))
 
+    try:
+        GIT_TRACE.emit()
+    except OSError as exc:
+        VMN_LOGGER.warning(f"Failed to write the git trace: {exc}")
+
+    if args.profile:
+        try:
+            RUNTIME_PROFILE.write(
+                args.profile,
+                {"command": args.command, "call_count": dict(_runtime_ctx.call_count)},
+            )
+        except OSError as exc:
+            VMN_LOGGER.warning(f"Failed to write the profile: {exc}")
+
     return err, vmnc
 
 
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""``vmn maintenance``: keep the git structures vmn's queries rely on fresh.
+
+Writes the commit-graph with changed-path bloom filters and packs the refs
+of the repository and of the app's configured dependencies. With timings on,
+the git queries vmn runs most are timed before and after, so the gain shows.
+"""
+import os
+import statistics
+import time
+
+import git
+
+from version_stamp.backends.factory import get_client
+from version_stamp.core.logging import VMN_LOGGER, measure_runtime_decorator
+
+# Timed runs per query, after one untimed run that warms the page cache
+_TIMED_RUNS = 5
+
+
+def _query_path(repo_path, backend):
+    if os.path.isdir(os.path.join(repo_path, ".vmn")):
+        return ".vmn"
+
+    try:
+        entries = backend._be.git.ls_tree("--name-only", "HEAD").splitlines()
+    except git.exc.GitCommandError:
+        return None
+
+    return entries[0] if entries else None
+
+
+def _history_queries(repo_path, backend):
+    """The git queries to time, as (label, args) pairs."""
+    queries = [
+        ("rev-list --count", ["rev-list", "--count", "HEAD"]),
+        ("branch --contains", ["branch", "-a", "--contains", "HEAD"]),
+        (
+            "tags by taggerdate",
+            ["for-each-ref", "--sort=-taggerdate", "--format=%(refname)", "refs/tags"],
+        ),
+    ]
+    path = _query_path(repo_path, backend)
+    if path is not None:
+        queries.append(
+            ("path-limited log", ["log", "--format=%H", "--", path])
+        )
+
+    return queries
+
+
+def _time_queries(backend, queries):
+    """Median seconds per query label, over _TIMED_RUNS warm runs."""
+    timings = {}
+    for label, args in queries:
+        try:
+            backend._be.git.execute(["git"] + args)
+            runs = []
+            for _ in range(_TIMED_RUNS):
+                start = time.perf_counter()
+                backend._be.git.execute(["git"] + args)
+                runs.append(time.perf_counter() - start)
+        except git.exc.GitCommandError:
+            VMN_LOGGER.debug(f"Failed to time {label}", exc_info=True)
+            continue
+        timings[label] = statistics.median(runs)
+
+    return timings
+
+
+def _report(repo, before, after):
+    lines = [
+        f"{repo}:",
+        f"  {'query (median)':<20} {'before ms':>10} {'after ms':>10}",
+    ]
+    for label, seconds in after.items():
+        prev = before.get(label)
+        prev_str = f"{prev * 1000:>10.2f}" if prev is not None else f"{'-':>10}"
+        lines.append(f"  {label:<20} {prev_str} {seconds * 1000:>10.2f}")
+
+    VMN_LOGGER.info("\n".join(lines))
+
+
+@measure_runtime_decorator
+def maintain_repo(repo_path, be_type, timings=True):
+    """Maintain one repository. Returns (err, before, after) where the
+    timings are dicts of query label to seconds, empty without timings."""
+    backend, err = get_client(repo_path, be_type)
+    if err:
+        VMN_LOGGER.error(f"Failed to create backend {err}")
+        return 1, {}, {}
+
+    queries = _history_queries(repo_path, backend) if timings else []
+    before = _time_queries(backend, queries)
+
+    try:
+        backend.write_commit_graph()
+    except git.exc.GitCommandError:
+        VMN_LOGGER.error(
+            f"Failed to write the commit-graph of {repo_path}. "
+            f"Changed-path bloom filters need git 2.27 or newer"
+        )
+        VMN_LOGGER.debug("Exception info: ", exc_info=True)
+        return 1, before, {}
+
+    after = _time_queries(backend, queries)
+
+    return 0, before, after
+
+
+@measure_runtime_decorator
+def handle_maintenance(vmn_ctx):
+    vcs = vmn_ctx.vcs
+    repos = sorted(set(vcs.configured_deps) | {"."})
+
+    err = 0
+    for repo in repos:
+        repo_path = os.path.normpath(os.path.join(vcs.vmn_root_path, repo))
+        if not os.path.isdir(repo_path):
+            VMN_LOGGER.info(f"{repo}: not found locally, skipping")
+            continue
+
+        repo_err, before, after = maintain_repo(
+            repo_path, vcs.be_type, vmn_ctx.args.timings
+        )
+        if repo_err:
+            err = 1
+            continue
+
+        if after:
+            _report(repo, before, after)
+        else:
+            VMN_LOGGER.info(f"{repo}: wrote the commit-graph and packed refs")
+
+    return err
@@ -7,7 +7,7 @@ from multiprocessing import Pool
 import yaml
 
 from version_stamp.backends.base import VMNBackend
-from version_stamp.backends.factory import get_client
+from version_stamp.backends.factory import get_client, invalidate_clients
 from version_stamp.backends.git import GitBackend
 from version_stamp.compat.goto_changesets import extract_changesets_or_warn
 from version_stamp.core.constants import (
@@ -794,6 +794,9 @@ def _goto_version(deps, vmn_root_path, pull):
     if args:
         with Pool(min(len(args), POOL_SIZE_UPDATES)) as p:
             results = p.map(_update_repo, args)
+
+        # The workers checked the repos out; backends pooled here are stale
+        invalidate_clients([arg[0] for arg in args])
     else:
         results = []
 
@@ -12,6 +12,7 @@ from version_stamp.core.constants import (  # noqa: F401
     CONVENTIONAL_COMMIT_PATTERN,
     END_CHAR,
     GIT_CACHE_TTL_MINUTES,
+    GIT_TRACE_BUFFER_SIZE,
     GLOBAL_LOG_FILENAME,
     INIT_COMMIT_MESSAGE,
     JINJA_TAG_RE,
@@ -20,14 +21,18 @@ from version_stamp.core.constants import (  # noqa: F401
     MAX_COMMIT_SEARCH_ITERATIONS,
     POOL_SIZE_CLONES,
     POOL_SIZE_UPDATES,
+    POOL_SIZE_STATUS,
     PUBLISH_MAX_RETRIES,
     PUBLISH_RETRY_SLEEP_SECONDS,
     RELATIVE_TO_CURRENT_VCS_BRANCH_TYPE,
     RELATIVE_TO_CURRENT_VCS_POSITION_TYPE,
     RELATIVE_TO_GLOBAL_TYPE,
     SEMVER_BUILDMETADATA_REGEX,
+    SHALLOW_DEEPEN_FIRST_DEPTH,
+    SHALLOW_DEEPEN_MAX_FETCHES,
     SUPPORTED_REGEX_VARS,
-    TAG_CHRONOLOGICAL_SPACING_SECONDS,
+    TAG_ORDER_KEY,
+    TAG_ORDER_REGEX,
     VMN_BASE_VERSION_REGEX,
     VMN_BE_TYPE_GIT,
     VMN_BE_TYPE_LOCAL_FILE,
@@ -64,6 +69,7 @@ from version_stamp.core.utils import (  # noqa: F401
     WrongTagFormatException,
     _clean_split_result,
     comment_out_jinja,
+    get_tag_order,
     resolve_root_path,
 )
 from version_stamp.core.version_math import (  # noqa: F401
@@ -121,10 +121,26 @@ GLOBAL_LOG_FILENAME = "global_vmn.log"
 LOG_FILE_MAX_BYTES = 1024 * 1024 * 50
 LOG_FILE_BACKUP_COUNT = 1
 GIT_CACHE_TTL_MINUTES = 30
-TAG_CHRONOLOGICAL_SPACING_SECONDS = 1.1
 MAX_COMMIT_SEARCH_ITERATIONS = 1000
 PUBLISH_MAX_RETRIES = 5
 PUBLISH_RETRY_SLEEP_SECONDS = 60
 POOL_SIZE_UPDATES = 10
 POOL_SIZE_CLONES = 20
+POOL_SIZE_STATUS = 8
+# Shallow clones are deepened towards a range's start tag in fetches of
+# doubling depth, starting here; past the last one the history is unshallowed
+SHALLOW_DEEPEN_FIRST_DEPTH = 64
+SHALLOW_DEEPEN_MAX_FETCHES = 8
+# Git commands kept by the git trace (VMN_GIT_TRACE)
+GIT_TRACE_BUFFER_SIZE = 4096
 VER_FILE_NAME = "last_known_app_version.yml"
+
+# Top-level key appended to every tag message vmn creates. Holds the tag's
+# creation time in nanoseconds: tagger dates only have seconds resolution,
+# so tags created within the same second are ordered by this key.
+TAG_ORDER_KEY = "vmn_tag_order"
+TAG_ORDER_REGEX = re.compile(rf"^{TAG_ORDER_KEY}: (?P<order>\d+)$", re.MULTILINE)
+TAG_INDEX_FILENAME = "tag_index.sqlite"
+# Set to false under [remote "<name>"] in the repository's git config once
+# the remote rejected push options (-o ci.skip)
+PUSH_OPTIONS_CONFIG_KEY = "vmnpushoptions"
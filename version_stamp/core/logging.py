@@ -1,5 +1,7 @@
 #!/usr/bin/env python3
+import json
 import logging
+import os
 import sys
 import threading
 import time
@@ -73,6 +75,76 @@ def get_call_stack():
     return _runtime_ctx.call_stack
 
 
+# ── Runtime profile (--profile) ─────────────────────────────────────
+
+class _RuntimeProfile:
+    """Spans of decorated calls and git commands, written as a Chrome
+    trace-event file (also opened by Perfetto and speedscope)."""
+
+    def __init__(self):
+        self.enabled = False
+        self._lock = threading.Lock()
+        self._origin = 0.0
+        self._events = []
+        self._threads = {}
+
+    def start(self):
+        with self._lock:
+            self.enabled = True
+            self._origin = time.perf_counter()
+            self._events = []
+            self._threads = {}
+
+    def add_span(self, name, start, duration, category="vmn"):
+        """Record a span that started at perf_counter() ``start``."""
+        thread = threading.current_thread()
+        with self._lock:
+            self._threads[thread.ident] = thread.name
+            self._events.append(
+                {
+                    "name": name,
+                    "cat": category,
+                    "ph": "X",
+                    "ts": (start - self._origin) * 1e6,
+                    "dur": duration * 1e6,
+                    "pid": os.getpid(),
+                    "tid": thread.ident,
+                }
+            )
+
+    def write(self, path, metadata=None):
+        """Write the recorded spans to ``path`` and stop profiling."""
+        with self._lock:
+            self.enabled = False
+            events = self._events
+            threads = self._threads
+            self._events = []
+            self._threads = {}
+
+        events.extend(
+            {
+                "name": "thread_name",
+                "ph": "M",
+                "pid": os.getpid(),
+                "tid": tid,
+                "args": {"name": name},
+            }
+            for tid, name in threads.items()
+        )
+        with open(path, "w") as f:
+            json.dump(
+                {
+                    "traceEvents": events,
+                    "displayTimeUnit": "ms",
+                    "otherData": metadata or {},
+                },
+                f,
+            )
+
+
+RUNTIME_PROFILE = _RuntimeProfile()
+
+
 # ── Decorator ────────────────────────────────────────────────────────
 
 def measure_runtime_decorator(func):
@@ -93,8 +165,14 @@ def measure_runtime_decorator(func):
             )
 
         start_time = time.perf_counter()
-        result = func(*args, **kwargs)
-        end_time = time.perf_counter()
+        try:
+            result = func(*args, **kwargs)
+        finally:
+            end_time = time.perf_counter()
+            if RUNTIME_PROFILE.enabled:
+                RUNTIME_PROFILE.add_span(
+                    func.__qualname__, start_time, end_time - start_time
+                )
 
         elapsed_time = end_time - start_time
 
@@ -134,6 +134,8 @@ class AppConf:
             "ui_editor": "policies",
         },
     )
+    # No ui_* metadata: the config TUI has no list editor
+    pending_changes_paths: list = field(default_factory=list)
     conventional_commits: object = field(
         default=True,
         metadata={
@@ -1,7 +1,11 @@
 #!/usr/bin/env python3
 import os
 
-from version_stamp.core.constants import BRANCH_CONF_DIR, JINJA_TAG_RE
+from version_stamp.core.constants import (
+    BRANCH_CONF_DIR,
+    JINJA_TAG_RE,
+    TAG_ORDER_REGEX,
+)
 from version_stamp.core.logging import VMN_LOGGER
 
 
@@ -20,6 +24,19 @@ def comment_out_jinja(text: str) -> str:
     return JINJA_TAG_RE.sub(lambda m: '{% raw %}' + m.group(1) + '{% endraw %}', text)
 
 
+def get_tag_order(message, tagged_date):
+    """Sort key of a tag in creation order (nanoseconds since the epoch).
+
+    Uses the order key vmn writes into the tag message and falls back to the
+    seconds-resolution tagger date for tags created by older vmn versions.
+    """
+    match = TAG_ORDER_REGEX.search(message or "")
+    if match is not None:
+        return int(match.group("order"))
+
+    return (tagged_date or 0) * 10**9
+
+
 def resolve_root_path():
     cwd = os.getcwd()
     if "VMN_WORKING_DIR" in os.environ:
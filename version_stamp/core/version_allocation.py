@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""In-memory version-allocation index for one app.
+
+Built once from the app's tag names and kept semver-ordered, so picking the
+next major / minor / patch / hotfix octet or prerelease counter is a bisect
+instead of a tag listing. Pure logic — the tag listing comes from the backend.
+"""
+import bisect
+
+from version_stamp.core.version_math import app_name_to_tag_name, deserialize_tag_name
+
+_OCTETS = ("major", "minor", "patch", "hotfix")
+
+
+class VersionAllocationIndex:
+    def __init__(self, app_name, tag_names):
+        tag_app_name = app_name_to_tag_name(app_name)
+
+        bases = set()
+        self._prerelease_counts = {}
+        for tag_name in tag_names:
+            if not tag_name.startswith(f"{tag_app_name}_"):
+                continue
+
+            try:
+                props = deserialize_tag_name(tag_name)
+            except Exception:
+                continue
+
+            # The prefix also matches apps named like "<app>_<more>"
+            if app_name_to_tag_name(props.app_name) != tag_app_name:
+                continue
+            if "root" in props.types:
+                continue
+
+            base = (props.major, props.minor, props.patch, props.hotfix)
+            bases.add(base)
+
+            if "prerelease" in props.types and not props.old_ver_format:
+                counts = self._prerelease_counts.setdefault(base, {})
+                counts[props.prerelease] = max(
+                    counts.get(props.prerelease, 0), props.rcn
+                )
+
+        self._bases = sorted(bases)
+
+    def _last_with_prefix(self, prefix):
+        if not prefix:
+            return self._bases[-1] if self._bases else None
+
+        lo = bisect.bisect_left(self._bases, prefix)
+        hi = bisect.bisect_left(self._bases, prefix[:-1] + (prefix[-1] + 1,))
+        if hi <= lo:
+            return None
+
+        return self._bases[hi - 1]
+
+    def max_octet(self, release_mode, major=None, minor=None, patch=None):
+        """Highest ``release_mode`` octet among versions sharing the higher
+        octets, e.g. the max patch under ``major.minor``. None if there is none.
+        """
+        depth = _OCTETS.index(release_mode)
+        last = self._last_with_prefix((major, minor, patch)[:depth])
+        if last is None:
+            return None
+
+        return last[depth]
+
+    def has_base(self, major, minor, patch, hotfix=0):
+        """True if any version (release or prerelease) exists for the base."""
+        base = (major, minor, patch, hotfix or 0)
+        i = bisect.bisect_left(self._bases, base)
+
+        return i < len(self._bases) and self._bases[i] == base
+
+    def prerelease_count(self, major, minor, patch, hotfix=0):
+        """Latest counter per prerelease name for the base or None if the base
+        has no prerelease versions. Returns a fresh dict."""
+        counts = self._prerelease_counts.get((major, minor, patch, hotfix or 0))
+        if counts is None:
+            return None
+
+        return dict(counts)
@@ -69,6 +69,8 @@ class IVersionsStamper(object):
             setattr(self, self._CONF_KEY_TO_ATTR[_f.name], getattr(_defaults, _f.name))
 
         self.configured_deps = {}
+        # Paths the repo's pending changes check is limited to, None for all
+        self.pending_changes_scope = None
         self.conf_file_exists = False
         self.root_conf_file_exists = False
 
@@ -362,6 +364,19 @@ class IVersionsStamper(object):
 
         version_files_to_track_diff = list(dict.fromkeys(version_files_to_track_diff))
 
+        if self.pending_changes_paths:
+            # The app's own paths plus everything vmn writes when stamping
+            self.pending_changes_scope = list(
+                dict.fromkeys(
+                    list(self.pending_changes_paths)
+                    + [".vmn"]
+                    + [
+                        os.path.relpath(p, self.vmn_root_path)
+                        for p in version_files_to_track_diff
+                    ]
+                )
+            )
+
         self.last_user_changeset = self.backend.get_last_user_changeset(
             version_files_to_track_diff,
             self.name
@@ -474,15 +489,18 @@ class IVersionsStamper(object):
 
     def increase_octet(
         self,
-        tag_name_prefix: str,
+        props,
         version_number_oct: int,
         release_mode: str,
         globally: bool,
     ) -> int:
-        tag = self.backend.get_latest_available_tag(tag_name_prefix)
-        if tag and globally:
-            props = VMNBackend.deserialize_vmn_tag_name(tag)
-            version_number_oct = max(version_number_oct, int(getattr(props, release_mode)))
+        if globally:
+            index = self.backend.get_version_allocation_index(self.name)
+            max_oct = index.max_octet(
+                release_mode, props.major, props.minor, props.patch
+            )
+            if max_oct is not None:
+                version_number_oct = max(version_number_oct, max_oct)
         version_number_oct += 1
 
         return version_number_oct
@@ -501,37 +519,22 @@ class IVersionsStamper(object):
         hotfix = props.hotfix
 
         if release_mode == "major":
-            tag_name_prefix = VMNBackend.app_name_to_tag_name(self.name)
-
-            tag_name_prefix = f"{tag_name_prefix}_*"
-            major = self.increase_octet(tag_name_prefix, major, release_mode, globally)
+            major = self.increase_octet(props, major, release_mode, globally)
 
             minor = 0
             patch = 0
             hotfix = 0
         elif release_mode == "minor":
-            tag_name_prefix = VMNBackend.app_name_to_tag_name(self.name)
-
-            # TODO:: use serialize functions here
-            tag_name_prefix = f"{tag_name_prefix}_{major}.*"
-            minor = self.increase_octet(tag_name_prefix, minor, release_mode, globally)
+            minor = self.increase_octet(props, minor, release_mode, globally)
 
             patch = 0
             hotfix = 0
         elif release_mode == "patch":
-            tag_name_prefix = VMNBackend.app_name_to_tag_name(self.name)
-
-            tag_name_prefix = f"{tag_name_prefix}_{major}.{minor}.*"
-            patch = self.increase_octet(tag_name_prefix, patch, release_mode, globally)
+            patch = self.increase_octet(props, patch, release_mode, globally)
 
             hotfix = 0
         elif release_mode == "hotfix":
-            tag_name_prefix = VMNBackend.app_name_to_tag_name(self.name)
-
-            tag_name_prefix = f"{tag_name_prefix}_{major}.{minor}.{patch}.*"
-            hotfix = self.increase_octet(
-                tag_name_prefix, hotfix, release_mode, globally
-            )
+            hotfix = self.increase_octet(props, hotfix, release_mode, globally)
 
         base_version = VMNBackend.serialize_vmn_base_version(
             major,
@@ -559,20 +562,12 @@ class IVersionsStamper(object):
                 {},
             )
 
-        initialprerelease_count = {}
-        tag_name_prefix = VMNBackend.serialize_vmn_tag_name(
-            self.name, base_version
-        )
-        tag_name_prefix = f"{tag_name_prefix}-*"
-        tag = self.backend.get_latest_available_tag(tag_name_prefix)
-
-        # Means we found existing prerelease
-        if tag is not None:
-            t, prerelease_ver_info_c = self.backend.parse_tag_message(tag)
-
-            initialprerelease_count = prerelease_ver_info_c["ver_info"]["stamping"][
-                "app"
-            ]["prerelease_count"]
+        initialprerelease_count = self.backend.get_version_allocation_index(
+            self.name
+        ).prerelease_count(major, minor, patch, hotfix)
+        # Means we did not find an existing prerelease
+        if initialprerelease_count is None:
+            initialprerelease_count = {}
 
         if props.rcn is None:
             props.rcn = 0
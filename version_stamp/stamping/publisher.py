@@ -42,13 +42,21 @@ def _push_published_refs(backend, tags, local_only=False):
             f"BUG: Somehow we have outgoing changes right after publishing:\n{error}"
         )
         time.sleep(PUBLISH_RETRY_SLEEP_SECONDS)
-        error = backend.check_for_outgoing_changes()
+        error = backend.check_for_outgoing_changes(fresh=True)
     if count == PUBLISH_MAX_RETRIES and error:
         raise RuntimeError(
             f"BUG: Somehow we have outgoing changes right after publishing:\n{error}"
         )
 
 
+def _stamp_commit_line(vcs, app_version):
+    """The "<app>: Stamped" line vmn searches stamp commits by."""
+    if vcs.current_version_info["stamping"]["app"]["release_mode"] == "init":
+        return f"{vcs.name}: Stamped initial version {app_version}"
+
+    return f"{vcs.name}: Stamped version {app_version}"
+
+
 class VersionControlStamper(IVersionsStamper):
     @measure_runtime_decorator
     def __init__(self, arg_params):
@@ -144,11 +152,11 @@ class VersionControlStamper(IVersionsStamper):
 
         if "whitelist_release_branches" in self.policies:
             policy_conf = self.policies["whitelist_release_branches"]
-            tag_branch = self.backend.get_branch_from_changeset(
-                self.backend.changeset(tag=tag_name)
+            tag_branch = self.backend.get_containing_branch(
+                self.backend.changeset(tag=tag_name), policy_conf
             )
 
-            if tag_branch not in policy_conf:
+            if tag_branch is None:
                 err_msg = "Policy: whitelist_release_branches was violated. Refusing to release"
                 VMN_LOGGER.error(err_msg)
 
@@ -421,120 +429,81 @@ class VersionControlStamper(IVersionsStamper):
 
     @measure_runtime_decorator
     def publish_stamp(self, app_version, root_app_version):
-        app_msg = {
-            "vmn_info": self.current_version_info["vmn_info"],
-            "stamping": {"app": self.current_version_info["stamping"]["app"]},
-        }
-
-        if not self.should_publish:
-            return 0
-
-        self._migrate_branch_confs()
-
-        self.write_version_to_file(version_number=app_version)
-
-        version_files_to_add = self.get_files_to_add_to_index(self.version_files)
-
-        for backend in self.version_backends:
-            try:
-                backend_conf = self.version_backends[backend]
-                if backend in self._STRUCTURED_BACKEND_SPEC:
-                    self._add_files_simple_backend(version_files_to_add, backend_conf)
-                else:
-                    handler = getattr(self, f"_add_files_{backend}")
-                    handler(version_files_to_add, backend_conf)
-            except AttributeError:
-                VMN_LOGGER.warning(f"Unsupported version backend {backend}")
-                continue
-
-        if self.create_snapshots:
-            self.create_snapshot_file(app_msg, version_files_to_add, app_version)
+        return self.publish_stamps([(self, app_version, root_app_version)])
 
-        if self.root_app_name is not None:
-            root_app_msg = {
-                "stamping": {
-                    "root_app": self.current_version_info["stamping"]["root_app"]
-                },
-                "vmn_info": self.current_version_info["vmn_info"],
-            }
-
-            tmp = self.get_files_to_add_to_index([self.root_app_conf_path])
-            if tmp:
-                version_files_to_add.extend(tmp)
+    @measure_runtime_decorator
+    def publish_stamps(self, stamps):
+        """Publish the stamps of one or more apps of this repository.
 
-            if self.create_snapshots:
-                self.create_snapshot_root_file(
-                    root_app_msg, root_app_version, version_files_to_add
-                )
+        ``stamps`` holds ``(stamper, app_version, root_app_version)`` entries,
+        this stamper's own first. All their version files go into one commit
+        and the branch and every tag are pushed together, atomically.
 
-        self._generate_changelog(app_version, version_files_to_add)
+        Returns 0 on success, 1 when a tag could not be created (the version
+        is taken), 2 when the push failed and 3 on errors not worth retrying.
+        """
+        if not self.should_publish:
+            return 0
 
-        commit_msg = None
-        if self.current_version_info["stamping"]["app"]["release_mode"] == "init":
-            commit_msg = f"{self.name}: Stamped initial version {app_version}\n\n"
-        else:
-            extra_commit_message = self.params["extra_commit_message"]
-            commit_msg = (
-                f"{self.name}: Stamped version {app_version}\n{extra_commit_message}\n"
+        version_files_to_add = []
+        msgs = []
+        for vcs, app_version, root_app_version in stamps:
+            app_msg, root_app_msg = vcs._write_stamp_files(
+                app_version, root_app_version, version_files_to_add
             )
+            msgs.append((app_msg, root_app_msg))
+
+        commit_msg = self._get_stamp_commit_msg(stamps)
+        for vcs, _, _ in stamps:
+            vcs.current_version_info["stamping"]["msg"] = commit_msg
 
-        self.current_version_info["stamping"]["msg"] = commit_msg
+        version_files = []
+        for vcs, _, _ in stamps:
+            version_files.extend(vcs.version_files)
 
         prev_changeset = self.backend.changeset()
 
         try:
-            self.publish_commit(version_files_to_add)
+            self.publish_commit(
+                version_files_to_add, stampers=[vcs for vcs, _, _ in stamps]
+            )
         except Exception:
             VMN_LOGGER.debug("Logged Exception message: ", exc_info=True)
             VMN_LOGGER.info("Reverting vmn changes... ")
             if self.dry_run:
                 VMN_LOGGER.info("Would have tried to revert a vmn commit")
             else:
-                self.backend.revert_vmn_commit(prev_changeset, self.version_files)
+                self.backend.revert_vmn_commit(prev_changeset, version_files)
 
             # TODO:: turn to error codes (enums). This one means - exit without retries
             return 3
 
-        tag = self.get_tag_name(app_version)
-        match = re.search(VMN_TAG_REGEX, tag)
-        if match is None:
-            VMN_LOGGER.error(
-                f"Tag {tag} doesn't comply to vmn version format"
-                f"Reverting vmn changes ..."
-            )
-            if self.dry_run:
-                VMN_LOGGER.info("Would have reverted vmn commit.")
-            else:
-                self.backend.revert_vmn_commit(prev_changeset, self.version_files)
-
-            return 3
-
-        tags = [tag]
-        msgs = [app_msg]
-
-        if self.root_app_name is not None:
-            msgs.append(root_app_msg)
-            tag = f"{self.root_app_name}_{root_app_version}"
-            match = re.search(VMN_ROOT_TAG_REGEX, tag)
-            if match is None:
-                VMN_LOGGER.error(
-                    f"Tag {tag} doesn't comply to vmn version format"
-                    f"Reverting vmn changes ..."
-                )
+        app_tags = []
+        tags = []
+        tag_msgs = []
+        for (vcs, app_version, root_app_version), (app_msg, root_app_msg) in zip(
+            stamps, msgs
+        ):
+            stamp_tags = vcs._get_stamp_tags(app_version, root_app_version)
+            if stamp_tags is None:
                 if self.dry_run:
                     VMN_LOGGER.info("Would have reverted vmn commit.")
                 else:
-                    self.backend.revert_vmn_commit(prev_changeset, self.version_files)
+                    self.backend.revert_vmn_commit(prev_changeset, version_files)
 
                 return 3
 
-            tags.append(tag)
+            app_tags.append(stamp_tags[0])
+            tags.extend(stamp_tags)
+            tag_msgs.append(app_msg)
+            if root_app_msg is not None:
+                tag_msgs.append(root_app_msg)
 
         all_tags = []
         all_tags.extend(tags)
 
         try:
-            for t, m in zip(tags, msgs):
+            for t, m in zip(tags, tag_msgs):
                 if self.dry_run:
                     VMN_LOGGER.info(
                         "Would have created tag:\n"
@@ -552,7 +521,7 @@ class VersionControlStamper(IVersionsStamper):
                 )
             else:
                 self.backend.revert_vmn_commit(
-                    prev_changeset, self.version_files, all_tags
+                    prev_changeset, version_files, all_tags
                 )
 
             return 1
@@ -578,16 +547,119 @@ class VersionControlStamper(IVersionsStamper):
                 )
             else:
                 self.backend.revert_vmn_commit(
-                    prev_changeset, self.version_files, all_tags
+                    prev_changeset, version_files, all_tags
                 )
 
             return 2
 
         # Best-effort GitHub Release creation after successful push
-        self._create_github_release(tags[0], app_version)
+        for (vcs, app_version, _), tag in zip(stamps, app_tags):
+            vcs._create_github_release(tag, app_version)
 
         return 0
 
+    def _write_stamp_files(self, app_version, root_app_version, version_files_to_add):
+        """Write the files of this app's stamp and add the changed ones to
+        ``version_files_to_add``. Returns the app and root app (None without
+        a root app) tag messages."""
+        app_msg = {
+            "vmn_info": self.current_version_info["vmn_info"],
+            "stamping": {"app": self.current_version_info["stamping"]["app"]},
+        }
+
+        self._migrate_branch_confs()
+
+        self.write_version_to_file(version_number=app_version)
+
+        app_files_to_add = self.get_files_to_add_to_index(self.version_files)
+
+        for backend in self.version_backends:
+            try:
+                backend_conf = self.version_backends[backend]
+                if backend in self._STRUCTURED_BACKEND_SPEC:
+                    self._add_files_simple_backend(app_files_to_add, backend_conf)
+                else:
+                    handler = getattr(self, f"_add_files_{backend}")
+                    handler(app_files_to_add, backend_conf)
+            except AttributeError:
+                VMN_LOGGER.warning(f"Unsupported version backend {backend}")
+                continue
+
+        if self.create_snapshots:
+            self.create_snapshot_file(app_msg, app_files_to_add, app_version)
+
+        root_app_msg = None
+        if self.root_app_name is not None:
+            root_app_msg = {
+                "stamping": {
+                    "root_app": self.current_version_info["stamping"]["root_app"]
+                },
+                "vmn_info": self.current_version_info["vmn_info"],
+            }
+
+            tmp = self.get_files_to_add_to_index([self.root_app_conf_path])
+            if tmp:
+                app_files_to_add.extend(tmp)
+
+            if self.create_snapshots:
+                self.create_snapshot_root_file(
+                    root_app_msg, root_app_version, app_files_to_add
+                )
+
+        self._generate_changelog(app_version, app_files_to_add)
+
+        version_files_to_add.extend(
+            f for f in app_files_to_add if f not in version_files_to_add
+        )
+
+        return app_msg, root_app_msg
+
+    def _get_stamp_commit_msg(self, stamps):
+        if len(stamps) > 1:
+            # Every app gets its own "<app>: Stamped" line. The subject must
+            # not have that shape, or it would match an app of that name
+            lines = [
+                _stamp_commit_line(vcs, app_version) for vcs, app_version, _ in stamps
+            ]
+            return (
+                f"Stamped versions of {len(stamps)} apps\n\n"
+                + "\n".join(lines)
+                + f"\n{self.params['extra_commit_message']}\n"
+            )
+
+        line = _stamp_commit_line(self, stamps[0][1])
+        if self.current_version_info["stamping"]["app"]["release_mode"] == "init":
+            return f"{line}\n\n"
+
+        return f"{line}\n{self.params['extra_commit_message']}\n"
+
+    def _get_stamp_tags(self, app_version, root_app_version):
+        """The tags of this app's stamp, or None when one does not comply
+        with vmn's tag format."""
+        tag = self.get_tag_name(app_version)
+        match = re.search(VMN_TAG_REGEX, tag)
+        if match is None:
+            VMN_LOGGER.error(
+                f"Tag {tag} doesn't comply to vmn version format"
+                f"Reverting vmn changes ..."
+            )
+            return None
+
+        tags = [tag]
+        if self.root_app_name is not None:
+            tag = f"{self.root_app_name}_{root_app_version}"
+            match = re.search(VMN_ROOT_TAG_REGEX, tag)
+            if match is None:
+                VMN_LOGGER.error(
+                    f"Tag {tag} doesn't comply to vmn version format"
+                    f"Reverting vmn changes ..."
+                )
+                return None
+
+            tags.append(tag)
+
+        return tags
+
     def _generate_changelog(self, app_version, version_files_to_add):
         """Generate a changelog entry from conventional commits and prepend to CHANGELOG.md."""
         if not self.changelog:
@@ -906,9 +978,16 @@ class VersionControlStamper(IVersionsStamper):
                 pass
 
     @measure_runtime_decorator
-    def publish_commit(self, version_files_to_add):
+    def publish_commit(self, version_files_to_add, stampers=None):
+        """Commit the stamp. ``stampers`` are the apps whose stamps the
+        commit holds, just this one by default."""
+        if stampers is None:
+            stampers = [self]
+
         cur_branch = self.backend.active_branch
-        stale_confs = self._collect_stale_branch_confs(cur_branch)
+        stale_confs = []
+        for vcs in stampers:
+            stale_confs.extend(vcs._collect_stale_branch_confs(cur_branch))
 
         if self.dry_run:
             if stale_confs:
@@ -937,7 +1016,8 @@ class VersionControlStamper(IVersionsStamper):
                     except Exception:
                         pass
 
-            self._prune_branch_conf_dirs()
+            for vcs in stampers:
+                vcs._prune_branch_conf_dirs()
 
             self.backend.commit(
                 message=self.current_version_info["stamping"]["msg"],
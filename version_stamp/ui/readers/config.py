@@ -5,6 +5,7 @@ import os
 import git
 import yaml
 
+from version_stamp.backends.object_reader import GitObjectReader
 from version_stamp.ui.readers.versions import list_versions
 
 
@@ -43,11 +44,11 @@ def read_app_conf_text_at(root_path, app_name, verstr):
         return None, f"Version {verstr} not found"
 
     repo = git.Repo(root_path, search_parent_directories=True)
+    reader = GitObjectReader(repo)
     try:
-        return repo.git.show(f"{tag}:{_conf_relpath(app_name)}"), None
-    except git.GitCommandError:
-        return None, None
+        return reader.read_blob_text(tag, _conf_relpath(app_name)), None
     finally:
+        reader.close()
         repo.close()
 
 
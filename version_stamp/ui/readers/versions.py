@@ -7,6 +7,7 @@ no lock, no network, no working-tree access.
 import git
 import yaml
 
+from version_stamp.core.utils import get_tag_order
 from version_stamp.core.version_math import (
     app_name_to_tag_name,
     deserialize_tag_name,
@@ -55,11 +56,10 @@ def list_versions(root_path, app_name):
     repo = git.Repo(root_path, search_parent_directories=True)
     try:
         prefix = app_name_to_tag_name(app_name)
-        names = repo.git.tag(
-            "--sort", "taggerdate", "--list", f"{prefix}_*"
-        ).split("\n")
+        names = repo.git.tag("--list", f"{prefix}_*").split("\n")
 
         rows = []
+        orders = {}
         for name in filter(None, names):
             try:
                 props = deserialize_tag_name(name)
@@ -69,6 +69,10 @@ def list_versions(root_path, app_name):
                 continue
 
             tag_ref = repo.tags[name]
+            if tag_ref.tag is not None:
+                orders[name] = get_tag_order(
+                    tag_ref.tag.message, tag_ref.tag.tagged_date
+                )
             data = _tag_yaml(tag_ref) or {}
             stamping = data.get("stamping", {}) or {}
 
@@ -100,6 +104,8 @@ def list_versions(root_path, app_name):
                 "changesets": changesets,
                 "timestamp": tag_ref.tag.tagged_date if tag_ref.tag else None,
             })
+        # Tagger dates only have seconds resolution; sort by creation order
+        rows.sort(key=lambda row: orders.get(row["tag"], 0))
         return rows
     finally:
         repo.close()